@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional
+from config import Config
+import metrics
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차 요청을 즉시 거부할 때 발생"""
+
+
+class QueueTimeoutError(QueueFullError):
+    """대기열에서 허용 시간 안에 차례가 오지 않을 때 발생"""
+
+
+class TokenBucket:
+    """분당 한도를 초 단위로 채우는 토큰 버킷"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 꺼낼 수 있을 때까지 남은 시간(초). 0이면 즉시 가능"""
+        self._refill()
+        # 한도보다 큰 요청은 한도만큼만 요구 (영원히 대기하지 않도록)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Ticket:
+    __slots__ = ("session_id", "tokens", "granted")
+
+    def __init__(self, session_id: str, tokens: int):
+        self.session_id = session_id
+        self.tokens = tokens
+        self.granted = False
+
+
+class ApiScheduler:
+    """GMS API 호출에 대한 프로세스 전역 승인 제어
+
+    - 동시 호출 수 상한 + 분당 요청/토큰 수 토큰 버킷
+    - 세션별 대기열을 라운드로빈으로 처리하여 한 세션이 대기열을 독점하지 못하게 함
+    - 대기열이 가득 차면 QueueFullError로 즉시 거부
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 60,
+        tokens_per_minute: int = 400000,
+        max_queue: int = 50,
+        queue_timeout: float = 60.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._active = 0
+        self._waiting = 0
+        # 세션 ID -> 대기 티켓 (OrderedDict 순서가 라운드로빈 순서)
+        self._queues: "OrderedDict[str, Deque[_Ticket]]" = OrderedDict()
+        self._cond = threading.Condition()
+
+    def _dispatch(self) -> float:
+        """허용 가능한 만큼 대기 티켓을 승인. 레이트 리밋에 걸리면 다음 시도까지 대기할 시간 반환"""
+        while self._queues and self._active < self.max_concurrency:
+            session_id, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+            wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(ticket.tokens))
+            if wait > 0:
+                return wait
+            self.request_bucket.take(1)
+            self.token_bucket.take(ticket.tokens)
+            queue.popleft()
+            ticket.granted = True
+            self._active += 1
+            self._waiting -= 1
+            self._cond.notify_all()
+            # 처리한 세션은 라운드로빈 순서의 맨 뒤로
+            del self._queues[session_id]
+            if queue:
+                self._queues[session_id] = queue
+        return 0.0
+
+    def _position(self, ticket: _Ticket) -> int:
+        """라운드로빈 순서 기준 대기 순번 (1부터)"""
+        queue = self._queues.get(ticket.session_id)
+        if not queue:
+            return 0
+        depth = queue.index(ticket)
+        position = depth + 1
+        before = True
+        for session_id, other in self._queues.items():
+            if session_id == ticket.session_id:
+                before = False
+                continue
+            position += min(len(other), depth + (1 if before else 0))
+        return position
+
+    def acquire(
+        self,
+        session_id: str,
+        estimated_tokens: int,
+        on_position: Optional[Callable[[int], None]] = None,
+        timeout: Optional[float] = None
+    ):
+        """호출 슬롯을 얻을 때까지 대기 (on_position으로 대기 순번 변화를 알림)"""
+        with metrics.span("queue_wait"):
+            self._acquire(session_id, estimated_tokens, on_position, timeout)
+
+    def _acquire(
+        self,
+        session_id: str,
+        estimated_tokens: int,
+        on_position: Optional[Callable[[int], None]],
+        timeout: Optional[float]
+    ):
+        if timeout is None:
+            timeout = self.queue_timeout
+        deadline = time.monotonic() + timeout
+        ticket = _Ticket(session_id, estimated_tokens)
+
+        with self._cond:
+            if self._waiting >= self.max_queue:
+                raise QueueFullError("요청이 많아 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            self._waiting += 1
+
+        try:
+            last_position = None
+            while True:
+                with self._cond:
+                    wait = self._dispatch()
+                    if ticket.granted:
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise QueueTimeoutError("대기 시간이 초과되었습니다. 잠시 후 다시 시도하세요.")
+                    position = self._position(ticket)
+                    if position == last_position:
+                        self._cond.wait(min(remaining, wait or 1.0))
+                        continue
+
+                # 콜백(UI 갱신)은 락 밖에서 호출
+                last_position = position
+                if on_position is not None:
+                    on_position(position)
+        except BaseException:
+            # 시간 초과, 콜백 예외(Streamlit 재실행/중단 등)로 대기를 포기하면 티켓을 회수한다
+            # (남겨 두면 나중에 승인된 슬롯을 아무도 반납하지 않아 동시 호출 한도가 영구히 줄어듦)
+            self._abandon(ticket)
+            raise
+
+    def _abandon(self, ticket: _Ticket):
+        """대기를 포기한 티켓 정리: 대기 중이면 대기열에서 제거, 이미 승인됐으면 슬롯 반납"""
+        with self._cond:
+            granted = ticket.granted
+            if not granted:
+                queue = self._queues.get(ticket.session_id)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[ticket.session_id]
+                    self._waiting -= 1
+                    # 맨 앞 티켓이 빠졌을 수 있으므로 다른 대기자에게 다시 확인시킴
+                    self._cond.notify_all()
+        if granted:
+            self.release()
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(
+        self,
+        session_id: str,
+        estimated_tokens: int,
+        on_position: Optional[Callable[[int], None]] = None
+    ):
+        """with 블록 동안 호출 슬롯을 점유"""
+        self.acquire(session_id, estimated_tokens, on_position)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {"active": self._active, "waiting": self._waiting, "sessions_waiting": len(self._queues)}
+
+
+_scheduler: Optional[ApiScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ApiScheduler:
+    """모든 세션이 공유하는 프로세스 전역 ApiScheduler 반환"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ApiScheduler(
+                    max_concurrency=Config.API_MAX_CONCURRENCY,
+                    requests_per_minute=Config.API_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=Config.API_TOKENS_PER_MINUTE,
+                    max_queue=Config.API_MAX_QUEUE,
+                    queue_timeout=Config.API_QUEUE_TIMEOUT
+                )
+    return _scheduler
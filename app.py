@@ -1,15 +1,83 @@
+import html
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Iterator, List, Optional
 import streamlit as st
-from datetime import datetime, timedelta
+from streamlit.errors import StreamlitAPIException
 from config import Config
 from chat_handler import ChatHandler
+from api_scheduler import QueueFullError
 from news_handler import NewsHandler
+from conversation import ConversationMemory, default_context_window
+from conversation_store import ConversationLog, new_conversation_log
+from intent import detect_article_search
+from grounding import GroundedRetrieval, cited_sources, inject_sources
+import metrics
+
+
+class StreamJob:
+    """백그라운드 스레드에서 받는 스트리밍 응답
+
+    스크립트 스레드는 받은 조각을 주기적으로 그리기만 하므로, fragment 재실행이 진행 중인 실행을
+    끊지 못하더라도 새 입력이 곧바로 처리되어 cancel_event로 생성을 멈출 수 있다.
+    화면 갱신이 abandon_timeout 동안 없으면(세션 종료 등) 스스로 취소한다.
+    """
+
+    def __init__(self, cancel_event: threading.Event, sources=None, abandon_timeout: float = 30):
+        self.cancel_event = cancel_event
+        self.sources = sources or []
+        self.abandon_timeout = abandon_timeout
+        self.chunks: List[str] = []
+        self.queue_position = 0
+        self.error: Optional[Exception] = None
+        self.done = False
+        self.updated = threading.Event()
+        self.last_seen = time.monotonic()
+
+    def start(self, stream: Iterator[str]) -> "StreamJob":
+        threading.Thread(target=self._run, args=(stream,), name="chat-stream", daemon=True).start()
+        return self
+
+    def on_queue_position(self, position: int):
+        self.queue_position = position
+        self.updated.set()
+
+    def _run(self, stream: Iterator[str]):
+        try:
+            # 취소·방치 시 스트림을 닫아 업스트림 생성을 멈춘다
+            with closing(stream):
+                for chunk in stream:
+                    if time.monotonic() - self.last_seen > self.abandon_timeout:
+                        self.cancel_event.set()
+                    if self.cancel_event.is_set():
+                        break
+                    self.chunks.append(chunk)
+                    self.updated.set()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.updated.set()
+
+    def text(self) -> str:
+        return "".join(self.chunks).strip()
+
+    def wait(self, timeout: float):
+        """새 조각이 오거나 끝날 때까지 최대 timeout초 대기"""
+        self.updated.wait(timeout)
+        self.updated.clear()
+
 
 class ChatbotApp:
     """GMS Chatbot with News 애플리케이션"""
     
     def __init__(self):
         self.config = Config
+        self.context_window = default_context_window()
         self.setup_page()
+        self.check_config()
         self.initialize_session_state()
     
     def setup_page(self):
@@ -43,15 +111,30 @@ class ChatbotApp:
             </style>
         """, unsafe_allow_html=True)
     
+    def check_config(self):
+        """필수 설정이 없으면 안내 후 실행 중단"""
+        try:
+            self.config.validate()
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+
     def initialize_session_state(self):
         """세션 상태 초기화"""
+        if "session_id" not in st.session_state:
+            # API 스케줄러의 세션별 공정 대기열 구분용
+            st.session_state.session_id = uuid.uuid4().hex
         if "messages" not in st.session_state:
-            st.session_state.messages = []
+            # 최근 메시지만 메모리에 두고 이전 메시지는 디스크로 내리는 대화 기록
+            st.session_state.messages = new_conversation_log(st.session_state.session_id)
             # 초기 안내 메시지: 사이트 실행 시 사용자에게 도움 안내
             st.session_state.messages.append({"role": "assistant", "content": "챗봇이 무엇을 도와드릴까요?"})
-        if "news_cache" not in st.session_state:
-            # news_cache 구조: { category: { 'items': [...], 'fetched_at': datetime } }
-            st.session_state.news_cache = {}
+        elif not isinstance(st.session_state.messages, ConversationLog):
+            # 외부에서 일반 리스트로 바꾼 경우에도 메모리 상한이 적용되도록 감싼다
+            st.session_state.messages = new_conversation_log(st.session_state.session_id, st.session_state.messages)
+        if "conversation_memory" not in st.session_state:
+            # 오래된 대화의 롤링 요약 상태
+            st.session_state.conversation_memory = ConversationMemory()
     
     def render_header(self):
         """헤더 렌더링"""
@@ -78,16 +161,26 @@ class ChatbotApp:
             
             # 뉴스 새로고침
             if st.button("🔄 뉴스 새로고침"):
-                st.session_state.news_cache = {}
+                NewsHandler.refresh_news(selected_category)
                 st.rerun()
             
             # 채팅 파라미터
             st.subheader("🎯 채팅 설정")
             temperature = st.slider("창의성 (Temperature):", 0.0, 2.0, 0.7, 0.1)
+            # 같은 질문에 대한 저장된 응답 재사용 (끄면 항상 새로 생성)
+            st.checkbox("응답 캐시 사용", value=True, key="use_response_cache")
+            # 질문과 관련된 최신 기사를 찾아 근거로 넣고 답변에서 인용
+            st.checkbox("뉴스 근거 답변", value=False, key="grounded_answers")
             
             # 대화 초기화
             if st.button("🗑️ 대화 초기화"):
-                st.session_state.messages = []
+                job = st.session_state.get("active_stream")
+                if job is not None:
+                    job.cancel_event.set()
+                    st.session_state.active_stream = None
+                st.session_state.messages.clear()
+                st.session_state.chat_history_shown = self.config.CHAT_HISTORY_WINDOW
+                st.session_state.conversation_memory.reset()
                 st.rerun()
             
             st.markdown("---")
@@ -96,6 +189,9 @@ class ChatbotApp:
             
             return selected_category, temperature, developer_instruction, news_query
     
+    # 뉴스 영역만 주기적으로 부분 재실행 (페이지 리로드/전체 스크립트 재실행 없음)
+    @st.fragment(run_every=Config.NEWS_FETCH_INTERVAL or None)
+    @metrics.timed("render", part="news")
     def render_news_sidebar(self, selected_category: str, news_query: str = ""):
         """뉴스 표시 (오른쪽 사이드바)"""
         st.subheader("📰 최신 뉴스")
@@ -105,140 +201,257 @@ class ChatbotApp:
             if news_query and news_query.strip():
                 news_items = NewsHandler.search_news(news_query.strip(), category=selected_category, max_items=self.config.MAX_NEWS_ITEMS)
             else:
-                # 캐시된 뉴스 또는 새로 가져오기 (타임스탬프 기반)
-                cache_entry = st.session_state.news_cache.get(selected_category)
-                need_fetch = True
-                if cache_entry:
-                    fetched_at = cache_entry.get("fetched_at")
-                    if isinstance(fetched_at, datetime):
-                        age = (datetime.now() - fetched_at).total_seconds()
-                        if age < self.config.NEWS_FETCH_INTERVAL:
-                            need_fetch = False
-                if need_fetch:
-                    news_items = NewsHandler.fetch_news(
-                        selected_category,
-                        max_items=self.config.MAX_NEWS_ITEMS
-                    )
-                    st.session_state.news_cache[selected_category] = {"items": news_items, "fetched_at": datetime.now()}
-                else:
-                    news_items = cache_entry.get("items", [])
+                # 프로세스 전역 캐시에서 조회 (모든 세션 공유, 백그라운드 갱신)
+                news_items = NewsHandler.fetch_news(
+                    selected_category,
+                    max_items=self.config.MAX_NEWS_ITEMS
+                )
             
             # 뉴스 표시
             if news_items:
                 for news in news_items[:5]:
-                    with st.expander(news["title"][:50] + "..."):
-                        st.markdown(f"**출처:** {news['source']}")
-                        st.markdown(f"**작성일:** {news['published']}")
-                        st.markdown(news["summary"][:200] + "...")
-                        st.markdown(f"[전체 기사 읽기]({news['link']})")
+                    with st.expander(news.title[:50] + "..."):
+                        st.markdown(f"**출처:** {news.source}")
+                        st.markdown(f"**작성일:** {news.published}")
+                        st.markdown(news.summary[:200] + "...")
+                        st.markdown(f"[전체 기사 읽기]({news.link})")
             else:
                 st.warning("뉴스를 가져올 수 없습니다.")
         except Exception as e:
             st.error(f"뉴스 로드 실패: {str(e)}")
     
-    def render_chat_history(self):
-        """채팅 히스토리 렌더링"""
+    # 메시지 입력 시 채팅 영역만 부분 재실행 (뉴스 영역은 다시 그리지 않음)
+    @st.fragment
+    def render_chat_pane(self, temperature: float):
+        """채팅 영역 렌더링 (히스토리 + 입력창 + 스트리밍 응답)"""
         st.subheader("💬 대화")
-        
+
         chat_container = st.container(height=400)
-        
+
+        # 입력창은 히스토리 아래에 두되, 입력 처리는 히스토리 렌더링 전에 수행
+        self.handle_user_input(temperature)
+        self.render_chat_history(chat_container)
+        # 대기 중인 응답은 채팅 영역에 스트리밍으로 표시
+        self.stream_pending_response(chat_container, temperature)
+
+    @metrics.timed("render", part="chat_history")
+    def render_chat_history(self, chat_container):
+        """채팅 히스토리 렌더링 (최근 메시지만 표시, 이전 메시지는 요청 시 페이지 단위로 펼침)
+
+        메시지 HTML은 메시지 레코드에 한 번만 만들어 캐시하므로 재실행 비용은 표시 구간 크기에 비례한다.
+        """
+        messages = st.session_state.messages
+        window = self.config.CHAT_HISTORY_WINDOW
+        shown = st.session_state.get("chat_history_shown", window)
+        hidden = max(0, len(messages) - shown)
+
         with chat_container:
-            for message in st.session_state.messages:
-                role = message.get("role", "user")
-                content = message.get("content", "")
-                if role == "user":
-                    emoji = "🙋"
-                    css_class = "user-message"
-                    label = "당신"
-                elif role == "assistant":
-                    emoji = "🤖"
-                    css_class = "assistant-message"
-                    label = "Assistant"
-                elif role == "developer":
-                    emoji = "🛠️"
-                    css_class = "assistant-message"
-                    label = "Developer"
-                else:
-                    emoji = "⚙️"
-                    css_class = "assistant-message"
-                    label = role
-
-                st.markdown(f"""
-                    <div class="chat-message {css_class}">
-                    <strong>{emoji} {label}:</strong> {content}
-                    </div>
-                """, unsafe_allow_html=True)
+            if hidden:
+                # 클릭 콜백에서 표시 구간을 늘리면 채팅 fragment만 다시 실행된다
+                st.button(
+                    f"⬆️ 이전 메시지 더 보기 ({hidden}개)",
+                    key="chat_history_more",
+                    on_click=lambda: st.session_state.update(chat_history_shown=shown + window)
+                )
+            # 표시 구간 전체를 하나의 요소로 렌더링
+            history_html = "".join(self.message_html(message) for message in messages[hidden:])
+            if history_html:
+                st.markdown(history_html, unsafe_allow_html=True)
+
+    @classmethod
+    def message_html(cls, message) -> str:
+        """메시지 레코드에 캐시된 말풍선 HTML 반환 (없으면 생성 후 'html'로 저장)"""
+        cached = message.get("html")
+        if cached is None:
+            cached = cls.render_message_html(message.get("role", "user"), message.get("content", ""))
+            message["html"] = cached
+        return cached
+
+    @staticmethod
+    def render_message_html(role: str, content: str) -> str:
+        """메시지 한 건을 채팅 말풍선 HTML로 변환 (내용은 HTML 이스케이프)"""
+        if role == "user":
+            emoji = "🙋"
+            css_class = "user-message"
+            label = "당신"
+        elif role == "assistant":
+            emoji = "🤖"
+            css_class = "assistant-message"
+            label = "Assistant"
+        elif role == "developer":
+            emoji = "🛠️"
+            css_class = "assistant-message"
+            label = "Developer"
+        else:
+            emoji = "⚙️"
+            css_class = "assistant-message"
+            label = role
+
+        content = html.escape(str(content)).replace("\n", "<br>")
+        return (
+            f'<div class="chat-message {css_class}">'
+            f'<strong>{emoji} {html.escape(str(label))}:</strong> {content}'
+            f'</div>'
+        )
     
     def handle_user_input(self, temperature: float):
         """사용자 입력 처리"""
-        user_input = st.chat_input("메시지를 입력하세요...", key="main_chat_input")
+        # 새 메시지가 오면 이전 응답 생성은 중단 (콜백은 새 실행의 맨 처음에 호출됨)
+        user_input = st.chat_input("메시지를 입력하세요...", key="main_chat_input", on_submit=self.cancel_active_stream)
 
         if user_input:
             # 즉시 사용자 메시지 표시
             st.session_state.messages.append({"role": "user", "content": user_input})
             # 기사 검색/요청 판단: 간단 휴리스틱
-            def detect_article_search(text: str):
-                t = text.lower()
-                keywords = ["기사", "뉴스", "요약", "summary", "article", "search", "검색", "요청"]
-                matched = any(k in t for k in keywords)
-                if not matched:
-                    return False, None
-
-                # 키워드 추출: 불용어 제거
-                remove_tokens = ["기사", "뉴스", "요약", "요약해줘", "요약해", "검색", "검색해줘", "관련", "최신", "오늘", "정리해줘", "정리해"]
-                s = t
-                for tok in remove_tokens:
-                    s = s.replace(tok, " ")
-                # 영어 stopwords
-                for tok in ["summary", "article", "news", "search"]:
-                    s = s.replace(tok, " ")
-                # strip punctuation
-                import re
-                s = re.sub(r"[^\w\s\u3131-\u318E\uAC00-\uD7A3]", " ", s)
-                s = " ".join([w for w in s.split() if len(w) > 1])
-                keyword = s.strip()
-                if not keyword:
-                    # fallback: use the original text as keyword
-                    keyword = text.strip()
-                return True, keyword
-
             is_search, search_keyword = detect_article_search(user_input)
             if is_search:
                 try:
                     # 선택된 카테고리 사용
                     category = st.session_state.get("news_category", "최신뉴스")
-                    news_items = NewsHandler.search_news(search_keyword, category=category, max_items=self.config.MAX_NEWS_ITEMS)
-                    summary = NewsHandler.summarize_news(news_items, max_articles=self.config.MAX_NEWS_ITEMS)
+                    with st.spinner("기사를 찾아 요약하는 중..."):
+                        news_items = NewsHandler.search_news(search_keyword, category=category, max_items=self.config.MAX_NEWS_ITEMS)
+                        summary = NewsHandler.summarize_news(
+                            news_items,
+                            max_articles=self.config.MAX_NEWS_ITEMS,
+                            max_llm_articles=self.config.NEWS_SUMMARY_CHAT_LLM_ARTICLES
+                        )
                     st.session_state.messages.append({"role": "assistant", "content": summary})
                 except Exception as e:
                     st.error(f"기사 검색 중 오류 발생: {e}")
                 return
 
-            # 동기적으로 API 호출을 수행하여 응답이 바로 표시되도록 함
-            try:
-                with st.spinner("응답을 생성 중입니다..."):
-                    chat_handler = ChatHandler()
-                    system_message = "당신은 도움이 되는 어시스턴트입니다."
-                    messages = []
-                    developer_text = st.session_state.get("developer_instruction", "")
-                    if developer_text:
-                        messages.append({"role": "developer", "content": developer_text})
-                    messages.append({"role": "system", "content": system_message})
-                    messages = messages + st.session_state.messages
-
-                    max_tokens = getattr(self.config, "DEFAULT_MAX_TOKENS", 8000)
-                    response = chat_handler.send_message(
-                        messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens
-                    )
-
-                # 어시스턴트 응답 추가
-                st.session_state.messages.append({"role": "assistant", "content": response})
+            # 응답 생성은 채팅 영역에서 스트리밍으로 처리 (stream_pending_response)
+            st.session_state.pending_response = True
 
+    def build_messages(self, reserve_tokens: int = 0):
+        """API 요청용 메시지 목록 구성 (developer + system + 요약 + 최근 대화)
+
+        입력 토큰 예산을 넘는 오래된 대화는 롤링 요약으로 접어 요청 크기를 일정하게 유지한다.
+        """
+        system_message = self.config.SYSTEM_PROMPT
+        prefix = []
+        developer_text = st.session_state.get("developer_instruction", "")
+        if developer_text:
+            prefix.append({"role": "developer", "content": developer_text})
+        prefix.append({"role": "system", "content": system_message})
+        with metrics.span("prompt_build"):
+            return self.context_window.build(
+                prefix,
+                st.session_state.messages,
+                st.session_state.conversation_memory,
+                reserve_tokens=reserve_tokens
+            )
+
+    def build_grounded_messages(self):
+        """근거 답변 모드: 기사 검색을 프롬프트 구성과 동시에 진행한 뒤 참고 기사를 삽입
+
+        추가 지연은 두 작업 중 느린 쪽(최대 GROUNDING_TIMEOUT)으로 제한된다.
+
+        Returns:
+            (API 요청 메시지, 참고 기사 목록)
+        """
+        user_text = next(
+            (m["content"] for m in reversed(st.session_state.messages) if m.get("role") == "user"),
+            ""
+        )
+        category = st.session_state.get("news_category", "최신뉴스")
+        retrieval = GroundedRetrieval.start(user_text, category)
+        messages = self.build_messages(reserve_tokens=retrieval.budget_tokens)
+        sources, sources_block = retrieval.result()
+        return inject_sources(messages, sources_block), sources
+
+    def cancel_active_stream(self):
+        """진행 중인 스트리밍 응답이 있으면 취소하고 받은 부분까지만 대화에 남김
+
+        st.chat_input의 on_submit 콜백으로 호출되므로 새 사용자 메시지보다 먼저 기록된다.
+        """
+        job = st.session_state.get("active_stream")
+        if job is None:
+            return
+        job.cancel_event.set()
+        st.session_state.active_stream = None
+        response = job.text()
+        if response:
+            st.session_state.messages.append({"role": "assistant", "content": self.with_citations(response, job.sources)})
+
+    def start_pending_response(self, temperature: float):
+        """대기 중인 응답의 스트리밍을 백그라운드 스레드에서 시작"""
+        st.session_state.pending_response = False
+        cancel_event = threading.Event()
+        sources = []
+        if st.session_state.get("grounded_answers"):
+            messages, sources = self.build_grounded_messages()
+        else:
+            messages = self.build_messages()
+        chat_handler = ChatHandler(session_id=st.session_state.session_id)
+        max_tokens = getattr(self.config, "DEFAULT_MAX_TOKENS", 8000)
+        job = StreamJob(cancel_event, sources, abandon_timeout=self.config.STREAM_ABANDON_TIMEOUT)
+        stream = chat_handler.stream_message(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cancel_event=cancel_event,
+            use_cache=st.session_state.get("use_response_cache", True),
+            on_queue_position=job.on_queue_position
+        )
+        st.session_state.active_stream = job.start(stream)
+
+    def stream_pending_response(self, chat_container, temperature: float):
+        """대기 중인 응답을 채팅 영역에 토큰 단위로 스트리밍 렌더링
+
+        응답은 StreamJob이 받고, 이 실행은 받은 만큼 그린 뒤 짧게 기다렸다가 채팅 영역만 다시 실행한다.
+        실행이 짧게 끝나므로 새 메시지가 오면 바로 처리되어 이전 생성을 취소할 수 있다.
+        """
+        if st.session_state.get("pending_response"):
+            try:
+                self.start_pending_response(temperature)
             except Exception as e:
-                st.error(f"오류 발생: {str(e)}")
-    
+                with chat_container:
+                    st.error(f"오류 발생: {str(e)}")
+                return
+
+        job = st.session_state.get("active_stream")
+        if job is None:
+            return
+        job.last_seen = time.monotonic()
+
+        with chat_container:
+            placeholder = st.empty()
+            if not job.done:
+                if job.chunks:
+                    text = job.text() + "▌"
+                elif job.queue_position:
+                    text = f"요청이 많아 대기 중입니다... ({job.queue_position}번째)"
+                else:
+                    text = "응답을 생성 중입니다..."
+                placeholder.markdown(self.render_message_html("assistant", text), unsafe_allow_html=True)
+                job.wait(self.config.STREAM_POLL_INTERVAL)
+                try:
+                    st.rerun(scope="fragment")
+                except StreamlitAPIException:
+                    # 전체 실행 중에는 fragment 범위 재실행을 쓸 수 없으므로 앱 전체를 다시 실행
+                    st.rerun()
+
+            st.session_state.active_stream = None
+            response = job.text()
+            if job.error is not None:
+                placeholder.empty()
+                if isinstance(job.error, QueueFullError):
+                    st.warning(str(job.error))
+                else:
+                    st.error(f"오류 발생: {str(job.error)}")
+            elif response:
+                placeholder.markdown(self.render_message_html("assistant", self.with_citations(response, job.sources)), unsafe_allow_html=True)
+            # 어시스턴트 응답 추가 (오류로 중단된 경우 받은 부분까지만 보존)
+            if response:
+                st.session_state.messages.append({"role": "assistant", "content": self.with_citations(response, job.sources)})
+
+    @staticmethod
+    def with_citations(response: str, sources) -> str:
+        """답변에서 인용한 참고 기사([번호])의 제목과 링크를 덧붙임"""
+        footer = cited_sources(response, sources) if response else ""
+        return f"{response}\n\n{footer}" if footer else response
+
     def render_footer(self):
         """푸터 렌더링"""
         st.markdown("---")
@@ -251,30 +464,19 @@ class ChatbotApp:
 
     
     
+    @metrics.timed("render", part="page")
     def run(self):
         """애플리케이션 실행"""
         self.render_header()
-        # 자동 새로고침: 뉴스 업데이트 주기에 맞춰 페이지를 자동으로 리로드
-        try:
-            interval_sec = int(self.config.NEWS_FETCH_INTERVAL)
-        except Exception:
-            interval_sec = 0
-        if interval_sec and interval_sec > 0:
-            # 클라이언트에서 페이지를 자동 새로고침
-            st.components.v1.html(f"<script>setTimeout(()=>location.reload(), {interval_sec * 1000});</script>", height=0)
-        
         # 사이드바
         selected_category, temperature, developer_instruction, news_query = self.render_sidebar()
         
         # 메인 콘텐츠
         col1, col2 = st.columns([2, 1])
 
-        # 사용자 입력을 먼저 처리 so pending flag gets set before processing
-        self.handle_user_input(temperature)
-
+        # 채팅/뉴스 영역은 각각 독립적으로 부분 재실행되는 fragment
         with col1:
-            self.render_chat_history()
-            # API 호출은 handle_user_input에서 동기적으로 처리함
+            self.render_chat_pane(temperature)
 
         with col2:
             self.render_news_sidebar(selected_category, news_query=news_query)
@@ -285,8 +487,16 @@ class ChatbotApp:
         self.render_footer()
 
 
+@st.cache_resource(show_spinner=False)
+def warm_up_news():
+    """프로세스 시작 시 한 번만 전체 뉴스 피드를 백그라운드로 미리 수집"""
+    NewsHandler.warm_up()
+    return True
+
+
 def main():
     """메인 진입점"""
+    warm_up_news()
     app = ChatbotApp()
     app.run()
 
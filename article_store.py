@@ -0,0 +1,189 @@
+import html
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from config import Config
+from news_item import NewsItem
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+# 제목에 포함된 n-gram은 요약보다 높은 가중치
+TITLE_WEIGHT = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """한국어 친화적 토큰화: 단어별 문자 2-gram (한 글자 단어는 그대로)
+
+    조사·어미가 붙은 한국어 단어도 부분 일치하도록 형태소 분석 대신 문자 n-gram을 사용한다.
+    """
+    text = html.unescape(_TAG_RE.sub(" ", text or "")).lower()
+    grams = []
+    for word in _WORD_RE.findall(text):
+        if len(word) == 1:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+class ArticleStore:
+    """수집한 기사를 저장하는 로컬 SQLite 저장소 + 문자 2-gram 역색인
+
+    - 링크 기준 중복 제거, 피드 갱신 때마다 새 기사만 색인 (증분 갱신)
+    - max_articles / retention_days로 보관량을 제한하여 디스크 사용량 상한 유지
+    """
+
+    def __init__(self, db_path: str = ":memory:", max_articles: int = 5000, retention_days: float = 30):
+        self.max_articles = max_articles
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                link TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                published TEXT NOT NULL,
+                source TEXT NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_ingested ON articles (ingested_at);
+            CREATE TABLE IF NOT EXISTS postings (
+                gram TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                weight INTEGER NOT NULL,
+                PRIMARY KEY (gram, article_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_article ON postings (article_id);
+            """
+        )
+        self._db.commit()
+
+    def ingest(self, news_items: List[NewsItem]) -> int:
+        """기사 목록을 저장하고 색인 (이미 저장된 링크는 건너뜀). 새로 추가된 기사 수 반환"""
+        now = time.time()
+        added = 0
+        with self._lock:
+            for item in news_items:
+                link = item.link
+                if not link:
+                    continue
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO articles (link, title, summary, published, source, ingested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (link, item.title, item.summary, item.published, item.source, now)
+                )
+                if cursor.rowcount == 0:
+                    continue
+                article_id = cursor.lastrowid
+                weights = Counter()
+                for gram in tokenize(item.title):
+                    weights[gram] += TITLE_WEIGHT
+                for gram in tokenize(item.summary):
+                    weights[gram] += 1
+                self._db.executemany(
+                    "INSERT INTO postings (gram, article_id, weight) VALUES (?, ?, ?)",
+                    [(gram, article_id, weight) for gram, weight in weights.items()]
+                )
+                added += 1
+            if added:
+                self._enforce_retention(now)
+            self._db.commit()
+        return added
+
+    def _enforce_retention(self, now: float):
+        """보관 기간이 지났거나 최대 개수를 넘는 오래된 기사 삭제"""
+        cutoff = now - self.retention_days * 86400
+        stale = [row[0] for row in self._db.execute("SELECT id FROM articles WHERE ingested_at < ?", (cutoff,))]
+        count = self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0] - len(stale)
+        if count > self.max_articles:
+            stale.extend(row[0] for row in self._db.execute(
+                "SELECT id FROM articles WHERE ingested_at >= ? ORDER BY ingested_at, id LIMIT ?",
+                (cutoff, count - self.max_articles)
+            ))
+        if stale:
+            self._db.executemany("DELETE FROM postings WHERE article_id = ?", [(i,) for i in stale])
+            self._db.executemany("DELETE FROM articles WHERE id = ?", [(i,) for i in stale])
+
+    def search(self, keyword: str, max_items: int = 10, min_coverage: float = 1.0) -> List[NewsItem]:
+        """키워드의 n-gram을 포함하는 기사를 TF-IDF 점수 순으로 반환
+
+        기본값은 모든 n-gram을 포함하는 기사만 매칭한다. 자연어 질문처럼 긴 검색어는
+        min_coverage(0~1)로 포함해야 하는 n-gram 비율을 낮춰 부분 일치 기사도 찾는다.
+        """
+        grams = set(tokenize(keyword))
+        if not grams:
+            return []
+        need = len(grams) if min_coverage >= 1 else max(1, math.ceil(len(grams) * min_coverage))
+
+        with self._lock:
+            total = self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            if not total:
+                return []
+            placeholders = ",".join("?" * len(grams))
+            rows = self._db.execute(
+                f"SELECT gram, article_id, weight FROM postings WHERE gram IN ({placeholders})",
+                tuple(grams)
+            ).fetchall()
+
+            postings: Dict[str, Dict[int, int]] = {}
+            for gram, article_id, weight in rows:
+                postings.setdefault(gram, {})[article_id] = weight
+            if len(postings) < need:
+                # 필요한 수만큼의 n-gram이 색인에 없으면 매칭되는 기사도 없음
+                return []
+
+            if need == len(grams):
+                candidates = set.intersection(*(set(p) for p in postings.values()))
+            else:
+                matched = Counter(article_id for docs in postings.values() for article_id in docs)
+                candidates = {article_id for article_id, n in matched.items() if n >= need}
+            scores = Counter()
+            for gram, docs in postings.items():
+                idf = math.log(1 + total / len(docs))
+                for article_id, weight in docs.items():
+                    if article_id in candidates:
+                        scores[article_id] += weight * idf
+
+            # 점수가 같으면 최근에 저장된 기사 우선
+            top = sorted(scores, key=lambda i: (scores[i], i), reverse=True)[:max_items]
+            if not top:
+                return []
+            placeholders = ",".join("?" * len(top))
+            found = {
+                row[0]: NewsItem(title=row[1], link=row[2], summary=row[3], published=row[4], source=row[5])
+                for row in self._db.execute(
+                    f"SELECT id, title, link, summary, published, source FROM articles WHERE id IN ({placeholders})",
+                    tuple(top)
+                )
+            }
+        return [found[article_id] for article_id in top if article_id in found]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+_article_store: Optional[ArticleStore] = None
+_article_store_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """프로세스 전역 기사 저장소 반환"""
+    global _article_store
+    if _article_store is None:
+        with _article_store_lock:
+            if _article_store is None:
+                _article_store = ArticleStore(
+                    db_path=Config.ARTICLE_STORE_DB,
+                    max_articles=Config.ARTICLE_STORE_MAX_ARTICLES,
+                    retention_days=Config.ARTICLE_STORE_RETENTION_DAYS
+                )
+    return _article_store
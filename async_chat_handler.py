@@ -0,0 +1,332 @@
+import asyncio
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+import httpx
+
+from config import Config
+from chat_handler import ChatHandler, _extract_delta, _extract_text
+from http_transport import CircuitOpenError
+from async_transport import get_async_transport
+from response_cache import ResponseCache, make_key
+from api_scheduler import get_scheduler, QueueFullError
+import metrics
+
+# 이벤트 루프별 진행 중인 요청 (캐시 키 -> Task). 같은 요청이 동시에 들어오면 한 번만 호출
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+
+class AsyncChatHandler:
+    """GMS API 비동기 채팅 처리 (ChatHandler의 asyncio 대응)
+
+    - send_message / stream_message를 ChatHandler와 같은 이름·인자의 코루틴/비동기 제너레이터로 제공
+    - 같은 이벤트 루프의 호출은 httpx 커넥션 풀(AsyncHttpTransport)을 공유
+    - 요청 검증, 응답 파싱, 캐시 키, 스케줄러(동시 호출/레이트 리밋)는 내부 ChatHandler의 것을 그대로 사용
+    - send_many로 독립된 여러 요청을 동시에 보내 전체 시간이 가장 느린 요청 수준에 가깝도록 함
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, session_id: str = "default"):
+        # 설정, 헤더, 캐시, 검증 규칙은 동기 ChatHandler와 공유
+        self.handler = ChatHandler(cache=cache, session_id=session_id)
+        self.model = self.handler.model
+        self.api_endpoint = self.handler.api_endpoint
+        self.headers = self.handler.headers
+        self.cache = self.handler.cache
+        self.session_id = session_id
+
+    @asynccontextmanager
+    async def _slot(self, messages: List[Dict], max_tokens: int, on_queue_position: Optional[Callable[[int], None]]):
+        """스케줄러 호출 슬롯 점유 (대기는 스레드에서 하므로 이벤트 루프를 막지 않음)
+
+        대기 스레드는 전용 실행기를 쓴다. 기본 실행기를 쓰면 대기 스레드가 기본 실행기를 모두 차지한 채
+        슬롯을 가진 쪽의 캐시 조회/저장(asyncio.to_thread)을 막아 교착될 수 있다.
+        on_queue_position은 대기 스레드에서 호출된다.
+        """
+        scheduler = get_scheduler()
+        waiting = asyncio.get_running_loop().run_in_executor(
+            get_acquire_executor(), scheduler.acquire, self.session_id, self.handler._estimate_tokens(messages, max_tokens), on_queue_position
+        )
+        try:
+            await asyncio.shield(waiting)
+        except asyncio.CancelledError:
+            # 취소되어도 스레드의 대기는 계속되므로 슬롯을 얻으면 바로 반납
+            def release_if_granted(future):
+                if not future.cancelled() and future.exception() is None:
+                    scheduler.release()
+
+            waiting.add_done_callback(release_if_granted)
+            raise
+        try:
+            yield
+        finally:
+            scheduler.release()
+
+    async def _cache_get(self, key: str) -> Optional[str]:
+        # 공유 캐시(SQLite/Redis) 조회는 블로킹 I/O이므로 스레드에서 실행
+        return await asyncio.to_thread(self.cache.get, key)
+
+    async def send_message(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,   # UI용 (API에는 안 보냄)
+        max_tokens: int = 500,
+        use_cache: bool = True,
+        on_queue_position: Optional[Callable[[int], None]] = None
+    ) -> str:
+        """GMS API에 메시지 전송 및 응답 받기 (ChatHandler.send_message와 같은 규칙)"""
+
+        self.handler._validate(messages)
+
+        if not use_cache or self.cache is None:
+            return await self._complete(messages, max_tokens, on_queue_position)
+
+        key = make_key(self.model, messages, max_tokens)
+        cached = await self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._complete_and_store(key, messages, max_tokens, on_queue_position))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        # 기다리던 쪽 하나가 취소되어도 같은 요청을 기다리는 다른 쪽에는 영향이 없도록
+        return await asyncio.shield(task)
+
+    async def _complete_and_store(
+        self,
+        key: str,
+        messages: List[Dict],
+        max_tokens: int,
+        on_queue_position: Optional[Callable[[int], None]]
+    ) -> str:
+        text = await self._complete(messages, max_tokens, on_queue_position)
+        if text:
+            await asyncio.to_thread(self.cache.set, key, text)
+        return text
+
+    async def _complete(self, messages: List[Dict], max_tokens: int, on_queue_position: Optional[Callable[[int], None]] = None) -> str:
+        """완성(비스트리밍) 요청 전송 및 응답 텍스트 추출"""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_completion_tokens": max_tokens
+        }
+
+        try:
+            url = f"{self.api_endpoint}/chat/completions"
+            async with self._slot(messages, max_tokens, on_queue_position):
+                with metrics.span("upstream_call", mode="complete"):
+                    response = await get_async_transport().post(
+                        url,
+                        headers=self.headers,
+                        json=payload
+                    )
+
+            self.handler._raise_for_status(response, "complete")
+
+            with metrics.span("response_parse"):
+                result = response.json()
+                text = _extract_text(result)
+            if isinstance(result, dict):
+                metrics.record_usage(result.get("usage"), self.model)
+            return text
+
+        except (CircuitOpenError, QueueFullError):
+            raise
+        except httpx.HTTPError as e:
+            raise Exception(f"API 요청 실패: {e}")
+        except Exception as e:
+            raise Exception(f"채팅 처리 중 오류 발생: {e}")
+
+    async def stream_message(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,   # UI용 (API에는 안 보냄)
+        max_tokens: int = 500,
+        use_cache: bool = True,
+        on_queue_position: Optional[Callable[[int], None]] = None
+    ) -> AsyncIterator[str]:
+        """GMS API에 스트리밍 요청을 보내고 텍스트 조각을 순차적으로 반환 (async for로 사용)
+
+        제너레이터가 닫히거나 소비하던 태스크가 취소되면 업스트림 연결을 즉시 끊는다.
+        캐시 적중 시 저장된 응답을 한 번에 반환하며, 끝까지 받은 응답만 캐시에 저장한다.
+        """
+
+        self.handler._validate(messages)
+
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = make_key(self.model, messages, max_tokens)
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_completion_tokens": max_tokens,
+            "stream": True
+        }
+        if metrics.enabled():
+            payload["stream_options"] = {"include_usage": True}
+
+        async with self._slot(messages, max_tokens, on_queue_position):
+            async for delta in self._stream_completion(payload, cache_key):
+                yield delta
+
+    async def _stream_completion(self, payload: Dict, cache_key: Optional[str]) -> AsyncIterator[str]:
+        """스트리밍 요청 전송 및 SSE 응답 파싱"""
+        try:
+            url = f"{self.api_endpoint}/chat/completions"
+            started = time.perf_counter()
+            with metrics.span("upstream_call", mode="stream"):
+                response = await get_async_transport().post(
+                    url,
+                    headers={**self.headers, "Accept": "text/event-stream"},
+                    json=payload,
+                    stream=True
+                )
+        except httpx.HTTPError as e:
+            raise Exception(f"API 요청 실패: {e}")
+
+        try:
+            if response.status_code != 200:
+                await response.aread()
+            self.handler._raise_for_status(response, "stream")
+
+            # 서버가 스트리밍을 지원하지 않으면 완성 응답을 한 번에 반환
+            content_type = response.headers.get("Content-Type", "")
+            if "text/event-stream" not in content_type:
+                await response.aread()
+                with metrics.span("response_parse"):
+                    result = response.json()
+                    text = _extract_text(result)
+                if isinstance(result, dict):
+                    metrics.record_usage(result.get("usage"), self.model)
+                if text:
+                    if cache_key is not None:
+                        await asyncio.to_thread(self.cache.set, cache_key, text)
+                    yield text
+                return
+
+            # SSE 파싱: 'data: {...}' 라인 단위 (charset 미지정 시 httpx 기본값 utf-8로 디코딩)
+            chunks = []
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(chunk, dict) and chunk.get("usage"):
+                    metrics.record_usage(chunk["usage"], self.model)
+                delta = _extract_delta(chunk)
+                if delta:
+                    if not chunks:
+                        metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage="stream_first_token")
+                    chunks.append(delta)
+                    yield delta
+
+            metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage="stream_total")
+
+            text = "".join(chunks).strip()
+            if cache_key is not None and text:
+                await asyncio.to_thread(self.cache.set, cache_key, text)
+
+        except httpx.HTTPError as e:
+            raise Exception(f"API 요청 실패: {e}")
+        finally:
+            # 취소/중단 시에도 연결을 닫아 업스트림 생성을 중단시킨다
+            await response.aclose()
+
+    async def send_many(
+        self,
+        message_lists: List[List[Dict]],
+        concurrency: Optional[int] = None,
+        max_tokens: int = 500,
+        use_cache: bool = True
+    ) -> List[Union[str, Exception]]:
+        """독립된 여러 요청을 동시에 보내고 입력 순서대로 결과 반환
+
+        실패한 항목 자리에는 예외 객체가 들어가며 다른 항목에는 영향을 주지 않는다.
+        concurrency는 이 호출의 동시 요청 수 상한 (기본 Config.API_MAX_CONCURRENCY, 전역 스케줄러 한도도 적용).
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or Config.API_MAX_CONCURRENCY))
+
+        async def one(messages: List[Dict]) -> str:
+            async with semaphore:
+                return await self.send_message(messages, max_tokens=max_tokens, use_cache=use_cache)
+
+        with metrics.span("send_many"):
+            results = await asyncio.gather(*(one(messages) for messages in message_lists), return_exceptions=True)
+        errors = sum(1 for result in results if isinstance(result, BaseException))
+        if errors:
+            metrics.incr("send_many_errors_total", errors)
+        return results
+
+
+def send_many(
+    message_lists: List[List[Dict]],
+    concurrency: Optional[int] = None,
+    max_tokens: int = 500,
+    use_cache: bool = True,
+    session_id: str = "default"
+) -> List[Union[str, Exception]]:
+    """동기 코드(Streamlit 스크립트, 배치)에서 AsyncChatHandler.send_many 실행
+
+    프로세스 전역 백그라운드 이벤트 루프에서 실행하므로 httpx 연결을 호출 간에 재사용한다.
+    비동기 코드에서는 이벤트 루프를 막지 않도록 AsyncChatHandler.send_many를 직접 await해야 한다.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        AsyncChatHandler(session_id=session_id).send_many(
+            message_lists, concurrency=concurrency, max_tokens=max_tokens, use_cache=use_cache
+        ),
+        get_background_loop()
+    )
+    try:
+        return future.result()
+    except BaseException:
+        # 호출한 쪽이 중단되면(KeyboardInterrupt, Streamlit 재실행 등) 남은 요청도 취소
+        future.cancel()
+        raise
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_acquire_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_acquire_executor() -> ThreadPoolExecutor:
+    """스케줄러 슬롯 대기 전용 스레드 풀 (동시 호출 수 + 대기열 상한만큼, 대기 요청마다 스레드 하나)"""
+    global _acquire_executor
+    if _acquire_executor is None:
+        with _loop_lock:
+            if _acquire_executor is None:
+                _acquire_executor = ThreadPoolExecutor(
+                    max_workers=Config.API_MAX_CONCURRENCY + Config.API_MAX_QUEUE,
+                    thread_name_prefix="api-slot-wait"
+                )
+    return _acquire_executor
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """동기 코드의 비동기 호출을 실행하는 프로세스 전역 이벤트 루프 (전용 데몬 스레드에서 실행)"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-chat-loop", daemon=True).start()
+                _loop = loop
+    return _loop
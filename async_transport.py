@@ -0,0 +1,135 @@
+import asyncio
+import ssl
+import threading
+import weakref
+from typing import Dict, Optional
+
+import certifi
+import httpx
+
+from http_transport import IDEMPOTENT_METHODS, RETRYABLE_STATUS, CircuitOpenError, HttpTransport, get_transport
+
+# 요청이 서버에 전달되지 않은 것이 확실한 오류 (비멱등 요청은 이 경우만 재시도)
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+_ssl_context: Optional[ssl.SSLContext] = None
+_ssl_context_lock = threading.Lock()
+
+
+def _get_ssl_context() -> ssl.SSLContext:
+    """프로세스 전역 SSL 컨텍스트 (클라이언트마다 CA 번들을 다시 읽으면 수십 ms가 걸림)"""
+    global _ssl_context
+    if _ssl_context is None:
+        with _ssl_context_lock:
+            if _ssl_context is None:
+                _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return _ssl_context
+
+
+class AsyncHttpTransport:
+    """HttpTransport의 비동기(httpx.AsyncClient) 대응
+
+    이벤트 루프 하나에서 공유하는 keep-alive 커넥션 풀을 사용하고, 재시도/백오프 설정과 호스트별
+    서킷 브레이커는 동기 전송 계층의 것을 그대로 써서 동기/비동기 호출이 같은 장애 상태를 본다.
+    """
+
+    def __init__(self, transport: HttpTransport):
+        self.transport = transport
+        connect_timeout, read_timeout = transport.timeout
+        self.client = httpx.AsyncClient(
+            verify=_get_ssl_context(),
+            limits=httpx.Limits(max_connections=transport.pool_size, max_keepalive_connections=transport.pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict] = None,
+        stream: bool = False,
+        **kwargs
+    ) -> httpx.Response:
+        """재시도/서킷 브레이커가 적용된 HTTP 요청 (HttpTransport.request와 같은 규칙)
+
+        stream=True이면 본문을 읽지 않은 응답을 반환하므로 호출한 쪽에서 aclose()해야 한다.
+        """
+        transport = self.transport
+        breaker = transport.breaker_for(url)
+        retryable_errors = httpx.TransportError if method.upper() in IDEMPOTENT_METHODS else _NOT_SENT_ERRORS
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError("API 엔드포인트 장애로 요청을 일시 차단했습니다. 잠시 후 다시 시도하세요.")
+
+            try:
+                request = self.client.build_request(method, url, headers=headers, **kwargs)
+                response = await self.client.send(request, stream=stream)
+            except retryable_errors:
+                breaker.record_failure()
+                if attempt >= transport.max_retries:
+                    raise
+                await asyncio.sleep(transport._backoff(attempt))
+                attempt += 1
+                continue
+            except httpx.TransportError:
+                # 비멱등 요청의 읽기 타임아웃/연결 끊김은 서버가 이미 처리 중일 수 있어 재시도하지 않음
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # 취소(CancelledError) 등 그 밖의 예외에도 half-open 시험 표시를 풀어 호스트가 계속 차단되지 않게 함
+                breaker.release_probe()
+                raise
+
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response
+
+            # 429는 엔드포인트가 살아 있다는 뜻이므로 브레이커 실패로 세지 않는다
+            if response.status_code == 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+            if attempt >= transport.max_retries:
+                return response
+
+            retry_after = transport._parse_retry_after(response.headers.get("Retry-After"))
+            await response.aclose()
+            await asyncio.sleep(transport._backoff(attempt, retry_after))
+            attempt += 1
+
+    async def post(self, url: str, headers: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, headers=headers, **kwargs)
+
+    async def get(self, url: str, headers: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, headers=headers, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# httpx.AsyncClient의 연결은 만든 이벤트 루프에 묶이므로 루프마다 하나씩 둔다
+_async_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpTransport]" = weakref.WeakKeyDictionary()
+_async_transports_lock = threading.Lock()
+
+
+def get_async_transport() -> AsyncHttpTransport:
+    """현재 이벤트 루프의 모든 비동기 호출이 공유하는 AsyncHttpTransport 반환"""
+    loop = asyncio.get_running_loop()
+    with _async_transports_lock:
+        transport = _async_transports.get(loop)
+        if transport is None:
+            transport = AsyncHttpTransport(get_transport())
+            _async_transports[loop] = transport
+        return transport
+
+
+async def close_async_transport():
+    """현재 이벤트 루프의 AsyncHttpTransport 연결 정리 (루프를 닫기 전에 호출)"""
+    with _async_transports_lock:
+        transport = _async_transports.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport.aclose()
@@ -0,0 +1,270 @@
+"""브라우저 없이 채팅/뉴스 요약 작업을 일괄 실행하는 CLI
+
+작업 파일은 JSON Lines (한 줄에 작업 하나):
+
+    {"id": "q1", "prompt": "파이썬 데코레이터 설명해줘"}
+    {"id": "q2", "prompt": "삼성전자 뉴스 요약해줘"}            # 기사 검색으로 판단되면 뉴스 요약
+    {"id": "d1", "type": "news_digest", "category": "기술"}     # 카테고리 뉴스 다이제스트
+    {"id": "c1", "type": "chat", "messages": [...], "max_tokens": 1000}
+
+- id가 없으면 request_id, 그다음 줄 번호를 사용하고, prompt 대신 body/content 필드도 받는다.
+- type을 생략하면 채팅 화면과 같은 기사 검색 판단(detect_article_search)으로 경로를 고른다.
+- 작업은 크기가 정해진 워커 풀에서 실행되며 GMS 호출은 프로세스 전역 스케줄러의
+  분당 요청/토큰 한도를 따른다.
+- 결과는 끝나는 순서대로 출력 파일에 한 줄씩 추가된다. 같은 출력 파일로 다시 실행하면
+  이미 성공한 작업은 건너뛰므로 중단 후 이어서 실행할 수 있다.
+
+    python batch.py jobs.jsonl --out results.jsonl --workers 8 --rpm 60
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Optional, Set, Tuple
+from config import Config
+
+JOB_TYPES = ("auto", "chat", "news_search", "news_digest")
+
+
+def read_jobs(path: str) -> Iterator[Tuple[str, Dict]]:
+    """작업 파일에서 (작업 id, 작업) 순회 (빈 줄 무시, 깨진 줄은 경고 후 건너뜀)"""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                print(f"작업 파일 {line_no}번째 줄을 건너뜁니다: {e}", file=sys.stderr)
+                continue
+            if not isinstance(job, dict):
+                print(f"작업 파일 {line_no}번째 줄을 건너뜁니다: 객체가 아닙니다", file=sys.stderr)
+                continue
+            job_id = job.get("id") or job.get("request_id") or f"line-{line_no}"
+            yield str(job_id), job
+
+
+def completed_ids(path: str, retry_errors: bool = True) -> Set[str]:
+    """기존 결과 파일에서 이미 끝난 작업 id 수집 (중단으로 잘린 마지막 줄은 무시)"""
+    done: Set[str] = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                if record.get("status") == "ok" or not retry_errors:
+                    done.add(str(record.get("id")))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def job_prompt(job: Dict) -> str:
+    for field in ("prompt", "body", "content"):
+        value = job.get(field)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+
+class BatchRunner:
+    """작업 하나를 채팅 화면과 같은 경로(NewsHandler/ChatHandler)로 실행"""
+
+    def __init__(self, use_cache: bool = True, max_tokens: Optional[int] = None):
+        self.use_cache = use_cache
+        self.max_tokens = max_tokens or Config.DEFAULT_MAX_TOKENS
+
+    def run(self, job: Dict) -> Tuple[str, str]:
+        """(실제 실행한 작업 유형, 결과 텍스트) 반환"""
+        from intent import detect_article_search
+        from news_handler import NewsHandler
+
+        job_type = job.get("type") or "auto"
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"알 수 없는 작업 유형입니다: {job_type}")
+
+        if job_type == "news_digest":
+            category = job.get("category") or "최신뉴스"
+            max_items = int(job.get("max_items", Config.MAX_NEWS_ITEMS))
+            news_items = NewsHandler.fetch_news(category, max_items=max_items)
+            return job_type, NewsHandler.summarize_news(news_items, max_articles=max_items)
+
+        prompt = job_prompt(job)
+        keyword = job.get("keyword")
+        if job_type == "auto" and not job.get("messages"):
+            if not prompt:
+                raise ValueError("prompt(또는 body/content)가 비어 있습니다.")
+            is_search, keyword = detect_article_search(prompt)
+            job_type = "news_search" if is_search else "chat"
+
+        if job_type == "news_search":
+            keyword = keyword or prompt
+            if not keyword:
+                raise ValueError("검색어가 비어 있습니다.")
+            category = job.get("category") or "최신뉴스"
+            news_items = NewsHandler.search_news(keyword, category=category, max_items=Config.MAX_NEWS_ITEMS)
+            return job_type, NewsHandler.summarize_news(news_items, max_articles=Config.MAX_NEWS_ITEMS)
+
+        return "chat", self._chat(job, prompt)
+
+    def _chat(self, job: Dict, prompt: str) -> str:
+        from chat_handler import ChatHandler
+
+        messages = job.get("messages")
+        if not messages:
+            if not prompt:
+                raise ValueError("prompt(또는 body/content)가 비어 있습니다.")
+            messages = []
+            if job.get("developer"):
+                messages.append({"role": "developer", "content": job["developer"]})
+            messages.append({"role": "system", "content": job.get("system") or Config.SYSTEM_PROMPT})
+            messages.append({"role": "user", "content": prompt})
+
+        # 배치 작업은 하나의 스케줄러 세션으로 묶어 대화형 세션보다 앞서지 않게 한다
+        handler = ChatHandler(session_id="batch")
+        return handler.send_message(
+            messages,
+            max_tokens=int(job.get("max_tokens", self.max_tokens)),
+            use_cache=self.use_cache
+        )
+
+
+class ResultWriter:
+    """결과를 끝나는 순서대로 JSON Lines 파일에 추가 (줄 단위 flush)"""
+
+    def __init__(self, path: Optional[str]):
+        self._file = open(path, "a+", encoding="utf-8") if path else sys.stdout
+        self._lock = threading.Lock()
+        if path:
+            # 중단으로 마지막 줄이 잘린 경우 새 결과가 그 줄에 이어 붙지 않도록 줄을 바꾼다
+            self._file.seek(0, 2)
+            if self._file.tell() > 0:
+                with open(path, "rb") as f:
+                    f.seek(-1, 2)
+                    if f.read(1) != b"\n":
+                        self._file.write("\n")
+
+    def write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+def run_batch(
+    jobs_path: str,
+    out_path: Optional[str],
+    workers: int = 4,
+    use_cache: bool = True,
+    retry_errors: bool = True,
+    max_tokens: Optional[int] = None
+) -> Dict[str, int]:
+    """작업 파일을 워커 풀로 실행하고 결과를 스트리밍 기록. {ok, error, skipped} 개수 반환"""
+    done = completed_ids(out_path, retry_errors) if out_path else set()
+    runner = BatchRunner(use_cache=use_cache, max_tokens=max_tokens)
+    writer = ResultWriter(out_path)
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+
+    def execute(job_id: str, job: Dict) -> Dict:
+        start = time.perf_counter()
+        record = {"id": job_id}
+        try:
+            job_type, result = runner.run(job)
+            record.update(type=job_type, status="ok", result=result)
+        except Exception as e:
+            record.update(type=job.get("type") or "auto", status="error", error=str(e))
+        record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        writer.write(record)
+        return record
+
+    def collect(finished):
+        for future in finished:
+            counts[future.result()["status"]] += 1
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+    pending = set()
+    try:
+        for job_id, job in read_jobs(jobs_path):
+            if job_id in done:
+                counts["skipped"] += 1
+                continue
+            # 제출량을 워커 수의 2배로 제한해 큰 작업 파일도 메모리에 모두 올리지 않는다
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+            pending.add(executor.submit(execute, job_id, job))
+            done.add(job_id)
+        finished, pending = wait(pending)
+        collect(finished)
+    except KeyboardInterrupt:
+        # 실행 중인 작업만 마무리하고 나머지는 다음 실행에서 이어서 처리
+        print("중단 요청: 실행 중인 작업이 끝나면 종료합니다.", file=sys.stderr)
+        for future in pending:
+            future.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        writer.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅/뉴스 요약 작업 일괄 실행")
+    parser.add_argument("jobs", help="작업 JSON Lines 파일")
+    parser.add_argument("--out", help="결과 JSON Lines 파일 (없으면 표준 출력, 지정 시 이어서 실행 가능)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 실행 작업 수")
+    parser.add_argument("--rpm", type=int, default=Config.API_REQUESTS_PER_MINUTE, help="GMS 분당 요청 한도")
+    parser.add_argument("--tpm", type=int, default=Config.API_TOKENS_PER_MINUTE, help="GMS 분당 토큰 한도")
+    parser.add_argument("--max-tokens", type=int, default=None, help="작업별 기본 최대 응답 토큰 수")
+    parser.add_argument("--queue-timeout", type=float, default=600, help="레이트 리밋 대기 허용 시간(초)")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 사용하지 않음")
+    parser.add_argument("--skip-errors", action="store_true", help="이전 실행에서 실패한 작업도 다시 실행하지 않음")
+    args = parser.parse_args()
+
+    try:
+        Config.validate()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+    # 스케줄러는 처음 사용할 때 만들어지므로 그 전에 배치용 한도를 설정한다
+    Config.API_MAX_CONCURRENCY = max(1, args.workers)
+    Config.API_REQUESTS_PER_MINUTE = args.rpm
+    Config.API_TOKENS_PER_MINUTE = args.tpm
+    Config.API_MAX_QUEUE = max(Config.API_MAX_QUEUE, args.workers)
+    Config.API_QUEUE_TIMEOUT = args.queue_timeout
+
+    started = time.perf_counter()
+    try:
+        counts = run_batch(
+            args.jobs,
+            args.out,
+            workers=max(1, args.workers),
+            use_cache=not args.no_cache,
+            retry_errors=not args.skip_errors,
+            max_tokens=args.max_tokens
+        )
+    except KeyboardInterrupt:
+        sys.exit(130)
+    elapsed = time.perf_counter() - started
+    print(
+        f"완료: 성공 {counts['ok']}건, 실패 {counts['error']}건, 건너뜀 {counts['skipped']}건 ({elapsed:.1f}초)",
+        file=sys.stderr
+    )
+    if counts["error"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
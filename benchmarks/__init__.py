@@ -0,0 +1,12 @@
+"""로컬 벤치마크 모음
+
+로컬 목 서버(mock_gms, mock_rss)를 대상으로 실행하므로 외부 네트워크가 필요 없다.
+
+    python -m benchmarks.run --out results.json
+    python -m benchmarks.compare baseline.json results.json
+    python -m benchmarks.bench_rss_parser
+"""
+import os
+
+# ChatHandler는 GMS_API_KEY가 없으면 요청을 보내지 않으므로 목 서버용 더미 키를 채워 둔다
+os.environ.setdefault("GMS_API_KEY", "benchmark-key")
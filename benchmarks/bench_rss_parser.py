@@ -0,0 +1,69 @@
+"""RSS 파서 벤치마크: 빠른 경로(parse_rss) vs feedparser
+
+저장된 Google News 형식 픽스처(benchmarks/fixtures)로 파싱 시간과 항목당 메모리를 측정한다.
+
+    python -m benchmarks.bench_rss_parser [--repeat 50]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from rss_parser import parse_rss, parse_with_feedparser
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def time_parse(func, data: bytes, max_items, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data, max_items)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3)
+    }
+
+
+def retained_bytes_per_item(func, data: bytes) -> float:
+    """파싱 결과를 보관할 때 항목당 남는 메모리 (파싱 중 임시 할당 제외)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = func(data, None)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return round(retained / max(len(items), 1), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    for path in sorted(FIXTURES.glob("*.xml")):
+        data = path.read_bytes()
+        for name, func in (("parse_rss", parse_rss), ("feedparser", parse_with_feedparser)):
+            for max_items in (None, 10):
+                results.append({
+                    "fixture": path.name,
+                    "parser": name,
+                    "max_items": max_items,
+                    **time_parse(func, data, max_items, args.repeat)
+                })
+            results.append({
+                "fixture": path.name,
+                "parser": name,
+                "bytes_per_item": retained_bytes_per_item(func, data)
+            })
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""시작 비용 벤치마크: 모듈 import 시간과 메시지당 의도 분류 시간
+
+import 시간은 모듈마다 새 파이썬 프로세스를 띄워 측정하고(중앙값), 의도 분류는 미리 컴파일한 정규식
+(intent.detect_article_search)과 목록을 순차 replace하던 기존 방식을 같은 메시지로 비교한다.
+
+    python -m benchmarks.bench_startup [--runs 7] [--messages 20000]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from intent import ENGLISH_STOPWORDS, REMOVE_TOKENS, SEARCH_KEYWORDS, detect_article_search
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["config", "intent", "chat_handler", "news_handler", "app"]
+
+_IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+SAMPLE_MESSAGES = [
+    "오늘 날씨 어때?",
+    "반도체 관련 최신 뉴스 요약해줘",
+    "삼성전자 실적 기사 검색해줘",
+    "hello, how are you?",
+    "please search article about AI regulation",
+    "어제 얘기한 거 다시 설명해줄래?",
+    "환율 관련 기사 정리해줘",
+    "점심 메뉴 추천해줘",
+    "news summary: 전기차 배터리",
+    "부동산 정책 요청 사항 알려줘"
+]
+
+
+def import_ms(module: str, runs: int) -> dict:
+    """새 프로세스에서 모듈 하나를 import하는 시간 (ms)"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env.setdefault("GMS_API_KEY", "benchmark-key")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return {"module": module, "p50_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1)}
+
+
+def legacy_detect(text: str):
+    """비교용: 키워드 목록을 메시지마다 순차 검사/replace하던 기존 구현"""
+    t = text.lower()
+    if not any(k in t for k in SEARCH_KEYWORDS):
+        return False, None
+    s = t
+    for tok in REMOVE_TOKENS:
+        s = s.replace(tok, " ")
+    for tok in ENGLISH_STOPWORDS:
+        s = s.replace(tok, " ")
+    s = re.sub(r"[^\w\s\u3131-\u318E\uAC00-\uD7A3]", " ", s)
+    keyword = " ".join([w for w in s.split() if len(w) > 1]).strip()
+    return True, keyword or text.strip()
+
+
+def classify_us(func, messages) -> float:
+    """메시지당 평균 분류 시간 (마이크로초)"""
+    started = time.perf_counter()
+    for message in messages:
+        func(message)
+    return (time.perf_counter() - started) / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="모듈당 import 측정 횟수")
+    parser.add_argument("--messages", type=int, default=20000, help="분류 시간 측정에 쓰는 메시지 수")
+    args = parser.parse_args()
+
+    imports = [import_ms(module, args.runs) for module in MODULES]
+
+    rng = random.Random(0)
+    messages = [f"{rng.choice(SAMPLE_MESSAGES)} {i}" for i in range(args.messages)]
+    mismatches = sum(1 for m in messages if detect_article_search(m) != legacy_detect(m))
+    classification = {
+        "messages": len(messages),
+        "compiled_us": round(min(classify_us(detect_article_search, messages) for _ in range(3)), 2),
+        "legacy_us": round(min(classify_us(legacy_detect, messages) for _ in range(3)), 2),
+        "mismatches": mismatches
+    }
+    print(json.dumps({"imports": imports, "classification": classification}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
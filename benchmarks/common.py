@@ -0,0 +1,92 @@
+"""벤치마크 공용 도구: 목 서버 연결, 부하 실행, 백분위 계산"""
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+from config import Config
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """클라이언트가 연결을 끊을 때(스트림 취소 등) 스택 트레이스를 출력하지 않는 목 서버"""
+
+    daemon_threads = True
+    # 기본 listen backlog(5)로는 동시 연결이 몰릴 때 SYN 재전송(약 1초)이 생겨 지연이 부풀려진다
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        error = sys.exc_info()[1]
+        if isinstance(error, ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def configure_for_benchmark(gms_url: str, rss_url: str):
+    """핸들러를 로컬 목 서버로 연결하고 측정을 왜곡하는 설정(레이트 리밋, 응답 캐시)을 해제
+
+    프로세스 전역 싱글턴(스케줄러, 캐시, 저장소)이 만들어지기 전에 호출해야 한다.
+    """
+    from news_handler import NewsHandler
+
+    Config.GMS_API_ENDPOINT = gms_url
+    Config.RESPONSE_CACHE_ENABLED = False
+    Config.ARTICLE_STORE_DB = ":memory:"
+    Config.API_MAX_CONCURRENCY = 1024
+    Config.API_REQUESTS_PER_MINUTE = 10 ** 9
+    Config.API_TOKENS_PER_MINUTE = 10 ** 12
+    Config.API_MAX_QUEUE = 10 ** 6
+    Config.HTTP_POOL_SIZE = 64
+
+    for category in NewsHandler.NEWS_FEEDS:
+        NewsHandler.NEWS_FEEDS[category] = f"{rss_url}/rss/{category}"
+    NewsHandler.SEARCH_URL = rss_url + "/rss/search?q={query}"
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {}
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+
+def run_load(func: Callable[[int], object], requests: int, concurrency: int) -> Dict:
+    """func(i)를 requests번, concurrency개 스레드로 실행하여 지연 백분위와 처리량 측정"""
+    latencies: List[float] = []
+    errors = 0
+
+    def one(i: int):
+        start = time.perf_counter()
+        try:
+            func(i)
+            return (time.perf_counter() - start) * 1000, None
+        except Exception as e:
+            return (time.perf_counter() - start) * 1000, e
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed, error in executor.map(one, range(requests)):
+            if error is None:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_per_s": round(requests / wall, 2) if wall else None,
+        **percentiles(latencies)
+    }
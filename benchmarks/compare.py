@@ -0,0 +1,51 @@
+"""두 벤치마크 결과(JSON)를 비교하여 회귀 항목 출력
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.1]
+
+p50/p99 지연이 threshold 이상 늘었거나 처리량이 threshold 이상 줄면 회귀로 보고 종료 코드 1을 반환한다.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {
+        (r["benchmark"], json.dumps(r["params"], sort_keys=True, ensure_ascii=False)): r
+        for r in report["results"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 판단할 변화율 (기본 10%%)")
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        name, params = key
+        for metric, worse_if_higher in (("p50_ms", True), ("p99_ms", True), ("throughput_per_s", False)):
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change > args.threshold if worse_if_higher else change < -args.threshold
+            if regressed:
+                regressions += 1
+            marker = "REGRESSION" if regressed else "ok"
+            print(f"{marker:10} {name} {params} {metric}: {old} -> {new} ({change:+.1%})")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""ChatbotApp 다중 세션 부하 테스트 (용량 산정용)
+
+Streamlit AppTest로 세션마다 ChatbotApp.run을 헤드리스로 실행하고, 시나리오(채팅, 기사 검색 질의,
+카테고리 변경, 뉴스 새로고침)를 동시에 재생한다. 백엔드는 로컬 목 GMS/RSS 서버를 사용한다.
+
+동시 세션 수를 단계적으로 늘리며 재실행(rerun) 지연, 세션당 CPU/메모리를 측정하고,
+지연이 기준 대비 급증하거나 처리량이 더 늘지 않는 지점을 포화 지점으로 보고한다.
+
+    python -m benchmarks.loadtest --sessions 1,2,4,8,16 --turns 6 --out loadtest.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.common import configure_for_benchmark, percentiles
+from benchmarks.mock_gms import MockGMSServer
+from benchmarks.mock_rss import MockRSSServer
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+CHAT_PROMPTS = [
+    "안녕하세요, 오늘 날씨 어때요?",
+    "파이썬에서 리스트와 튜플의 차이를 알려줘",
+    "주말에 볼 만한 영화 추천해줘",
+    "간단한 자기소개 부탁해",
+    "스트림릿 앱 성능을 높이는 방법은?"
+]
+SEARCH_PROMPTS = [
+    "삼성전자 뉴스 요약해줘",
+    "반도체 관련 기사 검색해줘",
+    "최신 경제 뉴스 정리해줘"
+]
+
+# 시나리오 동작별 가중치 (실사용 비율 근사)
+ACTION_WEIGHTS = {"chat": 5, "search": 2, "category": 2, "refresh": 1}
+
+
+def read_rss_bytes() -> Optional[int]:
+    """현재 프로세스 상주 메모리(RSS, 바이트). /proc이 없으면 None"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def prepare_concurrent_apptest():
+    """AppTest 여러 개를 한 프로세스에서 동시에 실행할 수 있도록 전역 상태를 보정 (부하 테스트 전용)
+
+    - AppTest는 실행마다 전역 Runtime._instance에 목 런타임을 넣고 끝나면 None으로 되돌리므로,
+      다른 세션의 스크립트가 실행 중이면 "Runtime hasn't been created!"로 실패한다.
+      비어 있을 때는 마지막으로 설정된 목 런타임을 돌려준다.
+    - 실행마다 config.get_option을 패치/복원하므로 global.appTest가 도중에 꺼질 수 있다. 전역으로 켜 둔다.
+    - 실행마다 새 ScriptCache로 app.py를 다시 컴파일한다. 실제 서버처럼 바이트코드 캐시 하나를 공유한다
+      (동시 ast.parse는 CPython 3.11에서 SystemError를 낼 수 있다).
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    if getattr(Runtime, "_loadtest_shared", False):
+        return
+    original_instance = Runtime.instance.__func__
+    last = {}
+
+    def instance(cls):
+        current = cls._instance
+        if current is not None:
+            last["runtime"] = current
+            return current
+        if "runtime" in last:
+            return last["runtime"]
+        return original_instance(cls)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+    Runtime._loadtest_shared = True
+
+    config.set_option("global.appTest", True)
+
+    shared_cache = ScriptCache()
+    compile_lock = threading.Lock()
+    original_get_bytecode = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            return original_get_bytecode(shared_cache, script_path)
+
+    ScriptCache.get_bytecode = get_bytecode
+
+
+class SimulatedSession:
+    """AppTest로 구동하는 가상 사용자 한 명"""
+
+    def __init__(self, index: int, seed: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.random = random.Random(seed)
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.samples: Dict[str, List[float]] = {}
+        self.errors = 0
+
+    def _timed(self, action: str, step):
+        start = time.perf_counter()
+        try:
+            step()
+            if self.app.exception:
+                self.errors += 1
+                return
+        except Exception as e:
+            print(f"[session {self.index}] {action} 실패: {e}", file=sys.stderr)
+            self.errors += 1
+            return
+        self.samples.setdefault(action, []).append((time.perf_counter() - start) * 1000)
+
+    def open(self):
+        self._timed("initial", self.app.run)
+
+    def next_action(self) -> str:
+        actions = list(ACTION_WEIGHTS)
+        return self.random.choices(actions, weights=[ACTION_WEIGHTS[a] for a in actions])[0]
+
+    def perform(self, action: str):
+        app = self.app
+        # 요소 조회도 단계 안에서 수행 (이전 재실행이 실패해 요소가 없으면 오류로 집계)
+        if action in ("chat", "search"):
+            prompt = self.random.choice(CHAT_PROMPTS if action == "chat" else SEARCH_PROMPTS)
+            self._timed(action, lambda: app.chat_input(key="main_chat_input").set_value(prompt).run())
+        elif action == "category":
+            def select_other_category():
+                selectbox = app.selectbox(key="news_category")
+                choices = [c for c in selectbox.options if c != selectbox.value]
+                selectbox.select(self.random.choice(choices)).run()
+
+            self._timed(action, select_other_category)
+        elif action == "refresh":
+            self._timed(action, lambda: next(b for b in app.button if "새로고침" in b.label).click().run())
+
+
+def run_level(sessions: int, turns: int, think_time: float, timeout: float, seed: int) -> Dict:
+    """동시 세션 sessions개로 시나리오를 재생하고 지연/자원 사용량 집계"""
+    prepare_concurrent_apptest()
+    rss_before = read_rss_bytes()
+    cpu_before = time.process_time()
+    users = [SimulatedSession(i, seed + i, timeout) for i in range(sessions)]
+    barrier = threading.Barrier(sessions)
+
+    def drive(user: SimulatedSession):
+        user.open()
+        # 모든 세션이 열린 뒤 동시에 시나리오 시작
+        barrier.wait()
+        for _ in range(turns):
+            if think_time:
+                time.sleep(user.random.uniform(0, think_time * 2))
+            user.perform(user.next_action())
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(user,), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    rss_after = read_rss_bytes()
+
+    by_action: Dict[str, List[float]] = {}
+    for user in users:
+        for action, samples in user.samples.items():
+            by_action.setdefault(action, []).extend(samples)
+    reruns = [s for action, samples in by_action.items() if action != "initial" for s in samples]
+
+    result = {
+        "sessions": sessions,
+        "turns": turns,
+        "errors": sum(user.errors for user in users),
+        "wall_s": round(wall, 3),
+        "reruns_per_s": round(len(reruns) / wall, 2) if wall else None,
+        "rerun": percentiles(reruns),
+        "actions": {action: percentiles(samples) for action, samples in sorted(by_action.items())},
+        "cpu_s": round(cpu, 3),
+        "cpu_ms_per_rerun": round(cpu * 1000 / len(reruns), 3) if reruns else None,
+        "cpu_utilization": round(cpu / wall, 3) if wall else None,
+        "peak_rss_mb": round(peak_rss_bytes() / 2 ** 20, 1)
+    }
+    if rss_before is not None and rss_after is not None:
+        result["rss_per_session_kb"] = round((rss_after - rss_before) / sessions / 1024, 1)
+    # 세션 상태 크기(메시지 수)는 메모리 해석에 참고
+    result["messages_per_session"] = round(
+        sum(len(user.app.session_state["messages"]) for user in users if "messages" in user.app.session_state) / sessions, 1
+    )
+    # 메모리에 남아 있는 대화 기록 크기 (나머지는 디스크로 내려감)
+    from conversation_store import get_conversation_store
+    result["conversation_resident_kb_per_session"] = round(get_conversation_store().resident_bytes() / sessions / 1024, 1)
+    return result
+
+
+def find_saturation(levels: List[Dict], latency_factor: float, min_gain: float) -> Dict:
+    """포화 지점 판정
+
+    - p90 재실행 지연이 단일 세션 기준의 latency_factor배를 넘거나
+    - 세션을 늘려도 처리량 증가율이 min_gain 미만이면 포화로 본다.
+    """
+    if not levels or not levels[0]["rerun"]:
+        return {"sessions": None, "reason": "측정값 없음"}
+    baseline = levels[0]["rerun"]["p90_ms"]
+    previous = levels[0]
+    for level in levels[1:]:
+        if not level["rerun"]:
+            continue
+        if level["rerun"]["p90_ms"] > baseline * latency_factor:
+            return {
+                "sessions": level["sessions"],
+                "last_healthy": previous["sessions"],
+                "reason": f"p90 재실행 지연 {level['rerun']['p90_ms']}ms > 기준 {baseline}ms x {latency_factor}"
+            }
+        if level["reruns_per_s"] < previous["reruns_per_s"] * (1 + min_gain):
+            return {
+                "sessions": level["sessions"],
+                "last_healthy": previous["sessions"],
+                "reason": f"처리량 정체 ({previous['reruns_per_s']} -> {level['reruns_per_s']} rerun/s)"
+            }
+        previous = level
+    return {"sessions": None, "last_healthy": previous["sessions"], "reason": "측정 범위 내 포화 없음"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChatbotApp 다중 세션 부하 테스트")
+    parser.add_argument("--out", help="결과 JSON 파일 (없으면 표준 출력)")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="동시 세션 수 단계 (쉼표 구분)")
+    parser.add_argument("--turns", type=int, default=6, help="세션당 시나리오 동작 수")
+    parser.add_argument("--think-time", type=float, default=0.0, help="동작 사이 평균 대기 시간(초)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="재실행 한 번의 제한 시간(초)")
+    parser.add_argument("--seed", type=int, default=7, help="시나리오 난수 시드")
+    parser.add_argument("--gms-latency", type=float, default=0.2, help="목 GMS 첫 응답 지연(초)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="목 GMS 스트리밍 청크 간격(초)")
+    parser.add_argument("--rss-latency", type=float, default=0.05, help="목 RSS 응답 지연(초)")
+    parser.add_argument("--latency-factor", type=float, default=2.0, help="포화 판정: 기준 대비 p90 지연 배수")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="포화 판정: 최소 처리량 증가율")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.sessions.split(",") if x]
+    # 메인 스레드에서 AppTest를 만들 때마다 나오는 "missing ScriptRunContext" 경고 억제
+    # (Streamlit이 설정 로드 시 로거 레벨을 다시 지정하므로 레벨 대신 필터 사용)
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage()
+    )
+    results = []
+    with MockGMSServer(latency=args.gms_latency, token_delay=args.token_delay) as gms, \
+            MockRSSServer(latency=args.rss_latency) as rss:
+        configure_for_benchmark(gms.url, rss.url)
+        for sessions in levels:
+            result = run_level(sessions, args.turns, args.think_time, args.timeout, args.seed)
+            results.append(result)
+            print(
+                f"sessions={sessions} rerun p50={result['rerun'].get('p50_ms')}ms "
+                f"p90={result['rerun'].get('p90_ms')}ms {result['reruns_per_s']} rerun/s "
+                f"cpu={result['cpu_utilization']} errors={result['errors']}",
+                file=sys.stderr
+            )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args)
+        },
+        "levels": results,
+        "saturation": find_saturation(results, args.latency_factor, args.min_gain)
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
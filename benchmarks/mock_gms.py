@@ -0,0 +1,140 @@
+"""OpenAI 호환 /chat/completions 목 서버 (지연, 스트리밍, 오류 주입)"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Optional
+
+from benchmarks.common import QuietHTTPServer
+
+
+class MockGMSServer:
+    """로컬 GMS 대역 서버
+
+    Args:
+        latency: 응답(또는 첫 청크) 전 대기 시간(초)
+        token_delay: 스트리밍 청크 사이 대기 시간(초)
+        chunks: 응답을 구성하는 청크 수
+        error_rate: 오류 응답 비율 (0~1)
+        error_status: 주입할 오류 상태 코드 (429면 Retry-After 포함)
+        shape: 완성 응답 포맷 ("choices" 또는 "output_text")
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        token_delay: float = 0.005,
+        chunks: int = 20,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        shape: str = "choices",
+        port: int = 0
+    ):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.shape = shape
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = QuietHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더/본문 분할 전송 시 Nagle + delayed ACK로 생기는 ~40ms 지연 방지
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                    fail = random.random() < server.error_rate
+                    if fail:
+                        server.errors += 1
+
+                time.sleep(server.latency)
+                if fail:
+                    headers = {"Retry-After": "0"} if server.error_status == 429 else None
+                    self._send_json(server.error_status, {"error": {"message": "injected error"}}, headers)
+                    return
+
+                words = [f"토큰{i} " for i in range(server.chunks)]
+                prompt_tokens = sum(len(str(m.get("content", ""))) for m in payload.get("messages", []))
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": server.chunks}
+
+                if not payload.get("stream"):
+                    if server.shape == "output_text":
+                        body = {"output_text": "".join(words), "usage": usage}
+                    else:
+                        body = {"choices": [{"message": {"role": "assistant", "content": "".join(words)}}], "usage": usage}
+                    self._send_json(200, body)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for word in words:
+                        if server.shape == "output_text":
+                            event = {"type": "response.output_text.delta", "delta": word}
+                        else:
+                            event = {"choices": [{"delta": {"content": word}}]}
+                        self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                        time.sleep(server.token_delay)
+                    if (payload.get("stream_options") or {}).get("include_usage"):
+                        # OpenAI와 같이 choices가 빈 마지막 청크로 토큰 사용량 전달
+                        event = {"choices": [], "usage": usage}
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # 클라이언트가 스트림을 취소한 경우
+                    pass
+
+        return Handler
+
+    def start(self) -> "MockGMSServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-gms", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,155 @@
+"""Redis 프로토콜(RESP) 목 서버 (cache_backend.RedisBackend가 쓰는 명령만 지원)"""
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class MockRedisServer:
+    """로컬 Redis 대역 서버
+
+    PING, GET, SET (EX/PX/NX/XX), DEL, EXISTS, SCAN (MATCH/COUNT), FLUSHDB, SELECT, AUTH를 지원한다.
+    여러 프로세스가 같은 캐시를 공유하는 상황을 Redis 설치 없이 재현하는 용도.
+    """
+
+    def __init__(self, port: int = 0):
+        self.commands = 0
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and time.time() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def execute(self, args: List[bytes]):
+        """명령 하나 실행. 반환값은 RESP로 인코딩할 파이썬 값 (Exception이면 오류 응답)"""
+        name = args[0].upper()
+        with self._lock:
+            self.commands += 1
+            if name == b"PING":
+                return "PONG"
+            if name in (b"SELECT", b"AUTH"):
+                return "OK"
+            if name == b"GET":
+                return self._get(args[1])
+            if name == b"SET":
+                key, value = args[1], args[2]
+                expires_at = None
+                nx = xx = False
+                options = [a.upper() for a in args[3:]]
+                i = 0
+                while i < len(options):
+                    if options[i] == b"EX":
+                        expires_at = time.time() + int(args[3 + i + 1])
+                        i += 1
+                    elif options[i] == b"PX":
+                        expires_at = time.time() + int(args[3 + i + 1]) / 1000
+                        i += 1
+                    elif options[i] == b"NX":
+                        nx = True
+                    elif options[i] == b"XX":
+                        xx = True
+                    i += 1
+                exists = self._get(key) is not None
+                if (nx and exists) or (xx and not exists):
+                    return None
+                self._data[key] = (value, expires_at)
+                return "OK"
+            if name == b"DEL":
+                return sum(1 for key in args[1:] if self._data.pop(key, None) is not None)
+            if name == b"EXISTS":
+                return sum(1 for key in args[1:] if self._get(key) is not None)
+            if name == b"SCAN":
+                # 커서 없이 한 번에 모두 반환 (목 서버이므로 충분)
+                pattern = b"*"
+                options = args[2:]
+                for i in range(0, len(options) - 1, 2):
+                    if options[i].upper() == b"MATCH":
+                        pattern = options[i + 1]
+                keys = [key for key in list(self._data) if self._get(key) is not None]
+                matched = [key for key in keys if fnmatch.fnmatchcase(key.decode("utf-8", "replace"), pattern.decode("utf-8", "replace"))]
+                return [b"0", matched]
+            if name == b"FLUSHDB":
+                self._data.clear()
+                return "OK"
+        return Exception(f"ERR unknown command '{name.decode(errors='replace')}'")
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def _read_command(self) -> Optional[List[bytes]]:
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b"*"):
+                    # 인라인 명령 (redis-cli 등)
+                    return line.strip().split()
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+            def _encode(self, value) -> bytes:
+                if value is None:
+                    return b"$-1\r\n"
+                if isinstance(value, Exception):
+                    return b"-%s\r\n" % str(value).encode("utf-8")
+                if isinstance(value, str):
+                    return b"+%s\r\n" % value.encode("utf-8")
+                if isinstance(value, int):
+                    return b":%d\r\n" % value
+                if isinstance(value, bytes):
+                    return b"$%d\r\n%s\r\n" % (len(value), value)
+                return b"*%d\r\n" % len(value) + b"".join(self._encode(v) for v in value)
+
+            def handle(self):
+                while True:
+                    try:
+                        args = self._read_command()
+                    except (ConnectionError, ValueError):
+                        return
+                    if not args:
+                        return
+                    try:
+                        reply = server.execute(args)
+                    except (IndexError, ValueError) as e:
+                        reply = Exception(f"ERR {e}")
+                    try:
+                        self.wfile.write(self._encode(reply))
+                        self.wfile.flush()
+                    except ConnectionError:
+                        return
+
+        return Handler
+
+    def start(self) -> "MockRedisServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,82 @@
+"""저장된 픽스처를 제공하는 RSS 목 서버 (ETag/304 지원)"""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.common import QuietHTTPServer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class MockRSSServer:
+    """로컬 Google News RSS 대역 서버
+
+    모든 경로(/rss, /rss/topics/..., /rss/search?q=...)에 같은 픽스처를 응답한다.
+
+    Args:
+        fixture: 응답할 RSS 파일 경로
+        latency: 응답 전 대기 시간(초)
+    """
+
+    def __init__(self, fixture: Optional[Path] = None, latency: float = 0.02, port: int = 0):
+        self.body = (fixture or FIXTURES / "google_news_ko.xml").read_bytes()
+        self.etag = '"%s"' % hashlib.md5(self.body).hexdigest()
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = QuietHTTPServer(("127.0.0.1", port), self._handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더/본문 분할 전송 시 Nagle + delayed ACK로 생기는 ~40ms 지연 방지
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                with server._lock:
+                    server.requests += 1
+                if self.headers.get("If-None-Match") == server.etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", server.etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+
+        return Handler
+
+    def start(self) -> "MockRSSServer":
+        threading.Thread(target=self._server.serve_forever, name="mock-rss", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
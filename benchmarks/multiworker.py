@@ -0,0 +1,109 @@
+"""여러 워커 프로세스의 업스트림 요청 수 측정 (공유 캐시 저장소별)
+
+Streamlit을 여러 프로세스로 띄운 상황을 워커 프로세스로 재현한다. 각 워커는 같은 피드와 같은
+질문 목록을 요청하며, 공유 캐시(sqlite/redis)를 쓰면 워커 수가 늘어도 목 GMS/RSS 요청 수가 일정해야 한다.
+
+    python -m benchmarks.multiworker --workers 1,2,4 --backends memory,sqlite,redis
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_gms import MockGMSServer
+from benchmarks.mock_redis import MockRedisServer
+from benchmarks.mock_rss import MockRSSServer
+
+
+def worker(gms_url: str, rss_url: str, backend: str, sqlite_path: str, redis_url: str, prompts: int, seed: int):
+    """워커 프로세스 본체: 전체 피드 수집 + 질문 목록을 동시에 요청"""
+    from benchmarks.common import configure_for_benchmark
+    from config import Config
+
+    configure_for_benchmark(gms_url, rss_url)
+    Config.RESPONSE_CACHE_ENABLED = True
+    Config.CACHE_BACKEND = backend
+    Config.CACHE_SQLITE_PATH = sqlite_path
+    Config.CACHE_REDIS_URL = redis_url
+
+    from chat_handler import ChatHandler
+    from news_handler import NewsHandler
+
+    questions = [f"{i}번 질문: 오늘 날씨 어때?" for i in range(prompts)]
+    random.Random(seed).shuffle(questions)
+    handler = ChatHandler(session_id=f"worker-{seed}")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        executor.submit(NewsHandler.fetch_all)
+        list(executor.map(
+            lambda q: handler.send_message([{"role": "user", "content": q}], max_tokens=100),
+            questions
+        ))
+
+
+def run_level(backend: str, workers: int, prompts: int, gms: MockGMSServer, rss: MockRSSServer, redis_url: str) -> dict:
+    gms_before, rss_before = gms.requests, rss.requests
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = os.path.join(tmp, "shared_cache.db")
+        context = multiprocessing.get_context("spawn")
+        started = time.perf_counter()
+        processes = [
+            context.Process(target=worker, args=(gms.url, rss.url, backend, sqlite_path, redis_url, prompts, seed))
+            for seed in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        wall = time.perf_counter() - started
+    return {
+        "backend": backend,
+        "workers": workers,
+        "prompts": prompts,
+        "gms_requests": gms.requests - gms_before,
+        "rss_requests": rss.requests - rss_before,
+        "failed_workers": sum(1 for p in processes if p.exitcode != 0),
+        "wall_s": round(wall, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워커 프로세스 수별 업스트림 요청 수 측정")
+    parser.add_argument("--out", help="결과 JSON 파일 (없으면 표준 출력)")
+    parser.add_argument("--workers", default="1,2,4", help="워커 프로세스 수 (쉼표 구분)")
+    parser.add_argument("--backends", default="memory,sqlite,redis", help="캐시 저장소 (쉼표 구분)")
+    parser.add_argument("--prompts", type=int, default=20, help="워커마다 보내는 질문 수 (모든 워커가 같은 질문)")
+    parser.add_argument("--gms-latency", type=float, default=0.2, help="목 GMS 응답 지연(초)")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.workers.split(",") if x]
+    backends = [x for x in args.backends.split(",") if x]
+
+    results = []
+    with MockGMSServer(latency=args.gms_latency) as gms, MockRSSServer() as rss, MockRedisServer() as redis:
+        for backend in backends:
+            for workers in levels:
+                # 단계마다 공유 상태를 비워 콜드 캐시에서 시작
+                redis.execute([b"FLUSHDB"])
+                result = run_level(backend, workers, args.prompts, gms, rss, redis.url)
+                results.append(result)
+                print(
+                    f"{backend} workers={workers} gms={result['gms_requests']} rss={result['rss_requests']} "
+                    f"wall={result['wall_s']}s",
+                    file=sys.stderr
+                )
+
+    output = json.dumps({"results": results}, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
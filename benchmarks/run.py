@@ -0,0 +1,216 @@
+"""채팅/뉴스 파이프라인 벤치마크 (로컬 목 GMS + 목 RSS 서버 대상)
+
+결과는 JSON으로 출력되어 실행 간 회귀를 오프라인으로 비교할 수 있다 (benchmarks.compare).
+
+    python -m benchmarks.run --out results.json [--concurrency 1,4,16] [--requests 40]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from contextlib import closing
+
+from benchmarks.common import configure_for_benchmark, percentiles, run_load
+from benchmarks.mock_gms import MockGMSServer
+from benchmarks.mock_rss import MockRSSServer
+
+
+def bench_send_message(levels, requests):
+    from chat_handler import ChatHandler
+
+    messages = [{"role": "system", "content": "당신은 도움이 되는 어시스턴트입니다."}, {"role": "user", "content": "안녕하세요"}]
+    for concurrency in levels:
+        stats = run_load(
+            lambda i: ChatHandler(session_id=f"bench-{i % concurrency}").send_message(messages, max_tokens=500, use_cache=False),
+            requests,
+            concurrency
+        )
+        yield "send_message", {"concurrency": concurrency}, stats
+
+
+def bench_stream_message(levels, requests):
+    from chat_handler import ChatHandler
+
+    messages = [{"role": "user", "content": "스트리밍 테스트"}]
+    for concurrency in levels:
+        ttft = []
+
+        def one(i):
+            start = time.perf_counter()
+            stream = ChatHandler(session_id=f"bench-{i % concurrency}").stream_message(messages, max_tokens=500, use_cache=False)
+            with closing(stream):
+                for n, _ in enumerate(stream):
+                    if n == 0:
+                        ttft.append((time.perf_counter() - start) * 1000)
+
+        stats = run_load(one, requests, concurrency)
+        stats["time_to_first_token"] = percentiles(ttft)
+        yield "stream_message", {"concurrency": concurrency}, stats
+
+
+def bench_send_many(levels, requests):
+    """독립된 프롬프트 N개: ChatHandler 순차 호출 vs AsyncChatHandler.send_many (호출 1회 = 프롬프트 N개)"""
+    from async_chat_handler import send_many
+    from chat_handler import ChatHandler
+
+    rounds = max(1, requests // 10)
+    for prompts in levels:
+        def batch(i):
+            return [[{"role": "user", "content": f"{i}-{n}번 프롬프트"}] for n in range(prompts)]
+
+        def serial(i):
+            handler = ChatHandler(session_id="bench-serial")
+            for messages in batch(i):
+                handler.send_message(messages, max_tokens=500, use_cache=False)
+
+        def concurrent(i):
+            results = send_many(batch(i), concurrency=prompts, use_cache=False)
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                raise errors[0]
+
+        yield "send_many", {"prompts": prompts, "mode": "serial"}, run_load(serial, rounds, 1)
+        yield "send_many", {"prompts": prompts, "mode": "async"}, run_load(concurrent, rounds, 1)
+
+
+def bench_fetch_news(levels, requests):
+    from news_handler import NewsHandler, get_news_cache
+
+    cache = get_news_cache()
+    # 콜드: 매번 캐시를 비워 다운로드 + 파싱 비용 측정
+    for concurrency in levels:
+        def cold(i):
+            cache.invalidate()
+            NewsHandler.fetch_news("최신뉴스", max_items=10)
+
+        yield "fetch_news", {"cache": "cold", "concurrency": concurrency}, run_load(cold, requests, concurrency)
+
+    NewsHandler.fetch_all()
+    for concurrency in levels:
+        stats = run_load(lambda i: NewsHandler.fetch_news("최신뉴스", max_items=10), requests * 10, concurrency)
+        yield "fetch_news", {"cache": "warm", "concurrency": concurrency}, stats
+
+    cache.invalidate()
+    stats = run_load(lambda i: NewsHandler.fetch_all(max_items=10), max(1, requests // 10), 1)
+    yield "fetch_all", {"cache": "cold"}, stats
+
+
+def bench_search_news(levels, requests):
+    from news_handler import NewsHandler
+
+    NewsHandler.fetch_all()
+    for concurrency in levels:
+        stats = run_load(lambda i: NewsHandler.search_news("삼성전자 반도체", max_items=10), requests, concurrency)
+        yield "search_news", {"source": "local", "concurrency": concurrency}, stats
+        # 로컬에 없는 검색어는 네트워크 검색 RSS로 대체
+        stats = run_load(lambda i: NewsHandler.search_news(f"없는검색어{i}", max_items=10), requests, concurrency)
+        yield "search_news", {"source": "network", "concurrency": concurrency}, stats
+
+
+def bench_dedupe(requests):
+    from dedup import DuplicateIndex
+    from news_handler import NewsHandler
+
+    items = [item for feed in NewsHandler.fetch_all(max_items=50).values() for item in feed]
+    # 콜드: 빈 색인에 모든 기사 서명 추가, 웜: 이미 본 링크는 서명 재계산 없이 조회
+    stats = run_load(lambda i: DuplicateIndex().dedupe(items), max(1, requests // 4), 1)
+    yield "dedupe", {"articles": len(items), "index": "cold"}, stats
+    index = DuplicateIndex()
+    index.dedupe(items)
+    stats = run_load(lambda i: index.dedupe(items), requests * 10, 1)
+    yield "dedupe", {"articles": len(items), "index": "warm"}, stats
+
+
+def bench_summarize_news(requests):
+    from news_handler import NewsHandler
+    from news_summarizer import get_news_summarizer
+
+    items = NewsHandler.fetch_news("최신뉴스", max_items=10)
+    stats = run_load(lambda i: NewsHandler.summarize_news(items, max_articles=10, use_llm=False), requests * 10, 1)
+    yield "summarize_news", {"articles": len(items), "mode": "extractive"}, stats
+
+    # LLM 다이제스트: 콜드(기사 요약 캐시 비움)는 기사별 요약 병렬 호출 + 종합, 웜은 캐시 적중
+    cache = get_news_summarizer().cache
+
+    def cold(i):
+        cache.clear()
+        NewsHandler.summarize_news(items, max_articles=10, use_llm=True)
+
+    yield "summarize_news", {"articles": len(items), "mode": "llm", "cache": "cold"}, run_load(cold, max(1, requests // 4), 1)
+    stats = run_load(lambda i: NewsHandler.summarize_news(items, max_articles=10, use_llm=True), requests * 10, 1)
+    yield "summarize_news", {"articles": len(items), "mode": "llm", "cache": "warm"}, stats
+
+
+def bench_prompt_build(history_sizes, requests):
+    from conversation import ContextWindow, ConversationMemory
+
+    prefix = [{"role": "developer", "content": "Answer in Korean"}, {"role": "system", "content": "당신은 도움이 되는 어시스턴트입니다."}]
+    # LLM 요약 대신 추출 요약(빈 문자열 반환 시 fallback)을 사용해 빌더 자체 비용만 측정
+    window = ContextWindow(lambda previous, messages: "", input_budget=6000, summary_max_tokens=500)
+    for size in history_sizes:
+        history = [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"{i}번째 메시지입니다. " * 20}
+            for i in range(size)
+        ]
+        memory = ConversationMemory()
+        window.build(prefix, history, memory)
+        time.sleep(0.05)
+        payload = window.build(prefix, history, memory)
+        stats = run_load(lambda i: window.build(prefix, history, memory), requests * 10, 1)
+        stats["payload_messages"] = len(payload)
+        stats["payload_chars"] = sum(len(m["content"]) for m in payload)
+        yield "prompt_build", {"history": size}, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅/뉴스 파이프라인 벤치마크")
+    parser.add_argument("--out", help="결과 JSON 파일 (없으면 표준 출력)")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시성 수준 (쉼표 구분)")
+    parser.add_argument("--history", default="10,100,1000", help="프롬프트 빌드 대화 길이 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=40, help="측정당 요청 수")
+    parser.add_argument("--gms-latency", type=float, default=0.05, help="목 GMS 응답 지연(초)")
+    parser.add_argument("--rss-latency", type=float, default=0.02, help="목 RSS 응답 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="목 GMS 오류 주입 비율")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.concurrency.split(",") if x]
+    history_sizes = [int(x) for x in args.history.split(",") if x]
+
+    results = []
+    with MockGMSServer(latency=args.gms_latency, error_rate=args.error_rate) as gms, MockRSSServer(latency=args.rss_latency) as rss:
+        configure_for_benchmark(gms.url, rss.url)
+        suites = [
+            bench_send_message(levels, args.requests),
+            bench_stream_message(levels, args.requests),
+            bench_send_many(levels, args.requests),
+            bench_fetch_news(levels, args.requests),
+            bench_search_news(levels, args.requests),
+            bench_dedupe(args.requests),
+            bench_summarize_news(args.requests),
+            bench_prompt_build(history_sizes, args.requests)
+        ]
+        for suite in suites:
+            for name, params, stats in suite:
+                results.append({"benchmark": name, "params": params, **stats})
+                print(f"{name} {params} p50={stats.get('p50_ms')}ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "results": results
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
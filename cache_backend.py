@@ -0,0 +1,409 @@
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+from config import Config
+
+# get_or_compute 잠금 키 접두사
+LOCK_PREFIX = "lock:"
+
+
+class CacheBackend:
+    """캐시 저장소 인터페이스 (키: str, 값: bytes, 항목별 TTL)
+
+    get/set/add/delete/clear를 구현하면 get_or_compute는 add(SET NX) 기반 잠금으로 동작하므로
+    여러 프로세스가 같은 저장소를 쓰더라도 같은 키는 한 곳에서만 계산한다.
+    """
+
+    shared = False  # 여러 프로세스가 공유하는 저장소인지
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """키가 없을(또는 만료됐을) 때만 저장. 저장했으면 True"""
+        raise NotImplementedError
+
+    def delete(self, key: str, expected: Optional[bytes] = None):
+        """키 삭제 (expected가 있으면 값이 같을 때만)"""
+        raise NotImplementedError
+
+    def clear(self, prefix: str = ""):
+        """prefix로 시작하는 키 전체 삭제"""
+        raise NotImplementedError
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Optional[bytes]],
+        ttl: float,
+        lock_timeout: float = 60,
+        poll_interval: float = 0.05,
+        refresh: bool = False
+    ) -> Optional[bytes]:
+        """캐시된 값을 반환하고, 없으면 한 곳에서만 compute()를 실행해 저장 (stampede 방지)
+
+        다른 곳이 계산 중이면 결과가 저장될 때까지 기다린다. 계산한 쪽이 실패하면 대기하던 쪽이
+        잠금을 이어받아 다시 계산하고, lock_timeout이 지나도 결과가 없으면 직접 계산한다.
+        compute()가 None/빈 값을 반환하면 저장하지 않는다. compute()의 예외는 그대로 전달된다.
+        refresh=True이면 저장된 값을 무시하고 다시 계산해 덮어쓴다 (다른 곳이 이미 계산 중이면 그 결과를 기다림).
+        """
+        value = None if refresh else self.get(key)
+        if value is not None:
+            return value
+
+        lock_key = LOCK_PREFIX + key
+        token = uuid.uuid4().hex.encode()
+        deadline = time.monotonic() + lock_timeout
+        while True:
+            if self.add(lock_key, token, lock_timeout):
+                try:
+                    # 잠금을 얻기 직전에 다른 곳에서 저장했을 수 있음
+                    value = None if refresh else self.get(key)
+                    if value is None:
+                        value = compute()
+                        if value:
+                            self.set(key, value, ttl)
+                    return value
+                finally:
+                    self.delete(lock_key, expected=token)
+
+            time.sleep(poll_interval)
+            # refresh면 기존 값이 남아 있으므로 계산 중인 쪽이 잠금을 풀 때까지 기다렸다가 읽는다
+            if not refresh or self.get(lock_key) is None:
+                value = self.get(key)
+                if value is not None:
+                    return value
+            if time.monotonic() >= deadline:
+                value = compute()
+                if value:
+                    self.set(key, value, ttl)
+                return value
+
+
+class MemoryBackend(CacheBackend):
+    """프로세스 내 메모리 LRU (저장된 값의 총 바이트 수로 크기 제한)
+
+    get_or_compute는 잠금 키 대신 진행 중인 계산(Future)을 공유한다 (single-flight).
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if time.time() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._store(key, value, time.time() + ttl)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and now < item[1]:
+                return False
+            self._store(key, value, now + ttl)
+            return True
+
+    def delete(self, key: str, expected: Optional[bytes] = None):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and (expected is None or item[0] == expected):
+                self._remove(key)
+
+    def clear(self, prefix: str = ""):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def _store(self, key: str, value: bytes, expires_at: float):
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at)
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def get_or_compute(self, key, compute, ttl, lock_timeout=60, poll_interval=0.05, refresh=False):
+        value = None if refresh else self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result(timeout=lock_timeout)
+
+        try:
+            value = compute()
+            if value:
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+
+class SQLiteBackend(CacheBackend):
+    """여러 프로세스가 같은 파일을 공유하는 SQLite(WAL) 저장소
+
+    WAL 모드에서는 읽기가 쓰기를 막지 않으며, add는 BEGIN IMMEDIATE 트랜잭션으로 원자적으로 처리한다.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: str, busy_timeout: float = 5):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() >= row[1]:
+            return None
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                # 만료된 항목은 주기적으로 정리
+                self._db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, now))
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, now + ttl)
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def delete(self, key: str, expected: Optional[bytes] = None):
+        with self._lock:
+            if expected is None:
+                self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            else:
+                self._db.execute("DELETE FROM cache_entries WHERE key = ? AND value = ?", (key, expected))
+
+    def clear(self, prefix: str = ""):
+        with self._lock:
+            if prefix:
+                self._db.execute("DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            else:
+                self._db.execute("DELETE FROM cache_entries")
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend(CacheBackend):
+    """Redis 프로토콜(RESP) 저장소 (외부 라이브러리 없이 GET/SET/DEL/SCAN만 사용)
+
+    스레드마다 연결 하나를 유지하고, 연결이 끊기면 한 번 다시 연결해 재시도한다.
+    (잠금용 SET NX처럼 두 번 적용되면 안 되는 명령은 보내기 전에 실패한 경우만 재시도)
+    url 예: redis://:password@localhost:6379/0
+    """
+
+    shared = True
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 2):
+        parsed = urllib.parse.urlsplit(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = urllib.parse.unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(parts))
+
+    def _roundtrip(self, *args):
+        self._send(*args)
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Redis 연결이 끊어졌습니다.")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode(errors="replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"알 수 없는 응답입니다: {line!r}")
+
+    def command(self, *args, idempotent: bool = True):
+        """명령 실행. idempotent=False면 명령을 보낸 뒤의 연결 오류는 재시도하지 않는다
+
+        (응답만 잃었을 수 있어 다시 보내면 SET NX가 자기 잠금을 보고 실패하는 등 결과가 달라짐)
+        """
+        for attempt in range(2):
+            sent = False
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._connect()
+                self._send(*args)
+                sent = True
+                return self._read_reply()
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt or (sent and not idempotent):
+                    raise
+
+    @staticmethod
+    def _ttl_ms(ttl: float) -> int:
+        return max(1, int(ttl * 1000))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.command("SET", key, value, "PX", self._ttl_ms(ttl))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return self.command("SET", key, value, "PX", self._ttl_ms(ttl), "NX", idempotent=False) == "OK"
+
+    def delete(self, key: str, expected: Optional[bytes] = None):
+        # 잠금 해제용 비교 삭제: GET과 DEL 사이에 잠금이 만료되어 다른 곳이 얻는 경우는 드물어 허용
+        if expected is not None and self.command("GET", key) != expected:
+            return
+        self.command("DEL", key)
+
+    def clear(self, prefix: str = ""):
+        cursor = b"0"
+        pattern = prefix.replace("\\", "\\\\").replace("*", "\\*").replace("?", "\\?").replace("[", "\\[") + "*"
+        while True:
+            cursor, keys = self.command("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+            if keys:
+                self.command("DEL", *keys)
+            if cursor in (b"0", "0"):
+                break
+
+
+_shared_backend: Optional[CacheBackend] = None
+_shared_backend_lock = threading.Lock()
+
+
+def create_backend(kind: str) -> Optional[CacheBackend]:
+    """CACHE_BACKEND 값으로 공유 저장소 생성 ("memory"면 None: 프로세스별 캐시만 사용)"""
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return None
+    if kind == "sqlite":
+        return SQLiteBackend(Config.CACHE_SQLITE_PATH)
+    if kind == "redis":
+        return RedisBackend(Config.CACHE_REDIS_URL)
+    raise ValueError(f"알 수 없는 캐시 저장소입니다: {kind}")
+
+
+def get_shared_backend() -> Optional[CacheBackend]:
+    """여러 Streamlit 프로세스가 공유하는 캐시 저장소 반환 (CACHE_BACKEND=memory면 None)"""
+    global _shared_backend
+    if _shared_backend is None and Config.CACHE_BACKEND != "memory":
+        with _shared_backend_lock:
+            if _shared_backend is None:
+                _shared_backend = create_backend(Config.CACHE_BACKEND)
+    return _shared_backend
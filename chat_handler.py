@@ -1,11 +1,119 @@
-import requests
-from typing import List, Dict
+import json
+import threading
+import time
+from typing import Callable, List, Dict, Iterator, Optional
 from config import Config
+from http_transport import get_transport, CircuitOpenError
+from response_cache import ResponseCache, get_response_cache, make_key
+from api_scheduler import get_scheduler, QueueFullError
+from conversation import estimate_tokens
+from news_item import NewsItem
+import metrics
+
+
+def _find_first_str(obj):
+    """응답 구조에서 첫 번째 문자열값을 재귀적으로 찾는다"""
+    if isinstance(obj, str):
+        return obj
+    if isinstance(obj, dict):
+        for v in obj.values():
+            res = _find_first_str(v)
+            if res:
+                return res
+    if isinstance(obj, list):
+        for item in obj:
+            res = _find_first_str(item)
+            if res:
+                return res
+    return None
+
+
+def _extract_text(result) -> str:
+    """완성(non-stream) 응답에서 텍스트를 추출한다
+
+    우선순위: OpenAI-style 'choices' -> gpt-5-nano 'output_text'/'output' -> 기타
+    """
+    # 0️⃣ OpenAI / GMS(프록시) 스타일: choices[].message.content 또는 choices[].text
+    if isinstance(result, dict) and "choices" in result:
+        choices = result.get("choices") or []
+        if isinstance(choices, list) and len(choices) > 0:
+            choice = choices[0]
+            if isinstance(choice, dict):
+                # message.content 형태
+                msg = choice.get("message")
+                if isinstance(msg, dict):
+                    content = msg.get("content") or msg.get("text")
+                    if isinstance(content, str) and content.strip():
+                        return content.strip()
+
+                # 직접 text 필드
+                text = choice.get("text")
+                if isinstance(text, str) and text.strip():
+                    return text.strip()
+
+    # 1️⃣ gpt-5-nano 특유의 output_text 필드
+    if "output_text" in result and result["output_text"]:
+        return result["output_text"].strip()
+
+    # 2️⃣ output 배열 구조 (content items)
+    output_text = ""
+    for item in result.get("output", []):
+        for content in item.get("content", []):
+            if content.get("type") == "output_text":
+                output_text += content.get("text", "")
+
+    if output_text.strip():
+        return output_text.strip()
+
+    # 3️⃣ fallback: 응답에서 첫 번째 문자열값을 찾아 반환
+    found = _find_first_str(result)
+    if found:
+        return found.strip()
+
+    # 4️⃣ 그래도 없으면 빈 문자열 반환
+    return ""
+
+
+def _extract_delta(chunk) -> str:
+    """스트리밍 청크(SSE data)에서 증분 텍스트를 추출한다
+
+    지원 포맷: choices[].delta.content / choices[].text / output_text(.delta) 이벤트
+    """
+    if not isinstance(chunk, dict):
+        return ""
+
+    # 0️⃣ OpenAI 스타일: choices[].delta.content 또는 choices[].text
+    choices = chunk.get("choices")
+    if isinstance(choices, list) and choices:
+        choice = choices[0]
+        if isinstance(choice, dict):
+            delta = choice.get("delta")
+            if isinstance(delta, dict):
+                content = delta.get("content") or delta.get("text")
+                if isinstance(content, str):
+                    return content
+            text = choice.get("text")
+            if isinstance(text, str):
+                return text
+        return ""
+
+    # 1️⃣ output_text 스타일: {"type": "response.output_text.delta", "delta": "..."}
+    if chunk.get("type") == "response.output_text.delta":
+        delta = chunk.get("delta")
+        return delta if isinstance(delta, str) else ""
+
+    # 2️⃣ 청크 단위 output_text 필드
+    output_text = chunk.get("output_text")
+    if isinstance(output_text, str):
+        return output_text
+
+    return ""
+
 
 class ChatHandler:
     """GMS (GPT-5-nano) API를 통한 채팅 처리"""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ResponseCache] = None, session_id: str = "default"):
         self.api_key = Config.GMS_API_KEY
         self.model = Config.GMS_MODEL
         self.api_endpoint = Config.GMS_API_ENDPOINT.rstrip("/")
@@ -13,15 +121,24 @@ class ChatHandler:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # 응답 캐시 (지정하지 않으면 프로세스 전역 캐시, 비활성화 시 None)
+        self.cache = cache if cache is not None else get_response_cache()
+        # 스케줄러의 세션별 공정 대기열 구분용
+        self.session_id = session_id
 
-    def send_message(
-        self,
-        messages: List[Dict],
-        temperature: float = 0.7,   # UI용 (API에는 안 보냄)
-        max_tokens: int = 500
-    ) -> str:
-        """GMS API에 메시지 전송 및 응답 받기"""
+    def _cache_lookup(self, messages: List[Dict], max_tokens: int, use_cache: bool):
+        """(캐시 키, 캐시된 응답) 반환. 캐시를 쓰지 않으면 (None, None)"""
+        if not use_cache or self.cache is None:
+            return None, None
+        key = make_key(self.model, messages, max_tokens)
+        return key, self.cache.get(key)
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+        """레이트 리밋용 토큰 사용량 추정 (입력 추정치 + max_completion_tokens)"""
+        return sum(estimate_tokens(str(m.get("content", ""))) for m in messages) + max_tokens
 
+    def _validate(self, messages: List[Dict]):
         if not self.api_key:
             raise ValueError("GMS_API_KEY가 설정되어 있지 않습니다.")
 
@@ -32,6 +149,43 @@ class ChatHandler:
             if not isinstance(m, dict) or "role" not in m or "content" not in m:
                 raise ValueError("각 메시지는 'role'과 'content' 키를 가진 dict여야 합니다.")
 
+    @staticmethod
+    def _raise_for_status(response, mode: str):
+        metrics.incr("gms_requests_total", mode=mode, status=response.status_code)
+        if response.status_code != 200:
+            try:
+                err = response.json()
+            except Exception:
+                err = response.text
+            raise Exception(f"API 오류 ({response.status_code}): {err}")
+
+    def send_message(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,   # UI용 (API에는 안 보냄)
+        max_tokens: int = 500,
+        use_cache: bool = True,
+        on_queue_position: Optional[Callable[[int], None]] = None
+    ) -> str:
+        """GMS API에 메시지 전송 및 응답 받기
+
+        use_cache=False이면 응답 캐시를 조회/저장하지 않고 항상 API를 호출한다.
+        호출은 프로세스 전역 스케줄러를 거치며, 대기 중에는 on_queue_position으로 순번을 알린다.
+        """
+
+        self._validate(messages)
+
+        if use_cache and self.cache is not None:
+            # 같은 요청이 동시에 들어오면 (공유 캐시 사용 시 다른 프로세스와도) 한 번만 호출
+            key = make_key(self.model, messages, max_tokens)
+            return self.cache.get_or_compute(key, lambda: self._complete(messages, max_tokens, on_queue_position))
+        return self._complete(messages, max_tokens, on_queue_position)
+
+    def _complete(self, messages: List[Dict], max_tokens: int, on_queue_position: Optional[Callable[[int], None]] = None) -> str:
+        """완성(비스트리밍) 요청 전송 및 응답 텍스트 추출"""
+        # requests는 전송 계층이 처음 만들어질 때 이미 불러오므로 여기서는 모듈 참조만 얻는다
+        import requests
+
         payload = {
             "model": self.model,
             "messages": messages,
@@ -40,93 +194,152 @@ class ChatHandler:
 
         try:
             url = f"{self.api_endpoint}/chat/completions"
-            response = requests.post(
-                url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
-
-            if response.status_code != 200:
-                try:
-                    err = response.json()
-                except Exception:
-                    err = response.text
-                raise Exception(f"API 오류 ({response.status_code}): {err}")
-
-            result = response.json()
-
-            # =========================
-            # ✅ 응답 파싱: 여러 포맷을 안전하게 처리
-            # 우선순위: OpenAI-style 'choices' -> gpt-5-nano 'output_text'/'output' -> 기타
-            # =========================
-
-            # 0️⃣ OpenAI / GMS(프록시) 스타일: choices[].message.content 또는 choices[].text
-            if isinstance(result, dict) and "choices" in result:
-                choices = result.get("choices") or []
-                if isinstance(choices, list) and len(choices) > 0:
-                    choice = choices[0]
-                    if isinstance(choice, dict):
-                        # message.content 형태
-                        msg = choice.get("message")
-                        if isinstance(msg, dict):
-                            content = msg.get("content") or msg.get("text")
-                            if isinstance(content, str) and content.strip():
-                                return content.strip()
-
-                        # 직접 text 필드
-                        text = choice.get("text")
-                        if isinstance(text, str) and text.strip():
-                            return text.strip()
-
-            # 1️⃣ gpt-5-nano 특유의 output_text 필드
-            if "output_text" in result and result["output_text"]:
-                return result["output_text"].strip()
-
-            # 2️⃣ output 배열 구조 (content items)
-            output_text = ""
-            for item in result.get("output", []):
-                for content in item.get("content", []):
-                    if content.get("type") == "output_text":
-                        output_text += content.get("text", "")
-
-            if output_text.strip():
-                return output_text.strip()
-
-            # 3️⃣ fallback: 응답에서 첫 번째 문자열값을 찾아 반환
-            def find_first_str(obj):
-                if isinstance(obj, str):
-                    return obj
-                if isinstance(obj, dict):
-                    for v in obj.values():
-                        res = find_first_str(v)
-                        if res:
-                            return res
-                if isinstance(obj, list):
-                    for item in obj:
-                        res = find_first_str(item)
-                        if res:
-                            return res
-                return None
-
-            found = find_first_str(result)
-            if found:
-                return found.strip()
-
-            # 4️⃣ 그래도 없으면 빈 문자열 반환
-            return ""
+            with get_scheduler().slot(self.session_id, self._estimate_tokens(messages, max_tokens), on_queue_position):
+                with metrics.span("upstream_call", mode="complete"):
+                    response = get_transport().post(
+                        url,
+                        headers=self.headers,
+                        json=payload
+                    )
+
+            self._raise_for_status(response, "complete")
 
+            # 응답 파싱: 여러 포맷을 안전하게 처리
+            with metrics.span("response_parse"):
+                result = response.json()
+                text = _extract_text(result)
+            if isinstance(result, dict):
+                metrics.record_usage(result.get("usage"), self.model)
+            return text
+
+        except (CircuitOpenError, QueueFullError):
+            raise
         except requests.exceptions.RequestException as e:
             raise Exception(f"API 요청 실패: {e}")
         except Exception as e:
             raise Exception(f"채팅 처리 중 오류 발생: {e}")
 
-    def create_news_summary(self, news_items: List[Dict]) -> str:
+    def stream_message(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,   # UI용 (API에는 안 보냄)
+        max_tokens: int = 500,
+        cancel_event: Optional[threading.Event] = None,
+        use_cache: bool = True,
+        on_queue_position: Optional[Callable[[int], None]] = None
+    ) -> Iterator[str]:
+        """GMS API에 스트리밍(stream: true) 요청을 보내고 텍스트 조각을 순차적으로 반환
+
+        cancel_event가 설정되거나 제너레이터가 닫히면 업스트림 연결을 즉시 끊는다.
+        캐시 적중 시 저장된 응답을 한 번에 반환하며, 끝까지 받은 응답만 캐시에 저장한다.
+        스케줄러 호출 슬롯은 스트림이 끝날 때까지 점유한다.
+        """
+
+        self._validate(messages)
+
+        cache_key, cached = self._cache_lookup(messages, max_tokens, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_completion_tokens": max_tokens,
+            "stream": True
+        }
+        if metrics.enabled():
+            # 계측 중에는 마지막 청크로 토큰 사용량을 받는다
+            payload["stream_options"] = {"include_usage": True}
+
+        scheduler = get_scheduler()
+        scheduler.acquire(self.session_id, self._estimate_tokens(messages, max_tokens), on_queue_position)
+        try:
+            yield from self._stream_completion(payload, cache_key, cancel_event)
+        finally:
+            scheduler.release()
+
+    def _stream_completion(self, payload: Dict, cache_key: Optional[str], cancel_event: Optional[threading.Event]) -> Iterator[str]:
+        """스트리밍 요청 전송 및 SSE 응답 파싱"""
+        import requests
+
+        try:
+            url = f"{self.api_endpoint}/chat/completions"
+            # 응답 헤더 수신까지 (본문 스트리밍 시간은 stream_first_token/stream_total로 분리)
+            started = time.perf_counter()
+            with metrics.span("upstream_call", mode="stream"):
+                response = get_transport().post(
+                    url,
+                    headers={**self.headers, "Accept": "text/event-stream"},
+                    json=payload,
+                    stream=True
+                )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"API 요청 실패: {e}")
+
+        try:
+            self._raise_for_status(response, "stream")
+
+            # 서버가 스트리밍을 지원하지 않으면 완성 응답을 한 번에 반환
+            content_type = response.headers.get("Content-Type", "")
+            if "text/event-stream" not in content_type:
+                with metrics.span("response_parse"):
+                    result = response.json()
+                    text = _extract_text(result)
+                if isinstance(result, dict):
+                    metrics.record_usage(result.get("usage"), self.model)
+                if text:
+                    if cache_key is not None:
+                        self.cache.set(cache_key, text)
+                    yield text
+                return
+
+            # SSE 파싱: 'data: {...}' 라인 단위, 빈 줄은 이벤트 구분자
+            # (charset 미지정 시 requests가 latin-1로 디코딩하므로 직접 utf-8 디코딩)
+            chunks = []
+            for raw in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                if not raw:
+                    continue
+                line = raw.decode("utf-8", errors="replace")
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(chunk, dict) and chunk.get("usage"):
+                    metrics.record_usage(chunk["usage"], self.model)
+                delta = _extract_delta(chunk)
+                if delta:
+                    if not chunks:
+                        metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage="stream_first_token")
+                    chunks.append(delta)
+                    yield delta
+
+            metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage="stream_total")
+
+            # 스트림을 끝까지 받은 경우에만 캐시에 저장
+            text = "".join(chunks).strip()
+            if cache_key is not None and text:
+                self.cache.set(cache_key, text)
+
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"API 요청 실패: {e}")
+        finally:
+            # 취소/중단 시에도 연결을 닫아 업스트림 생성을 중단시킨다
+            response.close()
+
+    def create_news_summary(self, news_items: List[NewsItem]) -> str:
         """뉴스 요약 프롬프트 생성"""
         if not news_items:
             return "현재 사용 가능한 뉴스가 없습니다."
 
         parts = ["최신 뉴스:"]
         for i, n in enumerate(news_items[:5], 1):
-            parts.append(f"{i}. {n.get('title')}")
+            parts.append(f"{i}. {n.title}")
         return "\n".join(parts)
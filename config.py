@@ -1,20 +1,68 @@
 import os
-from dotenv import load_dotenv
+import threading
+
+_dotenv_loaded = False
+_dotenv_lock = threading.Lock()
+
+
+def _load_dotenv():
+    """.env 파일에서 환경 변수 로드 (환경 변수 설정을 처음 읽을 때 한 번만)"""
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _dotenv_loaded = True
+
+
+class _EnvValue:
+    """환경 변수 기반 설정값
+
+    처음 읽을 때 .env를 로드해 값을 구하고 클래스 속성으로 바꿔 저장하므로 이후 조회는 일반 속성과 같다.
+    코드에서 Config.X = ...로 덮어쓰면 환경 변수는 읽지 않는다.
+    """
+
+    def __init__(self, name: str, default=None, cast=None):
+        self.name = name
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner, attr: str):
+        self.attr = attr
+
+    def __get__(self, instance, owner):
+        _load_dotenv()
+        value = os.getenv(self.name, self.default)
+        if self.cast is not None and value is not None:
+            value = self.cast(value)
+        setattr(owner, self.attr, value)
+        return value
+
+
+def env(name: str, default=None, cast=None) -> _EnvValue:
+    """환경 변수 name을 처음 읽을 때 해석하는 설정값 (cast로 형 변환)"""
+    return _EnvValue(name, default, cast)
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
 
-# .env 파일에서 환경 변수 로드
-load_dotenv()
 
 class Config:
     """애플리케이션 설정"""
     
     # GMS (GPT 5 - nano) 설정
-    GMS_API_KEY = os.getenv("GMS_API_KEY")
-    GMS_MODEL = os.getenv("GMS_MODEL", "gpt-5-nano")
-    GMS_API_ENDPOINT = os.getenv("GMS_API_ENDPOINT", "https://api.example.com/v1")
-    
-    # 검증
-    if not GMS_API_KEY:
-        raise ValueError("GMS_API_KEY 환경 변수가 설정되지 않았습니다. .env 파일을 확인하세요.")
+    GMS_API_KEY = env("GMS_API_KEY")
+    GMS_MODEL = env("GMS_MODEL", "gpt-5-nano")
+    GMS_API_ENDPOINT = env("GMS_API_ENDPOINT", "https://api.example.com/v1")
+
+    @classmethod
+    def validate(cls):
+        """필수 설정 검증 (import 시점이 아닌 앱/CLI 시작 시 호출)"""
+        if not cls.GMS_API_KEY:
+            raise ValueError("GMS_API_KEY 환경 변수가 설정되지 않았습니다. .env 파일을 확인하세요.")
     
     # Streamlit 설정
     STREAMLIT_THEME = "light"
@@ -23,6 +71,95 @@ class Config:
     
     # 뉴스 설정
     NEWS_FETCH_INTERVAL = 3600  # 1시간
+    NEWS_REFRESH_AHEAD = 0.8  # TTL의 80%가 지나면 백그라운드에서 미리 갱신
+    NEWS_FEED_TIMEOUT = 10  # 피드별 최대 대기 시간 (초)
+    NEWS_FETCH_WORKERS = 4  # 카테고리 동시 수집 스레드 수
+    NEWS_FEED_MAX_ITEMS = 50  # 피드당 파싱/캐시할 최대 기사 수
+
+    # 뉴스 요약 (기사별 LLM 요약을 병렬로 만든 뒤 종합. 기사 요약은 링크 + 내용 해시로 캐시)
+    NEWS_SUMMARY_USE_LLM = True  # False면 RSS 요약의 첫 문장만 사용
+    NEWS_SUMMARY_WORKERS = 4  # 기사 요약 동시 실행 수
+    NEWS_SUMMARY_CHAT_LLM_ARTICLES = 3  # 채팅 기사 검색 응답에서 LLM으로 요약할 최대 기사 수 (턴당 호출 수 상한)
+    # 추론 모델은 max_completion_tokens에 추론 토큰이 포함되므로 여유 있게 설정
+    NEWS_SUMMARY_ARTICLE_MAX_TOKENS = 1000
+    NEWS_SUMMARY_DIGEST_MAX_TOKENS = 2000
+    NEWS_SUMMARY_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    NEWS_SUMMARY_CACHE_TTL = 7 * 86400  # 7일
+    NEWS_SUMMARY_CACHE_DB = env("NEWS_SUMMARY_CACHE_DB", "")  # 지정 시 SQLite에 보관 (재시작 후에도 유지)
+
+    # 로컬 기사 저장소 (수집한 기사 색인, 키워드 검색을 로컬에서 처리)
+    ARTICLE_STORE_DB = env("ARTICLE_STORE_DB", "articles.db")
+    ARTICLE_STORE_MAX_ARTICLES = 5000
+    ARTICLE_STORE_RETENTION_DAYS = 30
+    ARTICLE_SEARCH_MIN_LOCAL_HITS = 3  # 로컬 검색 결과가 이보다 적으면 네트워크 검색
+
+    # 중복 기사 제거 (정규화한 링크 + 제목/요약 SimHash, 피드·검색 결과·프롬프트 참고 기사에 적용)
+    NEWS_DEDUP_ENABLED = True
+    NEWS_DEDUP_MAX_DISTANCE = 3  # 64비트 SimHash 해밍 거리 이하면 같은 기사로 판단
+    NEWS_DEDUP_INDEX_SIZE = 20000  # 색인에 유지하는 최대 서명 수
     MAX_NEWS_ITEMS = 10
+    # 채팅 화면에 한 번에 표시할 최근 메시지 수 (이전 메시지는 요청 시 이만큼씩 펼침)
+    CHAT_HISTORY_WINDOW = 30
     # 기본 최대 토큰 수
     DEFAULT_MAX_TOKENS = 8000
+    # 스트리밍 응답 화면 갱신 주기(초)와, 화면 갱신이 끊긴 응답을 취소하기까지의 시간(초)
+    STREAM_POLL_INTERVAL = 0.1
+    STREAM_ABANDON_TIMEOUT = 30
+    # 채팅 기본 system 프롬프트
+    SYSTEM_PROMPT = "당신은 도움이 되는 어시스턴트입니다."
+
+    # 대화 기록 메모리 상한 (최근 메시지만 메모리에 두고 이전 메시지는 SQLite로 내려 필요할 때 읽음)
+    CONVERSATION_STORE_DB = env("CONVERSATION_STORE_DB", "conversations.db")
+    CONVERSATION_HOT_MESSAGES = 40  # 세션별 메모리에 유지하는 최근 메시지 수
+    CONVERSATION_SESSION_MAX_BYTES = 1024 * 1024  # 세션별 메모리 구간 최대 크기
+    CONVERSATION_GLOBAL_MAX_BYTES = 256 * 1024 * 1024  # 전체 세션 합계 상한 (초과 시 오래 쓰이지 않은 세션부터 내림)
+    CONVERSATION_IDLE_TIMEOUT = 1800  # 초, 이 시간 동안 사용되지 않은 세션은 메모리 구간 전체를 내림
+    CONVERSATION_RETENTION = 7 * 86400  # 초, 이보다 오래된 디스크 기록 삭제 (이전 프로세스의 기록은 시작 시 모두 삭제)
+    CONVERSATION_PRUNE_INTERVAL = 3600  # 초, 오래된 디스크 기록 정리 주기 (메시지 추가 시 확인)
+
+    # 대화 컨텍스트 설정 (요청당 입력 토큰 예산, 오래된 대화는 롤링 요약)
+    CONTEXT_INPUT_BUDGET = 6000
+    CONTEXT_SUMMARY_MAX_TOKENS = 500
+
+    # 뉴스 근거 답변 (질문 관련 기사를 프롬프트에 넣고 답변에서 [번호]로 인용)
+    GROUNDING_TOP_K = 5
+    GROUNDING_TOKEN_BUDGET = 800  # 참고 기사 블록 최대 토큰 (대화 윈도우 예산에서 미리 뺌)
+    GROUNDING_TIMEOUT = 3  # 초, 프롬프트 준비가 끝난 뒤 검색을 더 기다리는 최대 시간
+    GROUNDING_MIN_COVERAGE = 0.5  # 질문 n-gram 중 기사에 포함되어야 하는 비율
+
+    # LLM 응답 캐시 (동일한 모델/메시지/최대 토큰 요청 재사용)
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 메모리 계층 최대 크기
+    RESPONSE_CACHE_TTL = 86400  # 24시간
+    RESPONSE_CACHE_DB = env("RESPONSE_CACHE_DB", "")  # 지정 시 SQLite 디스크 계층 사용
+
+    # 공유 캐시 저장소 (여러 Streamlit 프로세스가 뉴스 피드/LLM 응답 캐시를 공유)
+    # memory: 프로세스별 캐시만 사용, sqlite: CACHE_SQLITE_PATH 파일 (WAL), redis: CACHE_REDIS_URL
+    CACHE_BACKEND = env("CACHE_BACKEND", "memory", str.lower)
+    CACHE_SQLITE_PATH = env("CACHE_SQLITE_PATH", "shared_cache.db")
+    CACHE_REDIS_URL = env("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+    # HTTP 전송 설정 (모든 세션이 공유하는 커넥션 풀)
+    HTTP_POOL_SIZE = env("HTTP_POOL_SIZE", "20", int)
+    HTTP_CONNECT_TIMEOUT = 5  # 초
+    HTTP_READ_TIMEOUT = 30  # 초
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_BASE = 0.5  # 초, 재시도마다 2배 (지터 적용)
+    HTTP_BACKOFF_MAX = 8  # 초
+    # 서킷 브레이커: 연속 실패 N회 시 일정 시간 동안 즉시 실패 처리
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_RESET_TIMEOUT = 30  # 초
+
+    # GMS API 승인 제어 (모든 세션 공유: 동시 호출 수, 분당 요청/토큰 한도, 대기열)
+    API_MAX_CONCURRENCY = 8
+    API_REQUESTS_PER_MINUTE = 60
+    API_TOKENS_PER_MINUTE = 400000  # 요청당 max_completion_tokens로 추정
+    API_MAX_QUEUE = 50  # 초과 시 즉시 거부
+    API_QUEUE_TIMEOUT = 60  # 초
+
+    # 계측 (단계별 소요 시간, 캐시 적중률, 토큰 사용량). 끄면 계측 호출은 거의 비용이 없다
+    METRICS_ENABLED = env("METRICS_ENABLED", "", _flag)
+    METRICS_HOST = env("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = env("METRICS_PORT", "0", int)  # 지정 시 /metrics (Prometheus), /metrics.json 노출
+    METRICS_JSONL_PATH = env("METRICS_JSONL_PATH", "")  # 지정 시 주기적으로 스냅샷을 JSON Lines로 기록
+    METRICS_EXPORT_INTERVAL = 60  # 초
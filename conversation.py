@@ -0,0 +1,217 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+
+# 한글/한자/가나는 대략 글자당 1토큰, 그 외 문자는 약 4글자당 1토큰으로 추정
+_CJK_RE = re.compile(r"[ᄀ-ᇿ぀-ヿ㄰-㆏一-鿿가-힣]")
+# 메시지마다 role/구분자에 드는 고정 비용
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "다음은 사용자와 어시스턴트의 이전 대화입니다. 이후 대화에 필요한 사실, 사용자 요청, "
+    "결론만 남겨 한국어로 간결하게 요약하세요. 기존 요약이 있으면 새 내용과 합쳐 하나의 요약으로 만드세요."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수 추정 (토크나이저 없이 문자 종류 기반)"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def message_tokens(message: Dict) -> int:
+    """메시지 토큰 수 (메시지 레코드에 'tokens'로 캐시하여 매 턴 재계산하지 않음)"""
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = estimate_tokens(str(message.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+        message["tokens"] = tokens
+    return tokens
+
+
+def to_api_message(message: Dict) -> Dict:
+    """API로 보낼 role/content만 남긴 메시지 (캐시용 필드 제거)"""
+    return {"role": message["role"], "content": message["content"]}
+
+
+class ConversationMemory:
+    """세션별 롤링 요약 상태
+
+    history[:summarized_upto] 구간은 summary 하나로 접혀 있고, 그 이후 메시지만 원문으로 보낸다.
+    """
+
+    def __init__(self):
+        self.summary = ""
+        self.summarized_upto = 0
+        self.pending_upto: Optional[int] = None
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.summary = ""
+            self.summarized_upto = 0
+            self.pending_upto = None
+            # 진행 중이던 요약 결과는 무시되도록 세대 번호 증가
+            self.generation += 1
+
+
+class ContextWindow:
+    """토큰 예산 안에서 최근 대화만 유지하고 오래된 대화는 롤링 요약으로 접는 프롬프트 빌더
+
+    - 최근 대화(요약 이후 구간)가 입력 예산을 넘으면 예산의 절반까지 줄이고,
+      잘려 나간 구간은 백그라운드에서 기존 요약과 합쳐 새 요약을 만든다
+    - 요약이 완료되기 전까지는 접히는 중인 구간도 예산이 허락하는 만큼 원문으로 보내고,
+      넘치는 앞부분만 뺀다 (요청 크기는 항상 예산 이내)
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        summarize: Callable[[str, List[Dict]], str],
+        input_budget: int = 6000,
+        summary_max_tokens: int = 500
+    ):
+        self.summarize = summarize
+        self.input_budget = input_budget
+        self.summary_max_tokens = summary_max_tokens
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="context-summary")
+            return cls._executor
+
+    def build(self, prefix: List[Dict], history: List[Dict], memory: ConversationMemory, reserve_tokens: int = 0) -> List[Dict]:
+        """prefix(developer/system) + 요약 + 최근 대화로 API 요청 메시지 구성
+
+        reserve_tokens는 나중에 덧붙일 내용(예: 참고 기사)을 위해 예산에서 미리 빼 둔다.
+        """
+        with memory.lock:
+            if memory.summarized_upto > len(history):
+                # 대화가 초기화된 경우
+                memory.summary = ""
+                memory.summarized_upto = 0
+                memory.pending_upto = None
+                memory.generation += 1
+            summary = memory.summary
+            start = memory.summarized_upto
+            pending_upto = memory.pending_upto
+
+        summary_message = None
+        if summary:
+            summary_message = {"role": "system", "content": f"이전 대화 요약:\n{summary}"}
+
+        budget = self.input_budget - reserve_tokens - sum(message_tokens(m) for m in prefix)
+        if summary_message:
+            budget -= message_tokens(summary_message)
+
+        recent_tokens = sum(message_tokens(m) for m in history[start:])
+        if recent_tokens > budget and pending_upto is not None:
+            # 요약이 끝나지 않은 구간은 예산을 넘는 앞부분만 빼고 원문으로 보낸다
+            while start < pending_upto and recent_tokens > budget:
+                recent_tokens -= message_tokens(history[start])
+                start += 1
+        if recent_tokens > budget:
+            # 예산의 절반이 될 때까지의 오래된 메시지는 요약으로 접는다
+            cut = start
+            kept_tokens = recent_tokens
+            target = budget // 2
+            while cut < len(history) - 1 and kept_tokens > target:
+                kept_tokens -= message_tokens(history[cut])
+                cut += 1
+            self._schedule_fold(history, start, cut, memory)
+            # 요약이 끝날 때까지 접히는 구간도 예산이 허락하는 만큼 원문으로 보낸다
+            while start < cut and recent_tokens > budget:
+                recent_tokens -= message_tokens(history[start])
+                start += 1
+
+        messages = [to_api_message(m) for m in prefix]
+        if summary_message:
+            messages.append(to_api_message(summary_message))
+        messages.extend(to_api_message(m) for m in history[start:])
+        return messages
+
+    def _schedule_fold(self, history: List[Dict], start: int, cut: int, memory: ConversationMemory):
+        """history[summarized_upto:cut] 구간을 기존 요약과 합쳐 비동기로 새 요약 생성"""
+        with memory.lock:
+            if memory.pending_upto is not None and memory.pending_upto >= cut:
+                return
+            memory.pending_upto = cut
+            generation = memory.generation
+            previous = memory.summary
+            folded = [to_api_message(m) for m in history[memory.summarized_upto:cut]]
+
+        def fold():
+            try:
+                summary = self.summarize(previous, folded)
+            except Exception as e:
+                print(f"대화 요약 중 오류: {e}")
+                summary = ""
+            if not summary:
+                summary = self.fallback_summary(previous, folded)
+            with memory.lock:
+                # 대화가 초기화됐거나 더 넓은 구간의 요약이 이미 반영된 경우 무시
+                if memory.generation != generation or cut < memory.summarized_upto:
+                    return
+                memory.summary = summary
+                memory.summarized_upto = max(memory.summarized_upto, cut)
+                if memory.pending_upto is not None and memory.pending_upto <= cut:
+                    memory.pending_upto = None
+
+        self._get_executor().submit(fold)
+
+    def fallback_summary(self, previous: str, messages: List[Dict]) -> str:
+        """LLM 요약 실패 시 메시지 앞부분을 이어 붙인 추출 요약 (요약 토큰 한도 내)"""
+        lines = [previous] if previous else []
+        for m in messages:
+            content = " ".join(str(m.get("content", "")).split())
+            lines.append(f"{m.get('role')}: {content[:100]}")
+        # 최신 내용을 우선 보존하도록 뒤에서부터 한도까지 채운다
+        kept = []
+        total = 0
+        for line in reversed(lines):
+            tokens = estimate_tokens(line)
+            if kept and total + tokens > self.summary_max_tokens:
+                break
+            kept.append(line)
+            total += tokens
+        return "\n".join(reversed(kept))
+
+
+def llm_summarizer(chat_handler_factory: Callable, max_tokens: int = 500) -> Callable[[str, List[Dict]], str]:
+    """ChatHandler로 롤링 요약을 생성하는 summarize 함수 생성"""
+
+    def summarize(previous: str, messages: List[Dict]) -> str:
+        transcript = []
+        if previous:
+            transcript.append(f"[기존 요약]\n{previous}\n")
+        for m in messages:
+            # 긴 메시지(기사 요약 등)는 앞부분만 사용
+            transcript.append(f"{m['role']}: {str(m['content'])[:1000]}")
+        return chat_handler_factory().send_message(
+            [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": "\n".join(transcript)}
+            ],
+            max_tokens=max_tokens
+        )
+
+    return summarize
+
+
+def default_context_window() -> ContextWindow:
+    """Config 설정과 ChatHandler 기반 요약기를 사용하는 ContextWindow 생성"""
+    from chat_handler import ChatHandler
+    return ContextWindow(
+        llm_summarizer(ChatHandler, Config.CONTEXT_SUMMARY_MAX_TOKENS),
+        input_budget=Config.CONTEXT_INPUT_BUDGET,
+        summary_max_tokens=Config.CONTEXT_SUMMARY_MAX_TOKENS
+    )
@@ -0,0 +1,333 @@
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+from config import Config
+import metrics
+
+# 이 크기(바이트) 이상인 메시지 본문은 압축하여 저장
+COMPRESS_MIN_BYTES = 512
+# 디스크 구간을 거꾸로 읽을 때 한 번에 가져오는 메시지 수
+REVERSE_PAGE = 20
+
+
+def message_bytes(message: Dict) -> int:
+    """메시지 한 건의 상주 메모리 추정치 (렌더링 시 캐시되는 HTML 포함)"""
+    content = sys.getsizeof(str(message.get("content", "")))
+    html = message.get("html")
+    # HTML은 렌더링 후에 붙으므로 아직 없으면 본문 크기만큼 잡아 둔다
+    return sys.getsizeof(message) + content + (sys.getsizeof(html) if html is not None else content)
+
+
+class ConversationStore:
+    """세션별 대화 기록의 오래된 부분을 보관하는 추가 전용 SQLite 저장소
+
+    - 메시지는 (session_id, seq)로 저장하고, 큰 본문은 zlib으로 압축
+    - 열려 있는 세션 기록(ConversationLog)을 추적하여 전체 상주 메모리가 global_max_bytes를 넘거나
+      idle_timeout 동안 사용되지 않은 세션은 메모리 구간을 디스크로 내린다
+    - 세션이 끝나 기록 객체가 사라지면 해당 세션 행도 삭제하고, retention이 지난 행은 prune_interval마다 정리한다
+    - 행 키는 기록 객체마다 고유하여 이전 프로세스의 행은 다시 읽을 수 없으므로 시작 시 모두 삭제한다
+      (그래서 같은 DB 파일을 여러 프로세스가 함께 쓰면 안 된다)
+    """
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        global_max_bytes: int = 256 * 1024 * 1024,
+        idle_timeout: float = 1800,
+        retention: float = 7 * 86400,
+        sweep_interval: float = 30,
+        prune_interval: float = 3600
+    ):
+        self.global_max_bytes = global_max_bytes
+        self.idle_timeout = idle_timeout
+        self.retention = retention
+        self.sweep_interval = sweep_interval
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._logs: "weakref.WeakSet[ConversationLog]" = weakref.WeakSet()
+        self._logs_lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content BLOB NOT NULL,
+                compressed INTEGER NOT NULL,
+                tokens INTEGER,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_messages_stored ON messages (stored_at);
+            """
+        )
+        # 이전 프로세스가 남긴 행(다시 읽을 수 없는 기록) 삭제
+        self._db.execute("DELETE FROM messages")
+        self._db.commit()
+        self._last_prune = time.monotonic()
+
+    def append(self, key: str, start_seq: int, messages: List[Dict]):
+        """메시지를 start_seq부터 순서대로 저장"""
+        now = time.time()
+        rows = []
+        for seq, message in enumerate(messages, start_seq):
+            data = str(message.get("content", "")).encode("utf-8")
+            compressed = len(data) >= COMPRESS_MIN_BYTES
+            if compressed:
+                data = zlib.compress(data, 1)
+            rows.append((key, seq, message.get("role", "user"), data, int(compressed), message.get("tokens"), now))
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO messages (session_id, seq, role, content, compressed, tokens, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+        metrics.incr("conversation_spilled_messages_total", len(rows))
+
+    def load(self, key: str, start: int, stop: int) -> List[Dict]:
+        """seq가 [start, stop) 구간인 메시지를 순서대로 읽음"""
+        if start >= stop:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content, compressed, tokens FROM messages "
+                "WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (key, start, stop)
+            ).fetchall()
+        metrics.incr("conversation_loaded_messages_total", len(rows))
+        messages = []
+        for role, data, compressed, tokens in rows:
+            if compressed:
+                data = zlib.decompress(data)
+            message = {"role": role, "content": data.decode("utf-8")}
+            if tokens is not None:
+                message["tokens"] = tokens
+            messages.append(message)
+        return messages
+
+    def delete_session(self, key: str):
+        try:
+            with self._lock:
+                self._db.execute("DELETE FROM messages WHERE session_id = ?", (key,))
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"대화 기록 삭제 중 오류: {e}")
+
+    def prune(self):
+        """retention이 지난 행 삭제 (오래 열려 있는 세션의 이전 메시지 포함)"""
+        self._last_prune = time.monotonic()
+        cutoff = time.time() - self.retention
+        try:
+            with self._lock:
+                self._db.execute("DELETE FROM messages WHERE stored_at < ?", (cutoff,))
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"대화 기록 정리 중 오류: {e}")
+
+    def register(self, log: "ConversationLog"):
+        with self._logs_lock:
+            self._logs.add(log)
+
+    def resident_bytes(self) -> int:
+        """열려 있는 모든 세션 기록의 메모리 구간 크기 합"""
+        with self._logs_lock:
+            logs = list(self._logs)
+        return sum(log.resident_bytes for log in logs)
+
+    def maintain(self, force: bool = False):
+        """전체 메모리 상한 / 유휴 세션 정리 (sweep_interval마다 또는 상한 초과 시), 디스크 행 정리 (prune_interval마다)"""
+        with self._logs_lock:
+            logs = list(self._logs)
+        total = sum(log.resident_bytes for log in logs)
+        now = time.monotonic()
+        if not force and total <= self.global_max_bytes and now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        if now - self._last_prune >= self.prune_interval:
+            self.prune()
+
+        # 유휴 세션은 메모리 구간 전체를 디스크로 (다시 사용하면 필요한 만큼 읽음)
+        for log in logs:
+            if now - log.last_used >= self.idle_timeout and log.resident_bytes:
+                total -= log.spill(keep=0)
+
+        # 그래도 상한을 넘으면 가장 오래 사용되지 않은 세션부터 최근 메시지 하나만 남기고 내림
+        if total > self.global_max_bytes:
+            for log in sorted(logs, key=lambda log: log.last_used):
+                if total <= self.global_max_bytes:
+                    break
+                total -= log.spill(keep=1)
+        metrics.observe("conversation_resident_bytes", total)
+
+
+class ConversationLog:
+    """세션 대화 기록: 최근 메시지(hot tail)만 메모리에 두고 이전 메시지는 ConversationStore로 내리는 리스트형 객체
+
+    append/len/인덱스/슬라이스/역순 순회를 지원하므로 st.session_state.messages를 쓰는 기존 코드를 그대로 사용한다.
+    인덱스는 내려간 메시지를 포함한 전체 기준이며, 디스크 구간은 읽을 때마다 새 dict로 반환된다.
+    """
+
+    def __init__(
+        self,
+        store: ConversationStore,
+        session_id: str,
+        messages: Iterable[Dict] = (),
+        hot_messages: int = 40,
+        max_bytes: int = 1024 * 1024
+    ):
+        self.store = store
+        self.session_id = session_id
+        # 디스크 행 키는 기록 객체마다 고유 (같은 세션의 이전 기록 객체가 정리될 때 새 기록을 지우지 않도록)
+        self._key = f"{session_id}:{uuid.uuid4().hex}"
+        self.hot_messages = hot_messages
+        self.max_bytes = max_bytes
+        self.last_used = time.monotonic()
+        self._offset = 0  # 디스크에 있는 메시지 수 (seq 0 .. offset-1)
+        self._hot: List[Dict] = []
+        self._resident = 0
+        self._lock = threading.RLock()
+        store.register(self)
+        # 세션이 끝나 기록 객체가 사라지면 디스크 행도 삭제
+        weakref.finalize(self, store.delete_session, self._key)
+        for message in messages:
+            self.append(message)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident
+
+    def __len__(self) -> int:
+        return self._offset + len(self._hot)
+
+    def append(self, message: Dict):
+        with self._lock:
+            self.last_used = time.monotonic()
+            self._hot.append(message)
+            self._resident += message_bytes(message)
+            over_bytes = self._resident > self.max_bytes
+            if len(self._hot) > self.hot_messages or over_bytes:
+                self._spill_to_limits()
+        self.store.maintain(force=over_bytes)
+
+    def extend(self, messages: Iterable[Dict]):
+        for message in messages:
+            self.append(message)
+
+    def _spill_to_limits(self):
+        """메시지 수 / 세션 메모리 상한을 넘는 오래된 메시지를 디스크로 (최근 메시지 하나는 유지)"""
+        count = max(0, len(self._hot) - self.hot_messages)
+        resident = self._resident - sum(message_bytes(m) for m in self._hot[:count])
+        while count < len(self._hot) - 1 and resident > self.max_bytes:
+            resident -= message_bytes(self._hot[count])
+            count += 1
+        self._spill(count)
+
+    def _spill(self, count: int) -> int:
+        if count <= 0:
+            return 0
+        spilled = self._hot[:count]
+        self.store.append(self._key, self._offset, spilled)
+        self._offset += count
+        del self._hot[:count]
+        # HTML 캐시가 붙은 뒤일 수 있으므로 남은 구간 기준으로 다시 계산
+        before = self._resident
+        self._resident = sum(message_bytes(m) for m in self._hot)
+        return before - self._resident
+
+    def spill(self, keep: int = 0) -> int:
+        """최근 keep개만 남기고 메모리 구간을 디스크로 내림. 줄어든 바이트 수 반환"""
+        with self._lock:
+            return self._spill(len(self._hot) - keep)
+
+    def clear(self):
+        """대화 초기화 (디스크 행 포함)"""
+        with self._lock:
+            self.store.delete_session(self._key)
+            self._offset = 0
+            self._hot = []
+            self._resident = 0
+            self.last_used = time.monotonic()
+
+    def _read(self, start: int, stop: int) -> List[Dict]:
+        """[start, stop) 구간 메시지 (디스크 구간은 필요한 만큼만 읽음)"""
+        with self._lock:
+            self.last_used = time.monotonic()
+            offset = self._offset
+            result = self.store.load(self._key, start, min(stop, offset)) if start < offset else []
+            result.extend(self._hot[max(0, start - offset):max(0, stop - offset)])
+        return result
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                return self._read(0, length)[index]
+            return self._read(start, max(start, stop))
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ConversationLog index out of range")
+        return self._read(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._read(0, len(self)))
+
+    def __reversed__(self) -> Iterator[Dict]:
+        with self._lock:
+            hot = list(self._hot)
+            offset = self._offset
+        yield from reversed(hot)
+        # 디스크 구간은 뒤에서부터 페이지 단위로 필요한 만큼만 읽음
+        stop = offset
+        while stop > 0:
+            start = max(0, stop - REVERSE_PAGE)
+            yield from reversed(self.store.load(self._key, start, stop))
+            stop = start
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"ConversationLog(session_id={self.session_id!r}, len={len(self)}, hot={len(self._hot)})"
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """모든 세션이 공유하는 프로세스 전역 대화 저장소 반환"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConversationStore(
+                    db_path=Config.CONVERSATION_STORE_DB,
+                    global_max_bytes=Config.CONVERSATION_GLOBAL_MAX_BYTES,
+                    idle_timeout=Config.CONVERSATION_IDLE_TIMEOUT,
+                    retention=Config.CONVERSATION_RETENTION,
+                    prune_interval=Config.CONVERSATION_PRUNE_INTERVAL
+                )
+    return _store
+
+
+def new_conversation_log(session_id: str, messages: Iterable[Dict] = ()) -> ConversationLog:
+    """Config 설정으로 세션 대화 기록 생성"""
+    return ConversationLog(
+        get_conversation_store(),
+        session_id,
+        messages,
+        hot_messages=Config.CONVERSATION_HOT_MESSAGES,
+        max_bytes=Config.CONVERSATION_SESSION_MAX_BYTES
+    )
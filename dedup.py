@@ -0,0 +1,217 @@
+import hashlib
+import html
+import re
+import threading
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from config import Config
+from news_item import NewsItem
+import metrics
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+# 링크 정규화 시 제거하는 추적/표시용 쿼리 파라미터
+TRACKING_PARAMS = {"oc", "fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "from"}
+TRACKING_PREFIXES = ("utm_",)
+# SimHash 비트 수와 밴드 수 (거리 max_distance 이하인 두 서명은 적어도 한 밴드가 완전히 같음)
+SIMHASH_BITS = 64
+# 제목 shingle은 요약보다 높은 가중치
+TITLE_WEIGHT = 2
+
+
+def canonical_link(url: str) -> str:
+    """링크 정규화: 스킴/호스트 소문자, www 제거, 추적 파라미터·fragment·끝 슬래시 제거"""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urllib.parse.urlsplit(url)
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    # http/https는 같은 기사로 취급
+    return urllib.parse.urlunsplit(("https", host, path, urllib.parse.urlencode(query), ""))
+
+
+def normalize_text(text: str) -> str:
+    """HTML 태그/엔티티, 문장 부호를 제거하고 소문자·공백 정리"""
+    text = html.unescape(_TAG_RE.sub(" ", text or "")).lower()
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def _strip_source(title: str, source: str) -> str:
+    """Google News 제목 끝의 " - 언론사" 제거 (같은 기사가 언론사명만 다르게 보이지 않도록)
+
+    끝부분이 언론사명과 같을 때만 제거한다 (언론사를 모르면 마지막 " - " 뒤를 언론사로 본다).
+    """
+    head, sep, tail = title.rpartition(" - ")
+    if sep and head and (not source.strip() or tail.strip() == source.strip()):
+        return head
+    return title
+
+
+def _shingles(text: str) -> Set[str]:
+    """문자 3-gram (한국어는 띄어쓰기·조사 차이가 커서 단어 대신 문자 단위 사용)"""
+    text = text.replace(" ", "")
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(item: NewsItem) -> Optional[int]:
+    """정규화한 제목 + 요약의 64비트 SimHash (비교할 본문이 없으면 None)"""
+    title = normalize_text(_strip_source(item.title, item.source))
+    # 요약에 붙는 언론사명도 제외 (Google News 요약은 "제목 + 언론사" 형태인 경우가 많음)
+    summary = normalize_text(item.summary.replace(item.source, " ") if item.source else item.summary)
+    title_shingles = _shingles(title)
+    features = [_feature_hash(f) for f in title_shingles] * TITLE_WEIGHT
+    features.extend(_feature_hash(f) for f in _shingles(summary) - title_shingles)
+    if not features:
+        return None
+    # 비트 열 문자열을 전치해 자리별 1의 개수를 센다 (비트 단위 파이썬 루프보다 훨씬 빠름)
+    threshold = len(features) / 2
+    bits = zip(*(format(h, "064b") for h in features))
+    value = 0
+    for column in bits:
+        value = (value << 1) | (column.count("1") > threshold)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class DuplicateIndex:
+    """기사 서명(SimHash)을 증분 유지하는 중복 색인
+
+    - 정규화한 링크가 같으면 같은 기사, 링크가 달라도 SimHash 해밍 거리가 max_distance 이하면 같은 이야기로 본다
+    - 서명을 max_distance + 1개 밴드로 나눠 밴드 값별 버킷에 넣으므로 새 기사 확인은 버킷 몇 개만 비교한다
+    - 이미 본 링크는 서명을 다시 계산하지 않으며, max_entries를 넘으면 가장 오래 쓰이지 않은 서명부터 제거
+    """
+
+    def __init__(self, max_distance: int = 3, max_entries: int = 20000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.bands = max_distance + 1
+        self._band_bits = -(-SIMHASH_BITS // self.bands)
+        self._band_mask = (1 << self._band_bits) - 1
+        # key -> (서명, 대표 key)
+        self._entries: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature: int):
+        return [(i, (signature >> (i * self._band_bits)) & self._band_mask) for i in range(self.bands)]
+
+    @staticmethod
+    def item_key(item: NewsItem) -> str:
+        link = canonical_link(item.link)
+        if link:
+            return link
+        # 링크가 없는 기사는 정규화한 내용으로 구분
+        return "text:" + hashlib.sha256(normalize_text(f"{item.title}\n{item.summary}").encode("utf-8")).hexdigest()
+
+    def cluster_of(self, item: NewsItem) -> str:
+        """기사가 속한 중복 묶음의 대표 key (처음 본 기사면 색인에 추가)"""
+        key = self.item_key(item)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        signature = simhash(item)
+        if signature is None:
+            # 본문이 없는 기사끼리는 모두 같은 서명(0)이 되어 하나로 묶이므로 링크 기준으로만 구분
+            return key
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[1]
+            cluster = key
+            checked = set()
+            for band in band_keys:
+                for other in self._buckets.get(band, ()):
+                    if other in checked:
+                        continue
+                    checked.add(other)
+                    other_signature, other_cluster = self._entries[other]
+                    if hamming(signature, other_signature) <= self.max_distance:
+                        cluster = other_cluster
+                        break
+                if cluster != key:
+                    break
+            self._entries[key] = (signature, cluster)
+            for band in band_keys:
+                self._buckets.setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+        return cluster
+
+    def _evict(self):
+        key, (signature, _) = self._entries.popitem(last=False)
+        for band in self._band_keys(signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def dedupe(self, news_items: List[NewsItem]) -> List[NewsItem]:
+        """목록에서 중복 기사를 제거 (각 묶음의 첫 기사만 남기고 순서 유지)"""
+        seen = set()
+        unique = []
+        for item in news_items:
+            cluster = self.cluster_of(item)
+            if cluster in seen:
+                continue
+            seen.add(cluster)
+            unique.append(item)
+        return unique
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_index: Optional[DuplicateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """모든 피드/검색 결과가 공유하는 프로세스 전역 중복 색인 반환"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DuplicateIndex(
+                    max_distance=Config.NEWS_DEDUP_MAX_DISTANCE,
+                    max_entries=Config.NEWS_DEDUP_INDEX_SIZE
+                )
+    return _index
+
+
+def dedupe(news_items: List[NewsItem]) -> List[NewsItem]:
+    """중복 기사 제거 (NEWS_DEDUP_ENABLED가 꺼져 있으면 그대로 반환)"""
+    if not Config.NEWS_DEDUP_ENABLED or len(news_items) < 2:
+        return news_items
+    with metrics.span("news_dedupe"):
+        unique = get_duplicate_index().dedupe(news_items)
+    if len(unique) < len(news_items):
+        metrics.incr("news_duplicates_removed_total", len(news_items) - len(unique))
+    return unique
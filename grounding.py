@@ -0,0 +1,149 @@
+import html
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from conversation import estimate_tokens
+from dedup import dedupe
+from intent import extract_keywords
+from news_item import NewsItem
+import metrics
+
+GROUNDING_PROMPT = (
+    "다음은 사용자 질문과 관련될 수 있는 최신 뉴스 기사입니다. 답변에 기사 내용을 사용했다면 "
+    "해당 문장 끝에 [번호]로 출처를 표시하세요. 질문과 관련 없는 기사는 무시하세요."
+)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_CITATION_RE = re.compile(r"\[(\d{1,2})\]")
+# 기사 한 건당 요약 최대 글자 수 (프롬프트를 짧게 유지)
+SUMMARY_CHARS = 160
+
+
+def retrieve(text: str, category: str = "최신뉴스", top_k: int = 5) -> List[NewsItem]:
+    """질문과 관련된 기사 상위 top_k개 검색
+
+    로컬 기사 저장소에서 부분 일치(GROUNDING_MIN_COVERAGE)로 먼저 찾고,
+    없으면 검색 RSS(NewsHandler.search_news)로 대체한다.
+    """
+    from article_store import get_article_store
+    from news_handler import NewsHandler
+
+    query = extract_keywords(text) or text.strip()
+    if not query:
+        return []
+    with metrics.span("grounding_retrieval"):
+        # 카테고리 피드가 저장소에 색인되도록 캐시를 채운다 (캐시 적중 시 비용 없음)
+        NewsHandler.fetch_news(category, max_items=top_k)
+        items = get_article_store().search(query, max_items=top_k * 2, min_coverage=Config.GROUNDING_MIN_COVERAGE)
+        if not items:
+            items = NewsHandler.search_news(query, category=category, max_items=top_k)
+        # 같은 기사가 여러 번 들어가 토큰을 낭비하지 않도록 중복 제거
+        items = dedupe(items)
+    return items[:top_k]
+
+
+def _clean(text: str) -> str:
+    return " ".join(html.unescape(_TAG_RE.sub(" ", text or "")).split())
+
+
+def format_sources(news_items: List[NewsItem], budget_tokens: int) -> Tuple[List[NewsItem], str]:
+    """기사 목록을 토큰 예산 안의 번호 붙은 참고 블록으로 변환 ([번호] 제목 (출처, 작성일) + 요약)
+
+    예산을 넘는 기사는 제목만 넣고, 그래도 넘으면 거기서 멈춘다.
+
+    Returns:
+        (블록에 포함된 기사, 블록 텍스트). 포함된 기사가 없으면 ([], "")
+    """
+    used: List[NewsItem] = []
+    lines: List[str] = []
+    remaining = budget_tokens - estimate_tokens(GROUNDING_PROMPT)
+    for item in news_items:
+        number = len(used) + 1
+        header = f"[{number}] {_clean(item.title)} ({item.source}, {item.published})"
+        summary = _clean(item.summary)
+        if len(summary) > SUMMARY_CHARS:
+            summary = summary[:SUMMARY_CHARS] + "…"
+        for line in (f"{header}\n{summary}" if summary else header, header):
+            cost = estimate_tokens(line) + 1
+            if cost <= remaining:
+                lines.append(line)
+                used.append(item)
+                remaining -= cost
+                break
+        else:
+            break
+    if not used:
+        return [], ""
+    return used, "\n".join(lines)
+
+
+def inject_sources(messages: List[Dict], sources_block: str) -> List[Dict]:
+    """참고 기사 블록을 마지막 사용자 메시지 바로 앞에 system 메시지로 삽입"""
+    if not sources_block:
+        return messages
+    grounding = {"role": "system", "content": f"{GROUNDING_PROMPT}\n\n{sources_block}"}
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            return messages[:i] + [grounding] + messages[i:]
+    return messages + [grounding]
+
+
+def cited_sources(response: str, sources: List[NewsItem]) -> str:
+    """응답에서 실제로 인용된 [번호]의 기사 목록 (링크 포함). 인용이 없으면 빈 문자열"""
+    cited = sorted({int(n) for n in _CITATION_RE.findall(response) if 1 <= int(n) <= len(sources)})
+    if not cited:
+        return ""
+    lines = ["참고 기사:"]
+    lines.extend(f"[{n}] {_clean(sources[n - 1].title)} - {sources[n - 1].link}" for n in cited)
+    return "\n".join(lines)
+
+
+class GroundedRetrieval:
+    """프롬프트 준비와 동시에 백그라운드에서 진행되는 기사 검색
+
+    retrieval = GroundedRetrieval.start(user_text, category)
+    messages = ...  # 대화 윈도우 구성 등 다른 준비 작업
+    sources, block = retrieval.result()
+    """
+
+    def __init__(self, future: Future, budget_tokens: int):
+        self._future = future
+        self.budget_tokens = budget_tokens
+
+    @classmethod
+    def start(cls, text: str, category: str = "최신뉴스", top_k: Optional[int] = None, budget_tokens: Optional[int] = None) -> "GroundedRetrieval":
+        future = _get_executor().submit(retrieve, text, category, top_k or Config.GROUNDING_TOP_K)
+        return cls(future, Config.GROUNDING_TOKEN_BUDGET if budget_tokens is None else budget_tokens)
+
+    def result(self, timeout: Optional[float] = None) -> Tuple[List[NewsItem], str]:
+        """검색 결과를 예산 안의 참고 블록으로 반환. 시간 초과/오류 시 ([], "")로 참고 없이 진행
+
+        시간이 초과되어도 검색은 백그라운드에서 끝까지 진행되어 저장소/캐시에 반영된다.
+        """
+        if timeout is None:
+            timeout = Config.GROUNDING_TIMEOUT
+        try:
+            items = self._future.result(timeout=timeout)
+        except FutureTimeoutError:
+            print("참고 기사 검색 시간 초과: 참고 없이 답변합니다.")
+            return [], ""
+        except Exception as e:
+            print(f"참고 기사 검색 중 오류: {e}")
+            return [], ""
+        return format_sources(items, self.budget_tokens)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """기사 검색용 공유 스레드 풀 (크기 제한)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.NEWS_FETCH_WORKERS, thread_name_prefix="grounding")
+    return _executor
@@ -0,0 +1,234 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Optional
+from urllib.parse import urlsplit
+
+from config import Config
+
+if TYPE_CHECKING:
+    import requests
+
+
+# 재시도 대상 HTTP 상태 코드 (레이트 리밋 + 일시적 서버 오류)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 응답을 받지 못했을 때 다시 보내도 되는 메서드 (POST 등은 서버가 이미 처리 중일 수 있음)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 요청을 즉시 거부할 때 발생"""
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커
+
+    - closed: 정상 상태, 요청 허용
+    - open: 연속 실패가 임계값에 도달하면 reset_timeout 동안 요청을 즉시 거부
+    - half-open: reset_timeout 이후 시험 요청 1건만 허용, 성공하면 closed로 복귀
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # half-open: 시험 요청은 한 번에 하나만 통과
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """성공/실패를 판단할 수 없이 끝난 시험 요청 표시 해제 (다음 요청이 시험을 이어감)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class HttpTransport:
+    """프로세스 전역에서 공유하는 keep-alive HTTP 전송 계층
+
+    커넥션 풀(requests.Session + HTTPAdapter)을 재사용해 요청마다 TCP/TLS 핸드셰이크를
+    반복하지 않고, 429/5xx 및 연결 오류는 지터가 적용된 지수 백오프로 재시도한다.
+    서킷 브레이커는 호스트별로 따로 두어 뉴스 피드 장애가 GMS 호출을 막지 않게 한다.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 20,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = (connect_timeout, read_timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+        # requests는 가져오는 비용이 커서 전송 계층을 처음 만들 때 불러온다
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        # 재시도는 아래 request()에서 직접 처리하므로 어댑터 재시도는 끈다
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        """URL 호스트에 해당하는 서킷 브레이커 반환 (없으면 생성)"""
+        host = urlsplit(url).netloc
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """재시도 대기 시간 계산 (Retry-After 우선, 없으면 full jitter 지수 백오프)"""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 초로 변환"""
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, method: str, url: str, headers: Optional[Dict] = None, **kwargs) -> "requests.Response":
+        """재시도/서킷 브레이커가 적용된 HTTP 요청
+
+        비멱등 메서드(POST 등)의 읽기 타임아웃은 서버가 이미 처리 중일 수 있으므로 재시도하지 않는다.
+        재시도 대상이 아닌 응답(2xx, 4xx 등)은 그대로 반환하며, 재시도를 모두 소진하면
+        마지막 응답을 반환하거나 마지막 연결 오류를 다시 발생시킨다.
+        """
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        breaker = self.breaker_for(url)
+        # 비멱등 요청은 서버에 전달되지 않은 것이 확실한 연결 실패만 재시도 (읽기 타임아웃은 중복 생성 위험)
+        if method.upper() in IDEMPOTENT_METHODS:
+            retryable_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        else:
+            retryable_errors = (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout)
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError("API 엔드포인트 장애로 요청을 일시 차단했습니다. 잠시 후 다시 시도하세요.")
+
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except retryable_errors:
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            except requests.exceptions.Timeout:
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # 그 밖의 오류(ChunkedEncodingError, InvalidURL, KeyboardInterrupt 등)에도 half-open 시험 표시를 풀어야
+                # 이 호스트로 가는 요청이 계속 차단되지 않는다
+                breaker.release_probe()
+                raise
+
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response
+
+            # 429는 엔드포인트가 살아 있다는 뜻이므로 브레이커 실패로 세지 않는다
+            if response.status_code == 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+            if attempt >= self.max_retries:
+                return response
+
+            retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+            response.close()
+            time.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+    def post(self, url: str, headers: Optional[Dict] = None, **kwargs) -> "requests.Response":
+        return self.request("POST", url, headers=headers, **kwargs)
+
+    def get(self, url: str, headers: Optional[Dict] = None, **kwargs) -> "requests.Response":
+        return self.request("GET", url, headers=headers, **kwargs)
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """모든 세션이 공유하는 프로세스 전역 HttpTransport 반환"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HttpTransport(
+                    pool_size=Config.HTTP_POOL_SIZE,
+                    max_retries=Config.HTTP_MAX_RETRIES,
+                    backoff_base=Config.HTTP_BACKOFF_BASE,
+                    backoff_max=Config.HTTP_BACKOFF_MAX,
+                    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+                    read_timeout=Config.HTTP_READ_TIMEOUT,
+                    failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                    reset_timeout=Config.CIRCUIT_RESET_TIMEOUT
+                )
+    return _transport
@@ -0,0 +1,44 @@
+import re
+from typing import Optional, Tuple
+
+# 기사 검색/요청으로 판단하는 키워드
+SEARCH_KEYWORDS = ["기사", "뉴스", "요약", "summary", "article", "search", "검색", "요청"]
+
+# 검색어 추출 시 제거하는 불용어
+REMOVE_TOKENS = ["기사", "뉴스", "요약", "요약해줘", "요약해", "검색", "검색해줘", "관련", "최신", "오늘", "정리해줘", "정리해"]
+ENGLISH_STOPWORDS = ["summary", "article", "news", "search"]
+
+# 메시지마다 키워드 목록을 여러 번 훑지 않도록 모듈 로드 시 한 번만 컴파일
+_SEARCH_RE = re.compile("|".join(map(re.escape, SEARCH_KEYWORDS)))
+# 불용어는 목록 순서대로 하나씩 제거한다. 하나의 대체 패턴으로 합치면 겹치는 단어의 결과가 달라진다
+# (예: "newsummary"는 순차 제거 시 "summary"가 먼저 빠져 "new"가 남지만, 대체 패턴은 앞의 "news"를 먼저 찾음)
+_REMOVE_SEQUENCE = tuple(REMOVE_TOKENS + ENGLISH_STOPWORDS)
+_PUNCT_RE = re.compile(r"[^\w\s\u3131-\u318E\uAC00-\uD7A3]")
+
+
+def detect_article_search(text: str) -> Tuple[bool, Optional[str]]:
+    """기사 검색/요청 판단: 간단 휴리스틱
+
+    Returns:
+        (기사 검색 여부, 검색어). 검색이 아니면 (False, None)
+    """
+    t = text.lower()
+    if not _SEARCH_RE.search(t):
+        return False, None
+
+    keyword = extract_keywords(t)
+    if not keyword:
+        # fallback: use the original text as keyword
+        keyword = text.strip()
+    return True, keyword
+
+
+def extract_keywords(text: str) -> str:
+    """검색어 추출: 불용어와 문장 부호, 한 글자 단어를 제거한 나머지 (없으면 빈 문자열)"""
+    s = text.lower()
+    for tok in _REMOVE_SEQUENCE:
+        s = s.replace(tok, " ")
+    # strip punctuation
+    s = _PUNCT_RE.sub(" ", s)
+    s = " ".join([w for w in s.split() if len(w) > 1])
+    return s.strip()
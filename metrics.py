@@ -0,0 +1,349 @@
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from config import Config
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# 단계별 소요 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (버킷별 개수 + 합계)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한 기준 분위수 추정 (Prometheus histogram_quantile과 같은 방식의 근사)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """프로세스 전역 계측 값 저장소 (카운터 + 히스토그램)
+
+    - 카운터: 요청 수, 캐시 적중/실패, 토큰 사용량 등 누적 값
+    - 히스토그램: 단계별 소요 시간(stage_duration_seconds{stage=...}) 등 분포
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict:
+        """현재 값 사본 (JSON 직렬화 가능)"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in sorted(self._counters.items())
+                for key, value in sorted(series.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(key),
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "p50": h.quantile(0.5),
+                    "p90": h.quantile(0.9),
+                    "p99": h.quantile(0.99)
+                }
+                for name, series in sorted(self._histograms.items())
+                for key, h in sorted(series.items())
+            ]
+            cache_ratio = self._cache_hit_ratio()
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "counters": counters,
+            "histograms": histograms,
+            "cache_hit_ratio": cache_ratio
+        }
+
+    def _cache_hit_ratio(self) -> Dict[str, float]:
+        """cache_requests_total{cache, result}에서 캐시별 적중률 계산 (lock 보유 상태에서 호출)"""
+        totals: Dict[str, List[float]] = {}
+        for key, value in self._counters.get("cache_requests_total", {}).items():
+            labels = dict(key)
+            hit_total = totals.setdefault(labels.get("cache", ""), [0.0, 0.0])
+            if labels.get("result") == "hit":
+                hit_total[0] += value
+            hit_total[1] += value
+        return {cache: round(hit / total, 4) for cache, (hit, total) in totals.items() if total}
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, path: str):
+        """스냅샷 한 줄을 JSON Lines 파일에 추가"""
+        line = json.dumps(self.snapshot(), ensure_ascii=False)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class _Span:
+    """단계 소요 시간을 stage_duration_seconds 히스토그램에 기록하는 컨텍스트 매니저"""
+
+    __slots__ = ("registry", "stage", "labels", "start")
+
+    def __init__(self, registry: MetricsRegistry, stage: str, labels: Dict):
+        self.registry = registry
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.registry.observe("stage_duration_seconds", elapsed, stage=self.stage, **self.labels)
+        if exc_type is not None:
+            self.registry.incr("stage_errors_total", stage=self.stage, **self.labels)
+        return False
+
+
+# 비활성화 시 span()이 돌려주는 재사용 가능한 빈 컨텍스트
+_NOOP_SPAN = nullcontext()
+
+_registry: Optional[MetricsRegistry] = None
+_initialized = False
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """프로세스 전역 계측 저장소 반환 (METRICS_ENABLED가 아니면 None)
+
+    처음 만들 때 설정에 따라 HTTP 노출 엔드포인트와 JSON Lines 내보내기 스레드를 시작한다.
+    """
+    global _registry, _initialized
+    if not _initialized:
+        with _registry_lock:
+            if not _initialized:
+                if Config.METRICS_ENABLED:
+                    _registry = _create_registry()
+                    if Config.METRICS_PORT:
+                        start_http_exporter(_registry, Config.METRICS_HOST, Config.METRICS_PORT)
+                    if Config.METRICS_JSONL_PATH:
+                        start_jsonl_exporter(_registry, Config.METRICS_JSONL_PATH, Config.METRICS_EXPORT_INTERVAL)
+                _initialized = True
+    return _registry
+
+
+def _create_registry() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.describe("stage_duration_seconds", "Time spent in each pipeline stage")
+    registry.describe("stage_errors_total", "Pipeline stage executions that raised")
+    registry.describe("cache_requests_total", "Cache lookups by cache and result")
+    registry.describe("gms_tokens_total", "Token usage reported by the GMS API")
+    registry.describe("gms_requests_total", "GMS API calls by mode and status")
+    return registry
+
+
+def span(stage: str, **labels):
+    """파이프라인 단계 계측
+
+        with metrics.span("news_parse"):
+            ...
+
+    비활성화 상태에서는 전역 플래그 확인 후 공유 빈 컨텍스트를 반환하므로 비용이 거의 없다.
+    """
+    registry = _registry if _initialized else get_metrics()
+    if registry is None:
+        return _NOOP_SPAN
+    return _Span(registry, stage, labels)
+
+
+def timed(stage: str, **labels):
+    """함수 전체를 span(stage)으로 계측하는 데코레이터"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage, **labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def incr(name: str, value: float = 1, **labels):
+    registry = _registry if _initialized else get_metrics()
+    if registry is not None:
+        registry.incr(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    registry = _registry if _initialized else get_metrics()
+    if registry is not None:
+        registry.observe(name, value, **labels)
+
+
+def enabled() -> bool:
+    return (_registry if _initialized else get_metrics()) is not None
+
+
+def record_cache(cache: str, hit: bool):
+    """캐시 조회 결과 기록 (cache_requests_total{cache, result})"""
+    incr("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def record_usage(usage: Optional[Dict], model: str = ""):
+    """API 응답의 usage 필드에서 토큰 사용량 기록
+
+    chat.completions 형식(prompt_tokens/completion_tokens)과
+    responses 형식(input_tokens/output_tokens)을 모두 처리한다.
+    """
+    registry = _registry if _initialized else get_metrics()
+    if registry is None or not isinstance(usage, dict):
+        return
+    fields = {
+        "prompt": usage.get("prompt_tokens", usage.get("input_tokens")),
+        "completion": usage.get("completion_tokens", usage.get("output_tokens"))
+    }
+    for kind, value in fields.items():
+        if isinstance(value, (int, float)):
+            registry.incr("gms_tokens_total", value, kind=kind, model=model)
+
+
+def start_http_exporter(registry: MetricsRegistry, host: str, port: int) -> Optional["ThreadingHTTPServer"]:
+    """/metrics (Prometheus 텍스트)와 /metrics.json 을 제공하는 백그라운드 HTTP 서버 시작"""
+    # http.server는 가져오는 비용이 커서 노출을 켰을 때만 불러온다
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body = registry.render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                content_type = "application/json; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        # 같은 포트를 이미 쓰는 프로세스가 있으면 노출만 생략
+        print(f"메트릭 엔드포인트 시작 실패 ({host}:{port}): {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_jsonl_exporter(registry: MetricsRegistry, path: str, interval: float) -> threading.Thread:
+    """interval초마다 스냅샷을 JSON Lines 파일에 추가하는 데몬 스레드 시작"""
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                registry.write_jsonl(path)
+            except Exception as e:
+                print(f"메트릭 기록 중 오류: {e}")
+
+    thread = threading.Thread(target=loop, name="metrics-jsonl", daemon=True)
+    thread.start()
+    return thread
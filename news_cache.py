@@ -0,0 +1,226 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from cache_backend import CacheBackend
+from news_item import NewsItem
+import metrics
+
+
+class FeedResult:
+    """피드 로더 결과 (조건부 GET 응답 포함)
+
+    status가 304이면 items는 None이며 기존 캐시 항목을 그대로 재사용한다.
+    """
+
+    __slots__ = ("status", "items", "etag", "modified")
+
+    def __init__(self, status: int, items: Optional[List[NewsItem]], etag: Optional[str] = None, modified: Optional[str] = None):
+        self.status = status
+        self.items = items
+        self.etag = etag
+        self.modified = modified
+
+
+class CacheEntry:
+    """피드 URL 하나에 대한 캐시 항목"""
+
+    __slots__ = ("items", "fetched_at", "etag", "modified")
+
+    def __init__(self, items: List[NewsItem], fetched_at: float, etag: Optional[str] = None, modified: Optional[str] = None):
+        self.items = items
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.modified = modified
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def to_bytes(self) -> bytes:
+        """공유 캐시 저장용 직렬화 (수집 시각은 프로세스 간에 비교할 수 있도록 벽시계 기준)"""
+        return json.dumps({
+            "items": [item.to_dict() for item in self.items],
+            "fetched_at": time.time() - self.age(),
+            "etag": self.etag,
+            "modified": self.modified
+        }, ensure_ascii=False).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CacheEntry":
+        raw = json.loads(data)
+        age = max(0.0, time.time() - raw["fetched_at"])
+        return cls([NewsItem.from_dict(item) for item in raw["items"]], time.monotonic() - age, raw.get("etag"), raw.get("modified"))
+
+
+# loader(url, etag, modified) -> FeedResult
+FeedLoader = Callable[[str, Optional[str], Optional[str]], FeedResult]
+
+
+class NewsCache:
+    """모든 세션이 공유하는 프로세스 전역 뉴스 캐시 (피드 URL 키)
+
+    - TTL이 지난 항목도 즉시 반환하고 갱신은 백그라운드에서 수행 (stale-while-revalidate)
+    - 백그라운드 갱신 스레드가 만료 전(ttl * refresh_ahead)에 미리 항목을 갱신
+    - ETag/Last-Modified 조건부 요청으로 변경 없는 피드는 304 응답만 받음
+    - 같은 URL에 대한 동시 요청은 한 번의 다운로드로 합침 (single-flight)
+    - backend(공유 캐시)를 지정하면 여러 프로세스 중 한 곳만 피드를 받고 나머지는 그 결과를 가져와
+      on_shared(items)로 알린다 (프로세스 수가 늘어도 피드 요청 수는 일정)
+    """
+
+    def __init__(
+        self,
+        loader: FeedLoader,
+        ttl: float = 3600,
+        refresh_ahead: float = 0.8,
+        max_workers: int = 4,
+        backend: Optional[CacheBackend] = None,
+        on_shared: Optional[Callable[[List[NewsItem]], None]] = None,
+        lock_timeout: float = 30
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.backend = backend
+        self.on_shared = on_shared
+        self.lock_timeout = lock_timeout
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-refresh")
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            lock = self._url_locks.get(url)
+            if lock is None:
+                lock = threading.Lock()
+                self._url_locks[url] = lock
+            return lock
+
+    def get(self, url: str) -> List[NewsItem]:
+        """캐시된 기사 목록 반환 (캐시가 비어 있을 때만 동기적으로 다운로드)"""
+        self._ensure_refresher()
+        entry = self._entries.get(url)
+        metrics.record_cache("news", entry is not None)
+        if entry is None:
+            return self.refresh(url, only_if_missing=True).items
+
+        if entry.age() >= self.ttl:
+            # 만료된 항목은 그대로 반환하고 갱신은 백그라운드에서
+            self.refresh_async(url)
+        return entry.items
+
+    def refresh(self, url: str, only_if_missing: bool = False, force: bool = False) -> CacheEntry:
+        """조건부 요청으로 피드를 갱신하고 캐시 항목을 반환
+
+        force=True(사용자가 요청한 새로고침)이면 공유 캐시의 아직 유효한 결과도 무시하고 다시 받아 덮어쓴다.
+        """
+        with self._url_lock(url):
+            entry = self._entries.get(url)
+            # 대기하는 동안 다른 스레드가 이미 채웠으면 그 결과를 사용
+            if only_if_missing and entry is not None:
+                return entry
+
+            if self.backend is not None:
+                entry = self._refresh_shared(url, entry, force)
+            else:
+                entry = self._load(url, entry)
+
+            with self._lock:
+                self._entries[url] = entry
+            return entry
+
+    def _load(self, url: str, entry: Optional[CacheEntry]) -> CacheEntry:
+        """로더로 피드를 받아 새 캐시 항목 생성 (304면 기존 항목 재사용)"""
+        if entry is not None:
+            result = self.loader(url, entry.etag, entry.modified)
+        else:
+            result = self.loader(url, None, None)
+
+        if result.status == 304 and entry is not None:
+            return CacheEntry(entry.items, time.monotonic(), result.etag or entry.etag, result.modified or entry.modified)
+        return CacheEntry(result.items or [], time.monotonic(), result.etag, result.modified)
+
+    def _refresh_shared(self, url: str, entry: Optional[CacheEntry], force: bool = False) -> CacheEntry:
+        """공유 캐시에 갱신 주기(ttl * refresh_ahead) 안의 결과가 있으면 사용하고, 없으면 한 프로세스만 다운로드"""
+        attempted = False
+        loaded: Optional[CacheEntry] = None
+
+        def compute() -> bytes:
+            nonlocal attempted, loaded
+            attempted = True
+            loaded = self._load(url, entry)
+            return loaded.to_bytes()
+
+        try:
+            data = self.backend.get_or_compute(
+                "news:" + url, compute, self.ttl * self.refresh_ahead, lock_timeout=self.lock_timeout, refresh=force
+            )
+        except Exception as e:
+            if loaded is not None:
+                # 다운로드는 성공했고 공유 캐시 저장만 실패한 경우
+                print(f"공유 뉴스 캐시 저장 중 오류: {e}")
+                return loaded
+            if attempted:
+                raise
+            # 공유 캐시 장애 시 이 프로세스에서 직접 다운로드
+            print(f"공유 뉴스 캐시 사용 중 오류: {e}")
+            return self._load(url, entry)
+        if loaded is not None:
+            return loaded
+
+        shared = CacheEntry.from_bytes(data)
+        metrics.record_cache("news_shared", True)
+        if self.on_shared is not None:
+            self.on_shared(shared.items)
+        return shared
+
+    def refresh_async(self, url: str):
+        """백그라운드 갱신 예약 (같은 URL이 이미 갱신 중이면 무시)"""
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+        self._executor.submit(self._refresh_quietly, url)
+
+    def _refresh_quietly(self, url: str):
+        try:
+            self.refresh(url)
+        except Exception as e:
+            # 갱신 실패 시 기존(만료된) 항목을 계속 제공
+            print(f"뉴스 캐시 갱신 중 오류: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+
+    def invalidate(self, url: Optional[str] = None):
+        """캐시 항목 삭제 (url이 없으면 전체 삭제)"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+
+    def _ensure_refresher(self):
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="news-cache-refresher", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        """만료 임박 항목을 주기적으로 미리 갱신"""
+        interval = max(1.0, min(60.0, self.ttl * (1 - self.refresh_ahead) / 2))
+        while not self._stop.wait(interval):
+            with self._lock:
+                due = [url for url, entry in self._entries.items() if entry.age() >= self.ttl * self.refresh_ahead]
+            for url in due:
+                self.refresh_async(url)
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
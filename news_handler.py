@@ -1,5 +1,16 @@
-import feedparser
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Optional
+from cache_backend import get_shared_backend
+from config import Config
+from http_transport import get_transport
+from news_cache import NewsCache, FeedResult
+from article_store import get_article_store
+from dedup import dedupe
+from news_item import NewsItem
+from rss_parser import parse_feed
+from news_summarizer import extractive_summary, get_news_summarizer
+import metrics
 
 class NewsHandler:
     """Google News RSS 기반 뉴스 수집"""
@@ -11,32 +22,128 @@ class NewsHandler:
         "과학": "https://news.google.com/rss/topics/CAAqJggKIiBDQkFTRWdvSUwyMHZNRFZxY0d4U0FtVnVHZ0pDVXlnQVAB?oc=5"
     }
 
+    # 키워드 검색 RSS ({query}에 URL 인코딩된 검색어)
+    SEARCH_URL = "https://news.google.com/rss/search?q={query}&hl=ko&gl=KR&ceid=KR:ko"
+
+    @staticmethod
+    def _download(url: str, headers: Optional[Dict] = None):
+        """공용 커넥션 풀로 피드 다운로드 (피드별 타임아웃 적용)"""
+        with metrics.span("news_fetch"):
+            return get_transport().get(
+                url,
+                headers=headers or {},
+                timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.NEWS_FEED_TIMEOUT)
+            )
+
+    @staticmethod
+    def _fetch_feed(url: str, etag: Optional[str] = None, modified: Optional[str] = None) -> FeedResult:
+        """피드 다운로드 및 파싱 (ETag/Last-Modified 조건부 GET)"""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+
+        response = NewsHandler._download(url, headers)
+        if response.status_code == 304:
+            return FeedResult(304, None, etag, modified)
+        response.raise_for_status()
+
+        # 캐시에는 피드당 최대 NEWS_FEED_MAX_ITEMS개까지만 파싱하여 보관
+        with metrics.span("news_parse"):
+            news_list = parse_feed(response.content, Config.NEWS_FEED_MAX_ITEMS, dict(response.headers))
+        # 같은 기사가 여러 언론사/링크로 반복되면 캐시에는 하나만 보관
+        news_list = dedupe(news_list)
+        NewsHandler._ingest(news_list)
+        return FeedResult(
+            response.status_code,
+            news_list,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
+
+    @staticmethod
+    def _ingest(news_list: List[NewsItem]):
+        """수집한 기사를 로컬 기사 저장소에 색인 (실패해도 수집 결과에는 영향 없음)"""
+        try:
+            with metrics.span("news_ingest"):
+                get_article_store().ingest(news_list)
+        except Exception as e:
+            print(f"기사 저장 중 오류: {e}")
+
     @staticmethod
-    def fetch_news(category: str = "최신뉴스", max_items: int = 10) -> List[Dict]:
+    def fetch_news(category: str = "최신뉴스", max_items: int = 10) -> List[NewsItem]:
         try:
             feed_url = NewsHandler.NEWS_FEEDS.get(category, NewsHandler.NEWS_FEEDS["최신뉴스"])
-            feed = feedparser.parse(feed_url)
-            news_list: List[Dict] = []
-            for entry in feed.entries[:max_items]:
-                news_list.append({
-                    "title": entry.get("title", "제목 없음"),
-                    "link": entry.get("link", ""),
-                    "summary": entry.get("summary", ""),
-                    "published": entry.get("published", ""),
-                    "source": entry.get("source", {}).get("title", "Google News") if entry.get("source") else "Google News"
-                })
-            return news_list
+            # 프로세스 전역 캐시에서 조회 (만료 시 백그라운드 갱신)
+            return get_news_cache().get(feed_url)[:max_items]
         except Exception as e:
             print(f"뉴스 수집 중 오류: {e}")
             return []
 
+    @staticmethod
+    def fetch_all(categories: Optional[List[str]] = None, max_items: int = 10, timeout: Optional[float] = None) -> Dict[str, List[NewsItem]]:
+        """여러 카테고리 피드를 동시에 수집
+
+        Args:
+            categories: 수집할 카테고리 목록 (None이면 전체)
+            max_items: 카테고리별 최대 항목 수
+            timeout: 피드별 대기 시간(초). 모든 피드를 병렬로 받으므로 전체 대기 시간도 이 값으로 제한된다
+
+        Returns:
+            {카테고리: 뉴스 리스트}. 시간 내에 받지 못한 피드는 빈 리스트 (수집은 백그라운드에서 계속되어 캐시에 반영됨)
+        """
+        if categories is None:
+            categories = NewsHandler.get_available_categories()
+        if timeout is None:
+            timeout = Config.NEWS_FEED_TIMEOUT
+
+        executor = _get_fetch_executor()
+        futures = {category: executor.submit(NewsHandler.fetch_news, category, max_items) for category in categories}
+        wait(futures.values(), timeout=timeout)
+
+        results: Dict[str, List[NewsItem]] = {}
+        for category, future in futures.items():
+            if future.done():
+                results[category] = future.result()
+            else:
+                print(f"뉴스 수집 시간 초과: {category}")
+                results[category] = []
+        return results
+
+    @staticmethod
+    def warm_up(block: bool = False):
+        """서버 시작 시 전체 피드를 미리 캐시에 채워 첫 방문자가 네트워크를 기다리지 않게 한다"""
+        if block:
+            NewsHandler.fetch_all(max_items=Config.MAX_NEWS_ITEMS)
+            return
+        threading.Thread(
+            target=NewsHandler.fetch_all,
+            kwargs={"max_items": Config.MAX_NEWS_ITEMS},
+            name="news-warm-up",
+            daemon=True
+        ).start()
+
+    @staticmethod
+    def refresh_news(category: str = "최신뉴스"):
+        """카테고리 피드를 즉시 갱신 (변경 없으면 304로 끝남)"""
+        try:
+            feed_url = NewsHandler.NEWS_FEEDS.get(category, NewsHandler.NEWS_FEEDS["최신뉴스"])
+            # 공유 캐시에 아직 유효한 결과가 있어도 사용자가 요청한 새로고침은 다시 받는다
+            get_news_cache().refresh(feed_url, force=True)
+        except Exception as e:
+            print(f"뉴스 갱신 중 오류: {e}")
+
     @staticmethod
     def get_available_categories() -> List[str]:
         return list(NewsHandler.NEWS_FEEDS.keys())
 
     @staticmethod
-    def search_news(keyword: str, category: str = "최신뉴스", max_items: int = 50) -> List[Dict]:
-        """피드에서 키워드로 뉴스 검색 (제목, 요약 대상)
+    def search_news(keyword: str, category: str = "최신뉴스", max_items: int = 50) -> List[NewsItem]:
+        """키워드로 뉴스 검색 (제목, 요약 대상)
+
+        로컬 기사 저장소에서 먼저 찾고, 결과가 부족할 때만 Google News 검색 RSS를 조회한다.
+        네트워크 검색 결과도 저장소에 색인되어 같은 검색어는 다음부터 로컬에서 응답한다.
 
         Args:
             keyword: 검색어 (대소문자 무시)
@@ -44,39 +151,37 @@ class NewsHandler:
             max_items: 반환할 최대 항목 수
 
         Returns:
-            키워드에 매칭되는 뉴스 딕셔너리 리스트
+            키워드에 매칭되는 NewsItem 리스트
         """
         if not keyword:
             return []
 
         import urllib.parse
         try:
-            # 우선 Google News의 검색 RSS를 사용하여 쿼리별로 정확한 결과를 수집
+            # 카테고리 피드가 저장소에 색인되도록 캐시를 채운다 (캐시 적중 시 비용 없음)
+            NewsHandler.fetch_news(category, max_items=max_items)
+            with metrics.span("news_search", source="local"):
+                # 중복 제거 후에도 max_items를 채우도록 여유 있게 조회
+                local = dedupe(get_article_store().search(keyword, max_items=max_items * 2))[:max_items]
+            enough = len(local) >= min(max_items, Config.ARTICLE_SEARCH_MIN_LOCAL_HITS)
+            # 로컬 저장소만으로 응답한 비율을 캐시 적중률로 집계
+            metrics.record_cache("article_store", enough)
+            if enough:
+                return local
+
+            # 로컬 결과가 부족하면 Google News의 검색 RSS로 쿼리별 결과를 수집
             query = urllib.parse.quote(keyword)
-            search_url = f"https://news.google.com/rss/search?q={query}&hl=ko&gl=KR&ceid=KR:ko"
-            feed = feedparser.parse(search_url)
-            news_list: List[Dict] = []
-            for entry in feed.entries[:max_items]:
-                news_list.append({
-                    "title": entry.get("title", "제목 없음"),
-                    "link": entry.get("link", ""),
-                    "summary": entry.get("summary", ""),
-                    "published": entry.get("published", ""),
-                    "source": entry.get("source", {}).get("title", "Google News") if entry.get("source") else "Google News"
-                })
-            # 결과가 충분하지 않으면 카테고리 피드에서 추가 필터링 수행
+            search_url = NewsHandler.SEARCH_URL.format(query=query)
+            response = NewsHandler._download(search_url)
+            response.raise_for_status()
+            with metrics.span("news_parse"):
+                news_list = parse_feed(response.content, max_items, dict(response.headers))
+            news_list = dedupe(news_list)
+            NewsHandler._ingest(news_list)
+
+            # 네트워크 결과가 없으면 로컬 결과라도 반환
             if not news_list:
-                items = NewsHandler.fetch_news(category, max_items=max_items * 2)
-                kw = keyword.lower()
-                filtered = []
-                for it in items:
-                    title = (it.get("title") or "").lower()
-                    summary = (it.get("summary") or "").lower()
-                    if kw in title or kw in summary:
-                        filtered.append(it)
-                    if len(filtered) >= max_items:
-                        break
-                return filtered
+                return local
 
             return news_list
         except Exception as e:
@@ -84,31 +189,79 @@ class NewsHandler:
             return []
 
     @staticmethod
-    def summarize_news(news_items: List[Dict], max_articles: int = 5) -> str:
+    @metrics.timed("news_summarize")
+    def summarize_news(
+        news_items: List[NewsItem],
+        max_articles: int = 5,
+        use_llm: Optional[bool] = None,
+        max_llm_articles: Optional[int] = None
+    ) -> str:
         """뉴스 항목 리스트를 사람이 읽기 쉬운 요약 텍스트로 변환하여 반환한다.
 
         - 기사 제목, 출처, 작성일, 간단요약, 링크를 포함
         - 단순 링크 나열이 아닌 요약·정리 형태로 반환
+        - use_llm(기본값 NEWS_SUMMARY_USE_LLM)이면 기사별 LLM 요약을 병렬로 만든 뒤 종합 (기사 요약은 캐시)
+        - max_llm_articles를 주면 LLM 요약은 상위 그 수만큼만 (LLM 호출 수 = 기사 수 + 종합 1회)
+        - 같은 기사의 중복 항목은 한 번만 요약
         """
+        news_items = dedupe(news_items)
         if not news_items:
             return "검색된 기사가 없습니다."
 
+        if use_llm is None:
+            use_llm = Config.NEWS_SUMMARY_USE_LLM
+        if use_llm:
+            if max_llm_articles is not None:
+                max_articles = min(max_articles, max_llm_articles)
+            return get_news_summarizer().digest(news_items, max_articles=max_articles)
+
         items = news_items[:max_articles]
         parts = [f"기사 요약 (총 {len(news_items)}건 중 상위 {len(items)}건):\n"]
         for i, it in enumerate(items, 1):
-            title = it.get("title", "제목 없음")
-            source = it.get("source", "")
-            published = it.get("published", "")
-            summary = it.get("summary", "").strip()
             # 짧은 요약 한두 문장으로 줄이기
-            short = summary.split('.')
-            short_text = short[0].strip() + '.' if short and short[0].strip() else (summary[:200] + '...')
+            short_text = extractive_summary(it)
 
-            parts.append(f"{i}. {title}\n출처: {source} | 작성일: {published}\n요약: {short_text}\n링크: {it.get('link', '')}\n")
+            parts.append(f"{i}. {it.title}\n출처: {it.source} | 작성일: {it.published}\n요약: {short_text}\n링크: {it.link}\n")
 
         # 간단한 종합 코멘트 (문장 조합)
-        headlines = ' / '.join([it.get('title', '') for it in items if it.get('title')])
+        headlines = ' / '.join([it.title for it in items if it.title])
         parts.append(f"종합: 주요 기사 제목 — {headlines}")
         return "\n".join(parts)
 
-        
+
+_news_cache: Optional[NewsCache] = None
+_news_cache_lock = threading.Lock()
+
+
+def get_news_cache() -> NewsCache:
+    """모든 세션이 공유하는 프로세스 전역 뉴스 캐시 반환"""
+    global _news_cache
+    if _news_cache is None:
+        with _news_cache_lock:
+            if _news_cache is None:
+                _news_cache = NewsCache(
+                    NewsHandler._fetch_feed,
+                    ttl=Config.NEWS_FETCH_INTERVAL,
+                    refresh_ahead=Config.NEWS_REFRESH_AHEAD,
+                    # 다른 프로세스가 받은 피드도 이 프로세스의 기사 저장소에 색인
+                    backend=get_shared_backend(),
+                    on_shared=NewsHandler._ingest,
+                    lock_timeout=Config.NEWS_FEED_TIMEOUT * 2
+                )
+    return _news_cache
+
+
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_fetch_executor() -> ThreadPoolExecutor:
+    """카테고리 동시 수집용 공유 스레드 풀 (크기 제한)"""
+    global _fetch_executor
+    if _fetch_executor is None:
+        with _news_cache_lock:
+            if _fetch_executor is None:
+                _fetch_executor = ThreadPoolExecutor(
+                    max_workers=Config.NEWS_FETCH_WORKERS,
+                    thread_name_prefix="news-fetch"
+                )
+    return _fetch_executor
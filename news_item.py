@@ -0,0 +1,26 @@
+from dataclasses import dataclass, asdict
+from typing import Dict
+
+
+@dataclass(slots=True)
+class NewsItem:
+    """뉴스 기사 한 건 (__slots__ 기반의 가벼운 레코드, slots=True는 Python 3.10 이상)"""
+
+    title: str = "제목 없음"
+    link: str = ""
+    summary: str = ""
+    published: str = ""
+    source: str = "Google News"
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NewsItem":
+        return cls(
+            title=data.get("title") or "제목 없음",
+            link=data.get("link", ""),
+            summary=data.get("summary", ""),
+            published=data.get("published", ""),
+            source=data.get("source") or "Google News"
+        )
@@ -0,0 +1,172 @@
+import hashlib
+import html
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from config import Config
+from news_item import NewsItem
+from cache_backend import get_shared_backend
+from response_cache import ResponseCache
+import metrics
+
+ARTICLE_PROMPT = (
+    "다음 뉴스 기사를 한국어 두 문장 이내로 요약하세요. 기사에 없는 내용은 추가하지 말고, "
+    "핵심 사실(누가, 무엇을, 왜)을 중심으로 작성하세요."
+)
+DIGEST_PROMPT = (
+    "다음은 여러 뉴스 기사의 요약입니다. 공통 흐름과 주요 이슈를 한국어 3~5문장으로 종합하세요. "
+    "특정 기사를 언급할 때는 [번호]를 붙이세요."
+)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+# 기사 요약 요청에 넣는 본문 최대 글자 수
+ARTICLE_INPUT_CHARS = 1500
+
+
+def _clean(text: str) -> str:
+    return " ".join(html.unescape(_TAG_RE.sub(" ", text or "")).split())
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def article_key(model: str, item: NewsItem) -> str:
+    """기사 요약 캐시 키: 모델 + 링크 + 내용(제목/요약) 해시
+
+    같은 링크라도 내용이 바뀌면 다시 요약하고, 링크가 없는 기사는 내용 해시만으로 구분한다.
+    """
+    content_hash = _sha256(f"{item.title}\n{item.summary}")
+    return _sha256(f"article\n{model}\n{item.link}\n{content_hash}")
+
+
+def extractive_summary(item: NewsItem) -> str:
+    """LLM 없이 RSS 요약의 첫 문장을 사용하는 대체 요약"""
+    summary = item.summary.strip()
+    # 짧은 요약 한두 문장으로 줄이기
+    short = summary.split('.')
+    return short[0].strip() + '.' if short and short[0].strip() else (summary[:200] + '...')
+
+
+class NewsSummarizer:
+    """기사별 LLM 요약(map)을 병렬로 만든 뒤 하나의 다이제스트로 종합(reduce)
+
+    - 기사 요약은 링크 + 내용 해시로 캐시되어 모든 세션/질의에서 기사당 한 번만 생성
+    - 같은 기사를 동시에 요청하면 진행 중인 요약 하나를 함께 기다린다 (공유 캐시 사용 시 프로세스 간에도)
+    - 같은 기사 묶음의 종합 결과도 캐시되어 반복 다이제스트는 API 호출 없이 반환
+    - LLM 호출이 실패하면 기사는 첫 문장 요약, 종합은 제목 나열로 대체
+    """
+
+    def __init__(
+        self,
+        chat_handler_factory: Callable,
+        cache: ResponseCache,
+        max_workers: int = 4,
+        article_max_tokens: int = 1000,
+        digest_max_tokens: int = 2000
+    ):
+        self.chat_handler_factory = chat_handler_factory
+        self.cache = cache
+        self.article_max_tokens = article_max_tokens
+        self.digest_max_tokens = digest_max_tokens
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-summary")
+
+    def _complete(self, prompt: str, content: str, max_tokens: int) -> str:
+        handler = self.chat_handler_factory(session_id="news-summary")
+        return handler.send_message(
+            [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": content}
+            ],
+            max_tokens=max_tokens,
+            use_cache=False  # 결과는 이 요약기의 캐시에 기사/묶음 단위로 저장
+        ).strip()
+
+    def _summarize_uncached(self, item: NewsItem) -> str:
+        content = f"제목: {_clean(item.title)}\n출처: {item.source}\n내용: {_clean(item.summary)[:ARTICLE_INPUT_CHARS]}"
+        with metrics.span("news_summarize_article"):
+            return self._complete(ARTICLE_PROMPT, content, self.article_max_tokens)
+
+    def _cached(self, key: str, compute: Callable[[], str], fallback: Callable[[], str], label: str) -> str:
+        """캐시된 결과 반환, 없으면 계산 (같은 키를 동시에 요청하면 진행 중인 계산 하나를 함께 기다림)
+
+        실패하거나 빈 응답이면 캐시하지 않고 이번만 fallback 결과를 사용한다.
+        """
+        try:
+            value = self.cache.get_or_compute(key, compute)
+        except Exception as e:
+            print(f"{label} 중 오류: {e}")
+            value = ""
+        return value or fallback()
+
+    def summarize_article(self, item: NewsItem) -> str:
+        """기사 한 건 요약 (실패 시 첫 문장 요약)"""
+        return self._cached(
+            article_key(Config.GMS_MODEL, item),
+            lambda: self._summarize_uncached(item),
+            lambda: extractive_summary(item),
+            "기사 요약"
+        )
+
+    def summarize_articles(self, items: List[NewsItem]) -> List[str]:
+        """기사별 요약을 제한된 스레드 풀에서 병렬로 생성 (입력 순서 유지)"""
+        return list(self._executor.map(self.summarize_article, items))
+
+    def reduce(self, items: List[NewsItem], summaries: List[str]) -> str:
+        """기사 요약들을 하나의 종합 코멘트로 합침 (같은 기사 묶음은 캐시)"""
+        model = Config.GMS_MODEL
+        key = _sha256("digest\n" + model + "\n" + "\n".join(article_key(model, item) for item in items))
+
+        def compute() -> str:
+            content = "\n".join(f"[{i}] {_clean(item.title)}: {summary}" for i, (item, summary) in enumerate(zip(items, summaries), 1))
+            with metrics.span("news_summarize_reduce"):
+                return self._complete(DIGEST_PROMPT, content, self.digest_max_tokens)
+
+        return self._cached(
+            key,
+            compute,
+            lambda: "주요 기사 제목 — " + " / ".join(item.title for item in items if item.title),
+            "뉴스 종합"
+        )
+
+    def digest(self, news_items: List[NewsItem], max_articles: int = 5) -> str:
+        """상위 max_articles개 기사의 요약 다이제스트 텍스트"""
+        if not news_items:
+            return "검색된 기사가 없습니다."
+
+        items = news_items[:max_articles]
+        summaries = self.summarize_articles(items)
+        parts = [f"기사 요약 (총 {len(news_items)}건 중 상위 {len(items)}건):\n"]
+        for i, (it, summary) in enumerate(zip(items, summaries), 1):
+            parts.append(f"{i}. {it.title}\n출처: {it.source} | 작성일: {it.published}\n요약: {summary}\n링크: {it.link}\n")
+        parts.append(f"종합: {self.reduce(items, summaries)}")
+        return "\n".join(parts)
+
+
+_summarizer: Optional[NewsSummarizer] = None
+_summarizer_lock = threading.Lock()
+
+
+def get_news_summarizer() -> NewsSummarizer:
+    """모든 세션이 공유하는 프로세스 전역 뉴스 요약기 반환"""
+    global _summarizer
+    if _summarizer is None:
+        with _summarizer_lock:
+            if _summarizer is None:
+                from chat_handler import ChatHandler
+                cache = ResponseCache(
+                    max_bytes=Config.NEWS_SUMMARY_CACHE_MAX_BYTES,
+                    ttl=Config.NEWS_SUMMARY_CACHE_TTL,
+                    db_path=Config.NEWS_SUMMARY_CACHE_DB or None,
+                    name="news_summary",
+                    backend=get_shared_backend()
+                )
+                _summarizer = NewsSummarizer(
+                    ChatHandler,
+                    cache,
+                    max_workers=Config.NEWS_SUMMARY_WORKERS,
+                    article_max_tokens=Config.NEWS_SUMMARY_ARTICLE_MAX_TOKENS,
+                    digest_max_tokens=Config.NEWS_SUMMARY_DIGEST_MAX_TOKENS
+                )
+    return _summarizer
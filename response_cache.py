@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+from cache_backend import CacheBackend, MemoryBackend, SQLiteBackend, get_shared_backend
+from config import Config
+import metrics
+
+
+def normalize_messages(messages: List[Dict]) -> List[List[str]]:
+    """캐시 키용 메시지 정규화 (role/content만, 공백 정리)"""
+    return [[str(m.get("role", "")), " ".join(str(m.get("content", "")).split())] for m in messages]
+
+
+def make_key(model: str, messages: List[Dict], max_tokens: int) -> str:
+    """모델 + 정규화된 메시지 + 최대 토큰 수의 해시"""
+    raw = json.dumps([model, normalize_messages(messages), max_tokens], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LLM 응답 캐시 (프로세스 내 메모리 LRU + 선택적 공유/디스크 계층)
+
+    - 메모리 계층은 저장된 응답의 총 바이트 수로 크기를 제한 (LRU 제거)
+    - backend(CACHE_BACKEND의 SQLite/Redis)를 지정하면 여러 Streamlit 프로세스가 응답을 공유하고,
+      db_path만 지정하면 SQLite 파일에 저장하여 재시작 후에도 유지
+    - ttl(초)이 지난 항목은 만료 처리
+    - get_or_compute는 같은 키의 동시 요청을 (공유 계층이 있으면 프로세스 간에도) 한 번의 계산으로 합친다
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: float = 86400,
+        db_path: Optional[str] = None,
+        name: str = "response",
+        backend: Optional[CacheBackend] = None
+    ):
+        self.name = name  # 계측용 캐시 이름 (공유 계층의 키 접두사로도 사용)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._memory = MemoryBackend(max_bytes)
+        if backend is None and db_path:
+            backend = SQLiteBackend(db_path)
+        self._shared = backend
+        self._prefix = f"{name}:"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _record(self, hit: bool, shared: bool = False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                if shared:
+                    self.disk_hits += 1
+            else:
+                self.misses += 1
+        metrics.record_cache(self.name, hit)
+
+    def _get_shared(self, key: str) -> Optional[str]:
+        """공유 계층 조회 (적중 시 메모리로 승격). 공유 계층 장애는 미스로 처리"""
+        if self._shared is None:
+            return None
+        try:
+            data = self._shared.get(self._prefix + key)
+        except Exception as e:
+            print(f"공유 캐시 조회 중 오류: {e}")
+            return None
+        if data is None:
+            return None
+        self._memory.set(key, data, self.ttl)
+        return data.decode("utf-8")
+
+    def get(self, key: str) -> Optional[str]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._record(True)
+            return data.decode("utf-8")
+        value = self._get_shared(key)
+        self._record(value is not None, shared=True)
+        return value
+
+    def set(self, key: str, value: str):
+        data = value.encode("utf-8")
+        self._memory.set(key, data, self.ttl)
+        if self._shared is not None:
+            try:
+                self._shared.set(self._prefix + key, data, self.ttl)
+            except Exception as e:
+                print(f"공유 캐시 저장 중 오류: {e}")
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """캐시된 응답을 반환하고, 없으면 compute()로 만든 응답을 저장 후 반환 (빈 응답은 저장하지 않음)
+
+        같은 키를 동시에 요청하면 한 곳에서만 compute()를 실행하고 나머지는 그 결과를 기다린다.
+        """
+        data = self._memory.get(key)
+        if data is not None:
+            self._record(True)
+            return data.decode("utf-8")
+
+        computed = False
+
+        def compute_bytes() -> bytes:
+            nonlocal computed
+            computed = True
+            return (compute() or "").encode("utf-8")
+
+        if self._shared is not None:
+            try:
+                data = self._shared.get_or_compute(self._prefix + key, compute_bytes, self.ttl)
+            except Exception as e:
+                if computed:
+                    raise
+                # 공유 계층 장애 시 프로세스 안에서만 합쳐서 계산
+                print(f"공유 캐시 사용 중 오류: {e}")
+                data = self._memory.get_or_compute(key, compute_bytes, self.ttl)
+            else:
+                if data:
+                    self._memory.set(key, data, self.ttl)
+        else:
+            data = self._memory.get_or_compute(key, compute_bytes, self.ttl)
+        self._record(not computed, shared=self._shared is not None)
+        return (data or b"").decode("utf-8")
+
+    def clear(self):
+        self._memory.clear()
+        if self._shared is not None:
+            self._shared.clear(self._prefix)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._memory),
+                "bytes": self._memory.bytes
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """프로세스 전역 응답 캐시 반환 (비활성화 시 None)"""
+    global _response_cache
+    if not Config.RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    max_bytes=Config.RESPONSE_CACHE_MAX_BYTES,
+                    ttl=Config.RESPONSE_CACHE_TTL,
+                    db_path=Config.RESPONSE_CACHE_DB or None,
+                    backend=get_shared_backend()
+                )
+    return _response_cache
@@ -0,0 +1,92 @@
+import io
+from typing import Dict, List, Optional
+
+from news_item import NewsItem
+
+
+# <item> 하위에서 읽는 태그 -> NewsItem 필드
+_ITEM_FIELDS = {
+    "title": "title",
+    "link": "link",
+    "description": "summary",
+    "pubDate": "published",
+    "source": "source"
+}
+
+
+def parse_rss(data: bytes, max_items: Optional[int] = None) -> List[NewsItem]:
+    """RSS 2.0 피드를 증분(iterparse) 파싱하여 NewsItem 목록 반환
+
+    max_items개를 읽으면 나머지 문서는 파싱하지 않고 중단한다.
+    RSS 2.0이 아니거나 XML이 깨진 경우 ET.ParseError / ValueError를 발생시킨다.
+    """
+    # xml.etree / feedparser는 가져오는 비용이 커서 처음 파싱할 때 불러온다
+    import xml.etree.ElementTree as ET
+
+    items: List[NewsItem] = []
+    fields: Dict[str, str] = {}
+    in_item = False
+    root_checked = False
+
+    for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if not root_checked:
+                if tag != "rss":
+                    raise ValueError(f"RSS 2.0 피드가 아닙니다: {tag}")
+                root_checked = True
+            elif tag == "item":
+                in_item = True
+                fields = {}
+            continue
+
+        if not in_item:
+            continue
+
+        if tag == "item":
+            items.append(NewsItem(
+                title=fields.get("title") or "제목 없음",
+                link=fields.get("link", ""),
+                summary=fields.get("summary", ""),
+                published=fields.get("published", ""),
+                source=fields.get("source") or "Google News"
+            ))
+            in_item = False
+            # 처리한 항목의 하위 요소를 해제하여 메모리 사용을 일정하게 유지
+            elem.clear()
+            if max_items is not None and len(items) >= max_items:
+                break
+        else:
+            name = _ITEM_FIELDS.get(tag)
+            if name is not None:
+                fields[name] = (elem.text or "").strip()
+
+    return items
+
+
+def parse_with_feedparser(data, max_items: Optional[int] = None, response_headers: Optional[Dict] = None) -> List[NewsItem]:
+    """feedparser 기반 파싱 (Atom, 깨진 XML 등 빠른 경로가 처리하지 못하는 피드용)"""
+    import feedparser
+
+    feed = feedparser.parse(data, response_headers=response_headers)
+    entries = feed.entries if max_items is None else feed.entries[:max_items]
+    return [
+        NewsItem(
+            title=entry.get("title", "제목 없음"),
+            link=entry.get("link", ""),
+            summary=entry.get("summary", ""),
+            published=entry.get("published", ""),
+            source=entry.get("source", {}).get("title", "Google News") if entry.get("source") else "Google News"
+        )
+        for entry in entries
+    ]
+
+
+def parse_feed(data: bytes, max_items: Optional[int] = None, response_headers: Optional[Dict] = None) -> List[NewsItem]:
+    """빠른 RSS 파서를 먼저 시도하고 실패하면 feedparser로 대체"""
+    import xml.etree.ElementTree as ET
+
+    try:
+        return parse_rss(data, max_items)
+    except (ET.ParseError, ValueError):
+        return parse_with_feedparser(data, max_items, response_headers)
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+import async_chat_handler
+from api_scheduler import ApiScheduler, QueueTimeoutError
+from async_chat_handler import AsyncChatHandler
+
+
+def idle(scheduler: ApiScheduler) -> bool:
+    return scheduler.stats() == {"active": 0, "waiting": 0, "sessions_waiting": 0}
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_timed_out_acquire_leaves_no_ticket():
+    scheduler = ApiScheduler(max_concurrency=1)
+    scheduler.acquire("a", 10)
+    with pytest.raises(QueueTimeoutError):
+        scheduler.acquire("b", 10, timeout=0.05)
+    assert scheduler.stats() == {"active": 1, "waiting": 0, "sessions_waiting": 0}
+
+    # 포기한 티켓이 나중에 슬롯을 받아 가지 않아야 한다
+    scheduler.release()
+    assert idle(scheduler)
+    scheduler.acquire("c", 10, timeout=0.05)
+    scheduler.release()
+    assert idle(scheduler)
+
+
+def test_raising_position_callback_returns_slot():
+    scheduler = ApiScheduler(max_concurrency=1)
+    scheduler.acquire("a", 10)
+
+    def on_position(position: int):
+        raise RuntimeError("재실행으로 중단")
+
+    with pytest.raises(RuntimeError):
+        scheduler.acquire("b", 10, on_position=on_position)
+    scheduler.release()
+    assert idle(scheduler)
+
+
+def test_cancelled_async_slot_returns_slot(monkeypatch):
+    scheduler = ApiScheduler(max_concurrency=1)
+    monkeypatch.setattr(async_chat_handler, "get_scheduler", lambda: scheduler)
+    handler = AsyncChatHandler(session_id="b")
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def hold_slot():
+        async with handler._slot(messages, 10, None):
+            await asyncio.sleep(10)
+
+    async def main():
+        scheduler.acquire("a", 10)
+        task = asyncio.ensure_future(hold_slot())
+        assert await asyncio.to_thread(wait_until, lambda: scheduler.stats()["waiting"] == 1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # 대기 스레드는 계속 기다리다 슬롯을 받으면 바로 반납해야 한다
+        scheduler.release()
+        assert await asyncio.to_thread(wait_until, lambda: idle(scheduler))
+
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+import pytest
+
+from dedup import DuplicateIndex, _strip_source, simhash
+from news_item import NewsItem
+
+
+@pytest.mark.parametrize("title, source, expected", [
+    ("반도체 수출 반등 - 연합뉴스", "연합뉴스", "반도체 수출 반등"),
+    ("반도체 수출 반등 - 연합뉴스 ", " 연합뉴스", "반도체 수출 반등"),
+    ("반도체 수출 반등 - 연합뉴스", "", "반도체 수출 반등"),
+    # 언론사명이 아닌 짧은 끝부분은 제목의 일부
+    ("삼성전자 - 2분기 실적 발표", "연합뉴스", "삼성전자 - 2분기 실적 발표"),
+    ("A - B", "Google News", "A - B"),
+    ("제목 - 연합뉴스 - 한겨레", "한겨레", "제목 - 연합뉴스"),
+    ("연합뉴스", "연합뉴스", "연합뉴스"),
+    (" - 연합뉴스", "연합뉴스", " - 연합뉴스"),
+])
+def test_strip_source(title, source, expected):
+    assert _strip_source(title, source) == expected
+
+
+@pytest.mark.parametrize("item", [
+    NewsItem(title="", summary="", source=""),
+    NewsItem(title="!!!", summary="...", source=""),
+])
+def test_simhash_none_without_text(item):
+    assert simhash(item) is None
+
+
+def test_textless_items_are_not_clustered():
+    index = DuplicateIndex()
+    items = [NewsItem(title="", summary="", source="", link=f"http://a.test/{i}") for i in range(3)]
+    assert index.dedupe(items) == items
+
+
+def test_same_story_from_different_outlets_is_clustered():
+    index = DuplicateIndex()
+    first = NewsItem(
+        title="정부, 내년 최저임금 심의 본격 착수 - 연합뉴스",
+        link="http://a.test/1",
+        summary="정부가 내년도 최저임금 심의를 본격적으로 시작했다",
+        source="연합뉴스"
+    )
+    second = NewsItem(
+        title="정부, 내년 최저임금 심의 본격 착수 - 한겨레",
+        link="http://b.test/2",
+        summary="정부가 내년도 최저임금 심의를 본격적으로 시작했다",
+        source="한겨레"
+    )
+    assert index.dedupe([first, second]) == [first]
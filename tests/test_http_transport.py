@@ -0,0 +1,96 @@
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from http_transport import HttpTransport
+
+URL = "http://gms.test/v1/chat/completions"
+
+
+class ScriptedAdapter(BaseAdapter):
+    """미리 정한 결과(예외 또는 상태 코드)를 차례로 돌려주는 가짜 어댑터"""
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.request = request
+        response.url = request.url
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+def make_transport(outcomes, **kwargs):
+    kwargs.setdefault("max_retries", 3)
+    transport = HttpTransport(backoff_base=0, backoff_max=0, **kwargs)
+    adapter = ScriptedAdapter(outcomes)
+    transport.session.mount("http://", adapter)
+    return transport, adapter
+
+
+def test_post_retries_only_errors_before_send():
+    transport, adapter = make_transport([
+        requests.exceptions.ConnectionError("refused"),
+        requests.exceptions.ConnectTimeout("connect timeout"),
+        200
+    ])
+    assert transport.post(URL).status_code == 200
+    assert adapter.calls == 3
+
+
+def test_post_read_timeout_is_failure_without_retry():
+    transport, adapter = make_transport([requests.exceptions.ReadTimeout("read timeout"), 200])
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        transport.post(URL)
+    # 서버가 이미 처리 중일 수 있으므로 다시 보내지 않는다
+    assert adapter.calls == 1
+    assert transport.breaker_for(URL)._failures == 1
+
+
+def test_get_read_timeout_is_retried():
+    transport, adapter = make_transport([requests.exceptions.ReadTimeout("read timeout"), 200])
+    assert transport.get(URL).status_code == 200
+    assert adapter.calls == 2
+
+
+def test_429_counts_as_breaker_success():
+    transport, adapter = make_transport([429, 429, 429], max_retries=2, failure_threshold=1)
+    assert transport.post(URL).status_code == 429
+    assert adapter.calls == 3
+    assert transport.breaker_for(URL).state == "closed"
+
+
+def test_half_open_probe_released_on_base_exception():
+    class Interrupted(BaseException):
+        pass
+
+    transport, adapter = make_transport(
+        [requests.exceptions.ConnectionError("refused"), Interrupted(), 200],
+        max_retries=0,
+        failure_threshold=1,
+        reset_timeout=0.05
+    )
+    breaker = transport.breaker_for(URL)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.get(URL)
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    with pytest.raises(Interrupted):
+        transport.get(URL)
+    # 시험 요청 표시가 풀려야 다음 요청이 시험을 이어간다
+    assert transport.get(URL).status_code == 200
+    assert breaker.state == "closed"
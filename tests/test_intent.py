@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+from intent import ENGLISH_STOPWORDS, REMOVE_TOKENS, SEARCH_KEYWORDS, detect_article_search, extract_keywords
+
+
+def legacy_extract_keywords(text: str) -> str:
+    """정규식으로 바꾸기 전 구현 (불용어를 목록 순서대로 str.replace)"""
+    s = text.lower()
+    for tok in REMOVE_TOKENS:
+        s = s.replace(tok, " ")
+    for tok in ENGLISH_STOPWORDS:
+        s = s.replace(tok, " ")
+    s = re.sub(r"[^\w\s\u3131-\u318E\uAC00-\uD7A3]", " ", s)
+    s = " ".join([w for w in s.split() if len(w) > 1])
+    return s.strip()
+
+
+CASES = [
+    "오늘 반도체 뉴스 요약해줘",
+    "최신 AI 기사 검색해줘!",
+    "환율 관련 기사 정리해줘",
+    "newsummary",
+    "articlesearch summary",
+    "summarynews",
+    "searchnews 기사요약해",
+    "뉴스기사요약해줘요",
+    "검색해줘요약",
+    "Summary of NEWS: 금리 동결?",
+    "정리해줘정리해",
+    "",
+    "그냥 인사",
+]
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_extract_keywords_matches_sequential_replace(text):
+    assert extract_keywords(text) == legacy_extract_keywords(text)
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_detect_article_search_matches_keyword_scan(text):
+    is_search, keyword = detect_article_search(text)
+    assert is_search == any(k in text.lower() for k in SEARCH_KEYWORDS)
+    if is_search:
+        assert keyword == (legacy_extract_keywords(text) or text.strip())
+    else:
+        assert keyword is None